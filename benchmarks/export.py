@@ -0,0 +1,126 @@
+"""
+Measures the throughput and peak memory of the exporters,
+against the implementations they replaced.
+
+Usage: python -m benchmarks.export [--rows 100000] [--format xml]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from xml.dom.minidom import Document
+
+import tomlkit
+
+from clisnips.database.snippets_db import SnippetsDatabase
+from clisnips.exporters import TomlExporter, XmlExporter
+
+WORDS = ('git', 'docker', 'find', 'grep', 'sed', 'awk', 'ssh', 'tar', 'curl', 'jq', 'ps', 'kill')
+
+
+def populate(db: SnippetsDatabase, rows: int):
+    rng = random.Random(42)
+    now = int(time.time())
+    db.insert_many(
+        {
+            'title': ' '.join(rng.choices(WORDS, k=4)),
+            'cmd': ' | '.join(' '.join(rng.choices(WORDS, k=3)) for _ in range(rng.randrange(1, 4))),
+            'tag': ','.join(rng.choices(WORDS, k=2)),
+            'doc': '\n'.join(f'{{{w}}} (string) the {w} <option> & "value"' for w in rng.choices(WORDS, k=3)),
+            'created_at': now - rng.randrange(86400 * 365),
+            'last_used_at': now - rng.randrange(86400 * 30),
+            'usage_count': rng.randrange(100),
+            'ranking': rng.random() * 1000,
+        }
+        for _ in range(rows)
+    )
+
+
+def minidom_xml_export(db: SnippetsDatabase, path: Path):
+    doc = Document()
+    root = doc.createElement('snippets')
+    for row in db:
+        snip = doc.createElement('snippet')
+        snip.setAttribute('created-at', str(row['created_at']))
+        snip.setAttribute('last-used-at', str(row['last_used_at']))
+        snip.setAttribute('usage-count', str(row['usage_count']))
+        snip.setAttribute('ranking', str(row['ranking']))
+        for name, text in (('title', row['title']), ('command', row['cmd']), ('tag', row['tag'])):
+            el = doc.createElement(name)
+            el.appendChild(doc.createTextNode(text))
+            snip.appendChild(el)
+        el = doc.createElement('doc')
+        el.appendChild(doc.createCDATASection(row['doc']))
+        snip.appendChild(el)
+        root.appendChild(snip)
+    doc.appendChild(root)
+    with open(path, 'w') as fp:
+        fp.write(doc.toprettyxml(indent='  '))
+
+
+def tomlkit_toml_export(db: SnippetsDatabase, path: Path):
+    document = tomlkit.document()
+    items = tomlkit.aot()
+    for row in db:
+        tbl = tomlkit.table()
+        tbl.update(row)
+        if '\n' in row['cmd']:
+            tbl['cmd'] = tomlkit.string(row['cmd'], multiline=True)
+        if '\n' in row['doc']:
+            tbl['doc'] = tomlkit.string(row['doc'], multiline=True)
+        items.append(tbl)
+    document.add('snippets', items)
+    with open(path, 'w') as fp:
+        fp.write(document.as_string())
+
+
+# format: (previous implementation, current implementation)
+EXPORTS: dict[str, tuple[Callable[[SnippetsDatabase, Path], None], Callable[[SnippetsDatabase, Path], None]]] = {
+    'xml': (minidom_xml_export, lambda db, path: XmlExporter(db).export(path)),
+    'toml': (tomlkit_toml_export, lambda db, path: TomlExporter(db).export(path)),
+}
+
+
+def measure(export: Callable[[SnippetsDatabase, Path], None], db: SnippetsDatabase, path: Path) -> tuple[float, int]:
+    start = time.perf_counter()
+    export(db, path)
+    elapsed = time.perf_counter() - start
+    # memory is traced in a separate run, since tracing slows python code down a lot
+    tracemalloc.start()
+    export(db, path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def report(label: str, rows: int, elapsed: float, peak: int):
+    print(f'{label:<16} {elapsed:7.2f}s  {rows / elapsed:9,.0f} rows/s  peak memory: {peak / 2**20:8.1f} MiB')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--format', choices=tuple(EXPORTS), action='append')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SnippetsDatabase.open(Path(tmp) / 'snippets.sqlite', {'journal_mode': 'wal'})
+        print(f'Inserting {args.rows:n} snippets...')
+        populate(db, args.rows)
+
+        for fmt in args.format or EXPORTS:
+            previous, current = EXPORTS[fmt]
+            previous_path, current_path = Path(tmp) / f'previous.{fmt}', Path(tmp) / f'current.{fmt}'
+            report(f'{fmt} (previous)', args.rows, *measure(previous, db, previous_path))
+            report(f'{fmt}', args.rows, *measure(current, db, current_path))
+            if previous_path.read_bytes() != current_path.read_bytes():
+                print(f'{fmt}: the outputs differ!')
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Measures the throughput and peak memory of the importers,
+against the implementations they replaced.
+
+Usage: python -m benchmarks.imports [--rows 100000] [--format json]
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from clisnips.database.snippets_db import SnippetsDatabase
+from clisnips.exporters import JsonExporter, JsonLinesExporter, TomlExporter, XmlExporter
+from clisnips.exporters.base import Exporter
+from clisnips.importers import JsonImporter, JsonLinesImporter, TomlImporter, XmlImporter
+from clisnips.importers.base import Importer, SnippetListAdapter
+
+from .export import populate, report
+
+
+class WholeFileJsonImporter(JsonImporter):
+    def import_path(self, path: Path):
+        with open(path) as fp:
+            data = SnippetListAdapter.validate_json(fp.read())
+            self._db.insert_many(data)
+            self._update_index(len(data))
+
+
+# format: (exporter, previous implementation, current implementation)
+IMPORTS: dict[str, tuple[type[Exporter], type[Importer] | None, type[Importer]]] = {
+    'json': (JsonExporter, WholeFileJsonImporter, JsonImporter),
+    'jsonl': (JsonLinesExporter, None, JsonLinesImporter),
+    'toml': (TomlExporter, None, TomlImporter),
+    'xml': (XmlExporter, None, XmlImporter),
+}
+
+
+def measure(importer: type[Importer], path: Path, tmp: Path) -> tuple[float, int, int]:
+    """
+    Returns the elapsed time, the peak traced memory and the number of imported rows.
+    """
+    db_path = tmp / 'imported.sqlite'
+
+    def run_once() -> SnippetsDatabase:
+        for suffix in ('', '-wal', '-shm'):
+            Path(f'{db_path}{suffix}').unlink(True)
+        db = SnippetsDatabase.open(db_path, {'journal_mode': 'wal'})
+        importer(db).import_path(path)
+        return db
+
+    start = time.perf_counter()
+    db = run_once()
+    elapsed = time.perf_counter() - start
+    rows = len(db)
+    db.close()
+    # memory is traced in a separate run, since tracing slows python code down a lot
+    tracemalloc.start()
+    run_once().close()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--format', choices=tuple(IMPORTS), action='append')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SnippetsDatabase.open(Path(tmp) / 'snippets.sqlite', {'journal_mode': 'wal'})
+        print(f'Inserting {args.rows:n} snippets...')
+        populate(db, args.rows)
+
+        for fmt in args.format or IMPORTS:
+            exporter, previous, current = IMPORTS[fmt]
+            path = Path(tmp) / f'snippets.{fmt}'
+            exporter(db).export(path)
+            for label, importer in ((f'{fmt} (previous)', previous), (fmt, current)):
+                if importer is None:
+                    continue
+                elapsed, peak, rows = measure(importer, path, Path(tmp))
+                report(label, rows, elapsed, peak)
+                if rows != args.rows:
+                    print(f'{label}: imported {rows:n} snippets instead of {args.rows:n}!')
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Measures the latency of flipping pages in the snippets list, with and without a search query.
+
+Usage: python -m benchmarks.page_flip [--rows 100000] [--flips 200]
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from clisnips.database import SortColumn, SortOrder
+from clisnips.database.search_pager import SearchPager
+from clisnips.database.snippets_db import SnippetsDatabase
+
+WORDS = ('git', 'docker', 'find', 'grep', 'sed', 'awk', 'ssh', 'tar', 'curl', 'jq', 'ps', 'kill')
+
+
+def populate(db: SnippetsDatabase, rows: int):
+    rng = random.Random(42)
+    now = int(time.time())
+    db.insert_many(
+        {
+            'title': ' '.join(rng.choices(WORDS, k=4)),
+            'cmd': ' '.join(rng.choices(WORDS, k=6)),
+            'tag': rng.choice(WORDS),
+            'doc': '',
+            'created_at': now - rng.randrange(86400 * 365),
+            'last_used_at': now - rng.randrange(86400 * 30),
+            'usage_count': rng.randrange(100),
+            'ranking': rng.random() * 1000,
+        }
+        for _ in range(rows)
+    )
+
+
+def measure(flip: Callable[[], object], flips: int) -> list[float]:
+    timings = []
+    for _ in range(flips):
+        start = time.perf_counter()
+        flip()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(label: str, timings: list[float]):
+    timings = sorted(t * 1000 for t in timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f'{label:<32} median: {statistics.median(timings):7.3f}ms  p95: {p95:7.3f}ms  max: {timings[-1]:7.3f}ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--flips', type=int, default=200)
+    parser.add_argument('--page-size', type=int, default=25)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SnippetsDatabase.open(Path(tmp) / 'snippets.sqlite', {'journal_mode': 'wal'})
+        print(f'Inserting {args.rows:n} snippets...')
+        populate(db, args.rows)
+        db.analyze()
+
+        for column in SortColumn:
+            pager = SearchPager(db, (column, SortOrder.DESC), args.page_size)
+            pager.list()
+            report(f'list by {column}: next', measure(pager.next, args.flips))
+            report(f'list by {column}: previous', measure(pager.previous, args.flips))
+
+        pager = SearchPager(db, (SortColumn.RANKING, SortOrder.DESC), args.page_size)
+        pager.search('git')
+        report('search "git": next', measure(pager.next, args.flips))
+        report('search "git": previous', measure(pager.previous, args.flips))
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -39,6 +39,9 @@ class Application:
         'logs': {
             'help': 'Watch clisnips TUI logs',
         },
+        'serve': {
+            'help': 'Runs the clisnips daemon, keeping the TUI warm for the shell key bindings.',
+        },
     }
 
     def run(self) -> int:
@@ -71,8 +74,8 @@ class Application:
     def _run_command(self, cls: type[Command], argv) -> int:
         from clisnips.log.cli import configure as configure_logging
 
-        dic = self._create_container(argv)
-        configure_logging(dic.markup_helper, argv.log_level or 'info', sys.stderr)
+        dic = self._create_container(argv, read_only=cls.read_only)
+        configure_logging(lambda: dic.markup_helper, argv.log_level or 'info', sys.stderr)
 
         logger.debug('launching command: %s', argv)
         command = cls(dic)
@@ -81,18 +84,27 @@ class Application:
         except Exception as err:
             logger.exception(err)
             return 128
+        finally:
+            dic.close()
 
     def _run_tui(self, argv) -> int:
         from clisnips.log.tui import configure as configure_logging
         from clisnips.tui.app import Application
 
-        dic = self._create_container(argv)
+        # browsing never needs the write lock, writes open their own short-lived connection
+        dic = self._create_container(argv, read_only=True)
         configure_logging(dic.config.log_file, argv.log_level)
 
         logging.getLogger(__name__).info('launching TUI')
         app = Application(dic)
-        return app.run()
+        try:
+            status = app.run()
+        finally:
+            dic.close()
+        if app.output is not None:
+            print(app.output)
+        return status
 
     @staticmethod
-    def _create_container(argv) -> DependencyInjectionContainer:
-        return DependencyInjectionContainer(database=argv.database)
+    def _create_container(argv, read_only: bool = False) -> DependencyInjectionContainer:
+        return DependencyInjectionContainer(database=argv.database, read_only=read_only)
@@ -1,7 +1,15 @@
-from clisnips.dic import DependencyInjectionContainer
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from clisnips.dic import DependencyInjectionContainer
 
 
 class Command:
+    # Whether the command only reads from the database.
+    read_only: bool = False
+
     def __init__(self, dic: DependencyInjectionContainer):
         self.container = dic
 
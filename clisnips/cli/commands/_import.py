@@ -1,6 +1,8 @@
 import argparse
+import json
 import logging
-import shutil
+import sqlite3
+from contextlib import closing
 from pathlib import Path
 
 from pydantic import ValidationError
@@ -13,7 +15,7 @@ logger = logging.getLogger(__name__)
 
 
 def configure(cmd: argparse.ArgumentParser):
-    cmd.add_argument('-f', '--format', choices=('xml', 'json', 'toml', 'cli-companion'), default=None)
+    cmd.add_argument('-f', '--format', choices=('xml', 'json', 'jsonl', 'toml', 'cli-companion'), default=None)
     cmd.add_argument('--replace', action='store_true', help='Replaces snippets. The default is to append.')
     cmd.add_argument('-D', '--dry-run', action='store_true', help='Just pretend.')
     cmd.add_argument('file', type=Path)
@@ -39,8 +41,9 @@ class ImportCommand(Command):
             db = self.container.database
 
         try:
-            cls(db, dry_run=argv.dry_run).import_path(argv.file)
-        except ValidationError as err:
+            rebuild_threshold = self.container.config.index.rebuild_threshold
+            cls(db, dry_run=argv.dry_run, rebuild_threshold=rebuild_threshold).import_path(argv.file)
+        except (ValidationError, json.JSONDecodeError) as err:
             logger.error(err)
             return 128
 
@@ -52,6 +55,10 @@ class ImportCommand(Command):
                 from clisnips.importers import JsonImporter
 
                 return JsonImporter
+            case ('jsonl', _) | (None, '.jsonl'):
+                from clisnips.importers import JsonLinesImporter
+
+                return JsonLinesImporter
             case ('toml', _) | (None, '.toml'):
                 from clisnips.importers import TomlImporter
 
@@ -72,11 +79,15 @@ class ImportCommand(Command):
 
         logger.warning(f'Backing up database to {backup_path}')
         if not dry_run:
-            shutil.copyfile(db_path, backup_path)
+            # in WAL mode, committed transactions may still live in the write-ahead log,
+            # so let SQLite produce a consistent copy.
+            with closing(sqlite3.connect(db_path)) as src, closing(sqlite3.connect(backup_path)) as dst:
+                src.backup(dst)
 
         logger.warning('Dropping database!')
         if not dry_run:
-            Path(db_path).unlink(True)
+            for suffix in ('', '-wal', '-shm'):
+                Path(f'{db_path}{suffix}').unlink(True)
 
     def _get_backup_path(self, path: AnyPath) -> Path:
         backup_path = Path(path).with_suffix('.bak')
@@ -18,6 +18,8 @@ def configure(cmd: argparse.ArgumentParser):
 
 
 class DumpCommand(Command):
+    read_only = True
+
     def run(self, argv) -> int:
         start_time = time.time()
         logger.info(f'Dumping database to {argv.file}')
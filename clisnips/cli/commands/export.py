@@ -8,13 +8,15 @@ logger = logging.getLogger(__name__)
 
 
 def configure(cmd: argparse.ArgumentParser):
-    cmd.add_argument('-f', '--format', choices=('xml', 'json', 'toml'), default=None)
-    cmd.add_argument('file', type=Path)
+    cmd.add_argument('-f', '--format', choices=('xml', 'json', 'jsonl', 'toml'), default=None)
+    cmd.add_argument('file', type=Path, help='The file to export to, or - for the standard output.')
 
     return ExportCommand
 
 
 class ExportCommand(Command):
+    read_only = True
+
     def run(self, argv) -> int:
         cls = self._get_exporter_class(argv.format, argv.file.suffix)
         if not cls:
@@ -33,6 +35,10 @@ class ExportCommand(Command):
                 from clisnips.exporters import JsonExporter
 
                 return JsonExporter
+            case ('jsonl', _) | (None, '.jsonl'):
+                from clisnips.exporters import JsonLinesExporter
+
+                return JsonLinesExporter
             case ('toml', _) | (None, '.toml'):
                 from clisnips.exporters import TomlExporter
 
@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import argparse
 import asyncio
 import logging
@@ -6,9 +8,12 @@ import struct
 import sys
 from logging import LogRecord
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from clisnips.cli.command import Command
-from ..utils import UrwidMarkupHelper
+
+if TYPE_CHECKING:
+    from ..utils import UrwidMarkupHelper
 
 
 def configure(_: argparse.ArgumentParser):
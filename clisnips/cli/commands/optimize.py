@@ -9,15 +9,39 @@ logger = logging.getLogger(__name__)
 
 def configure(cmd: argparse.ArgumentParser):
     cmd.add_argument('--rebuild', action='store_true', help='Rebuilds the search index before optimizing.')
+    cmd.add_argument(
+        '--rerank',
+        action='store_true',
+        help='Re-estimates the rankings that are inconsistent with the usage statistics of their snippet.',
+    )
+    cmd.add_argument(
+        '--stats',
+        action='store_true',
+        help='Shows the segments of the search index instead of optimizing.',
+    )
 
     return OptimizeCommand
 
 
 class OptimizeCommand(Command):
     def run(self, argv) -> int:
+        if argv.stats:
+            return self._print_stats()
+
         start_time = time.time()
 
         db = self.container.database
+        if argv.rerank:
+            logger.info('Reranking snippets')
+            rerank_start = time.perf_counter()
+            checked, updated = db.rerank()
+            rerank_elapsed = time.perf_counter() - rerank_start
+            rate = checked / rerank_elapsed if rerank_elapsed else 0.0
+            logger.info(
+                f'Checked {checked} snippets in {rerank_elapsed:.2f} seconds ({rate:.0f} rows/sec), '
+                f're-estimated {updated} rankings.'
+            )
+
         if argv.rebuild:
             logger.info('Rebuilding search index')
             db.rebuild_index()
@@ -25,6 +49,23 @@ class OptimizeCommand(Command):
         logger.info('Optimizing search index')
         db.optimize_index()
 
+        logger.info('Analyzing database')
+        db.analyze()
+
         elapsed = time.time() - start_time
         logger.info(f'Done in {elapsed:.1f} seconds.', extra={'color': 'success'})
         return 0
+
+    def _print_stats(self) -> int:
+        db = self.container.database
+        structure = db.index_structure()
+        self.print(('accent', 'Search index:'), f'{structure.segment_count} segments, {structure.page_count} pages')
+        for i, level in enumerate(structure.levels):
+            if not level.segments:
+                continue
+            pages = ', '.join(str(s.page_count) for s in level.segments)
+            merging = f' ({level.merging} being merged)' if level.merging else ''
+            self.print(f'  level {i}: {len(level.segments)} segments{merging}, pages: {pages}')
+        tuning = ', '.join(f'{k}={v}' for k, v in self.container.config.index_tuning.items())
+        self.print(('accent', 'Merge options:'), tuning)
+        return 0
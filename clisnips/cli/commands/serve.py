@@ -0,0 +1,28 @@
+import argparse
+import logging
+
+from clisnips.cli.command import Command
+
+logger = logging.getLogger(__name__)
+
+
+def configure(cmd: argparse.ArgumentParser):
+    return ServeCommand
+
+
+class ServeCommand(Command):
+    read_only = True
+
+    def run(self, argv) -> int:
+        from clisnips.daemon.server import Server, ServerAlreadyRunning
+
+        server = Server(self.container, self.container.config.server_socket)
+        try:
+            server.serve_forever()
+        except ServerAlreadyRunning as err:
+            logger.error(str(err))
+            return 1
+        except (KeyboardInterrupt, SystemExit):
+            ...
+
+        return 0
@@ -1,19 +1,33 @@
+from __future__ import annotations
+
 import json
+from functools import cached_property
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from clisnips.ty import AnyPath
 
 from .envs import DB_PATH
-from .palette import Palette
 from .paths import get_config_path, get_runtime_path
-from .settings import AppSettings
+
+if TYPE_CHECKING:
+    from clisnips.database import ConnectionProfile, IndexTuning, RelevanceWeights
+
+    from .palette import Palette
+    from .settings import AppSettings, IndexSettings, SearchSettings
 
 SCHEMA_BASE_URI = 'https://raw.githubusercontent.com/ju1ius/clisnips/master/schemas'
 
 
 class Config:
-    def __init__(self):
-        self._cfg = _load_settings()
+    """
+    Settings are validated on first access, so commands that only need
+    the database path from the environment never import pydantic.
+    """
+
+    @cached_property
+    def _cfg(self) -> AppSettings:
+        return _load_settings()
 
     @property
     def database_path(self) -> AnyPath:
@@ -24,6 +38,28 @@ class Config:
             return path
         return Path(path).expanduser().absolute()
 
+    @property
+    def connection_profile(self) -> ConnectionProfile:
+        return self._cfg.sqlite.model_dump()  # type: ignore
+
+    @property
+    def search(self) -> SearchSettings:
+        return self._cfg.search
+
+    @property
+    def relevance_weights(self) -> RelevanceWeights:
+        from clisnips.database import RelevanceWeights
+
+        return RelevanceWeights(**self._cfg.search.relevance.model_dump())
+
+    @property
+    def index(self) -> IndexSettings:
+        return self._cfg.index
+
+    @property
+    def index_tuning(self) -> IndexTuning:
+        return self._cfg.index.model_dump(include={'automerge', 'crisismerge', 'usermerge'})  # type: ignore
+
     @property
     def palette(self) -> Palette:
         return self._cfg.palette.resolved()
@@ -32,16 +68,29 @@ class Config:
     def log_file(self) -> Path:
         return get_runtime_path('logs.sock')
 
+    @property
+    def server_socket(self) -> Path:
+        return get_server_socket_path()
+
     def write(self, fp):
         data = {
             '$schema': f'{SCHEMA_BASE_URI}/settings.json',
             'database': str(self.database_path),
+            'sqlite': self._cfg.sqlite.model_dump(),
+            'search': self._cfg.search.model_dump(),
+            'index': self._cfg.index.model_dump(),
             'palette': self._cfg.palette.model_dump(),
         }
         json.dump(data, fp, indent=2)
 
 
+def get_server_socket_path() -> Path:
+    return get_runtime_path('server.sock')
+
+
 def _load_settings() -> AppSettings:
+    from .settings import AppSettings
+
     match get_config_path('settings.json'):
         case p if p.exists():
             with open(p) as fp:
@@ -43,6 +43,9 @@ default_palette = {
     'snippets-list:title:focused': {'fg': 'light gray,italics', 'bg': 'dark gray', 'mono': 'standout,italics'},
     'snippets-list:tag': 'snip:tag',
     'snippets-list:tag:focused': {'fg': 'brown', 'bg': 'dark gray', 'mono': 'standout'},
+    'snippets-list:match': {'fg': 'yellow,bold', 'bg': 'black', 'mono': 'bold'},
+    'snippets-list:match:focused': {'fg': 'yellow,bold', 'bg': 'dark gray', 'mono': 'standout,bold'},
+    'tags-list:focused': {'fg': 'light gray', 'bg': 'dark gray', 'mono': 'standout'},
 
     # widgets
     'dialog': 'default',
@@ -1,15 +1,146 @@
+from typing import Literal
+
 from pydantic import BaseModel, ConfigDict, Field
 
 from .palette import PaletteModel, default_palette
 from .paths import get_data_path
 
 
+class SqliteSettings(BaseModel):
+    model_config = ConfigDict(title='SQLite connection settings.')
+    journal_mode: Literal['delete', 'truncate', 'persist', 'memory', 'wal', 'off'] = Field(
+        title='The journal mode of the database',
+        description='In WAL mode, readers (like the TUI) are never blocked by a writer (like an import).',
+        default='wal',
+    )
+    synchronous: Literal['off', 'normal', 'full', 'extra'] = Field(
+        title='How often SQLite syncs the database to disk',
+        description='NORMAL is safe from corruption in WAL mode and avoids a sync on every commit.',
+        default='normal',
+    )
+    cache_size: int = Field(
+        title='Size of the page cache',
+        description='Positive values are a number of pages, negative values a number of KiB.',
+        default=-8000,
+    )
+    mmap_size: int = Field(
+        title='Maximum number of bytes of the database to access through memory-mapped I/O',
+        description='Set to zero to disable memory-mapped I/O.',
+        default=256 * 1024 * 1024,
+        ge=0,
+    )
+    temp_store: Literal['default', 'file', 'memory'] = Field(
+        title='Where temporary tables and indices are stored',
+        default='memory',
+    )
+
+
+class RelevanceSettings(BaseModel):
+    model_config = ConfigDict(title='Weights of the snippet fields when sorting search results by relevance.')
+    title: float = Field(default=10.0, ge=0)
+    tag: float = Field(default=5.0, ge=0)
+    cmd: float = Field(default=2.0, ge=0)
+    doc: float = Field(default=1.0, ge=0)
+
+
+class SearchSettings(BaseModel):
+    model_config = ConfigDict(title='Search settings.')
+    lazy_count: bool = Field(
+        title='Count the search results after displaying the first page',
+        description='Displays the results faster on large databases, the number of pages being updated afterwards.',
+        default=True,
+    )
+    mode: Literal['fts', 'fuzzy'] = Field(
+        title='How search terms match snippets',
+        description=(
+            '"fts" uses the full-text search index and its query syntax, '
+            '"fuzzy" matches the snippets containing the characters of each term in order, i.e. `dcup` -> "docker compose up".'
+        ),
+        default='fts',
+    )
+    fuzzy_workers: int = Field(
+        title='Number of processes scoring fuzzy matches',
+        description=(
+            'Values above 1 split fuzzy search between that many processes on databases of 50k snippets or more, '
+            'each scoring the 1000 most popular matches of its part of the database.'
+        ),
+        default=0,
+        ge=0,
+    )
+    prefix_search: bool = Field(
+        title='Match the words starting with the search terms',
+        description='Search terms that are not quoted match the words they start, i.e. `dock` matches `docker`.',
+        default=True,
+    )
+    debounce_delay: int = Field(
+        title='Delay in milliseconds between the last keystroke and searching',
+        description='Searching as you type waits for the user to stop typing for this long.',
+        default=150,
+        ge=0,
+    )
+    relevance: RelevanceSettings = Field(default_factory=RelevanceSettings)
+
+
+class IndexSettings(BaseModel):
+    model_config = ConfigDict(title='Search index maintenance settings.')
+    automerge: int = Field(
+        title='Number of segments of a level that are merged while writing',
+        description='Set to zero to disable automatic merges.',
+        default=4,
+        ge=0,
+        le=16,
+    )
+    crisismerge: int = Field(
+        title='Number of segments of a level that are merged at once in a single write',
+        default=16,
+        ge=2,
+    )
+    usermerge: int = Field(
+        title='Minimum number of segments of a level for an incremental merge to merge them',
+        default=4,
+        ge=2,
+        le=16,
+    )
+    idle_merge_pages: int = Field(
+        title='Number of index pages merged by each incremental merge while the TUI is idle',
+        description='Set to zero to disable merging the index while idle.',
+        default=64,
+        ge=0,
+    )
+    idle_merge_delay: int = Field(
+        title='Delay in milliseconds since the last keystroke after which the TUI is considered idle',
+        default=2000,
+        ge=0,
+    )
+    rebuild_threshold: int = Field(
+        title='Minimum number of imported snippets for which the search index is rebuilt',
+        description='Smaller imports are indexed incrementally.',
+        default=10_000,
+        ge=0,
+    )
+
+
 class AppSettings(BaseModel):
     model_config = ConfigDict(title='Clisnips configuration settings.')
     database: str = Field(
         title='Path to the snippets SQLite database',
         default_factory=lambda: str(get_data_path('snippets.sqlite')),
     )
+    sqlite: SqliteSettings = Field(
+        title='Tuning of the SQLite connection',
+        default_factory=SqliteSettings,
+        json_schema_extra={'default': {}},
+    )
+    search: SearchSettings = Field(
+        title='Search settings',
+        default_factory=SearchSettings,
+        json_schema_extra={'default': {}},
+    )
+    index: IndexSettings = Field(
+        title='Search index maintenance settings',
+        default_factory=IndexSettings,
+        json_schema_extra={'default': {}},
+    )
     palette: PaletteModel = Field(  # type: ignore
         title='The application color palette',
         default_factory=lambda: PaletteModel(**default_palette),
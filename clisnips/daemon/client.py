@@ -0,0 +1,68 @@
+"""
+Thin client for the clisnips daemon.
+
+It hands the current terminal over to a running `clisnips serve` process
+and prints the selected snippet, just like the `clisnips` command does.
+When no daemon is available, it falls back to running the regular clisnips TUI.
+
+This module is what the shell key bindings run, so it must not import any third-party package:
+`clisnips.config` only loads pydantic when the settings are accessed, which finding the socket path doesn't do.
+"""
+
+import os
+import signal
+import socket
+import sys
+from typing import NoReturn
+
+from clisnips.config import get_server_socket_path
+
+from .protocol import recv_message, send_message
+
+
+def main() -> NoReturn:
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(str(get_server_socket_path()))
+    except OSError:
+        _fallback()
+
+    with sock:
+        try:
+            send_message(
+                sock,
+                {'type': 'attach', 'term': os.environ.get('TERM', '')},
+                (sys.stdin.fileno(), sys.stderr.fileno()),
+            )
+        except OSError:
+            _fallback()
+
+        def on_resize(signum, frame):
+            send_message(sock, {'type': 'resize'})
+
+        def on_terminate(signum, frame):
+            send_message(sock, {'type': 'terminate'})
+
+        signal.signal(signal.SIGWINCH, on_resize)
+        for signum in (signal.SIGINT, signal.SIGQUIT, signal.SIGTERM, signal.SIGHUP):
+            signal.signal(signum, on_terminate)
+
+        while True:
+            message, _ = recv_message(sock)
+            match message:
+                case None:
+                    sys.exit(1)
+                case {'type': 'busy'}:
+                    _fallback()
+                case {'type': 'exit', 'status': status, 'output': output}:
+                    if output is not None:
+                        print(output)
+                    sys.exit(status)
+
+
+def _fallback() -> NoReturn:
+    os.execv(sys.executable, [sys.executable, '-m', 'clisnips', *sys.argv[1:]])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Wire protocol between the clisnips daemon and its clients.
+
+Messages are JSON objects prefixed by their length as a 4-byte big-endian integer.
+The `attach` message carries the client's terminal file descriptors as ancillary data.
+
+This module is imported by the thin client, so it must only depend on the standard library.
+"""
+
+import json
+import socket
+import struct
+from collections.abc import Sequence
+from typing import Literal, TypedDict
+
+HEADER = struct.Struct('>L')
+MAX_FDS = 2
+
+
+class AttachMessage(TypedDict):
+    type: Literal['attach']
+    term: str
+
+
+class ResizeMessage(TypedDict):
+    type: Literal['resize']
+
+
+class TerminateMessage(TypedDict):
+    type: Literal['terminate']
+
+
+class BusyMessage(TypedDict):
+    type: Literal['busy']
+
+
+class ExitMessage(TypedDict):
+    type: Literal['exit']
+    status: int
+    output: str | None
+
+
+ClientMessage = AttachMessage | ResizeMessage | TerminateMessage
+ServerMessage = BusyMessage | ExitMessage
+Message = ClientMessage | ServerMessage
+
+
+def send_message(sock: socket.socket, message: Message, fds: Sequence[int] = ()):
+    data = json.dumps(message).encode('utf-8')
+    payload = HEADER.pack(len(data)) + data
+    if fds:
+        socket.send_fds(sock, [payload], fds)
+    else:
+        sock.sendall(payload)
+
+
+def recv_message(sock: socket.socket) -> tuple[Message | None, list[int]]:
+    """
+    Reads the next message from the socket.
+
+    Returns `None` as the message if the peer closed the connection.
+    """
+    header, fds, _, _ = socket.recv_fds(sock, HEADER.size, MAX_FDS)
+    if not header:
+        return None, fds
+    header += _recv_exactly(sock, HEADER.size - len(header))
+    (size,) = HEADER.unpack(header)
+    data = _recv_exactly(sock, size)
+    return json.loads(data), fds
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionResetError('Connection closed in the middle of a message.')
+        buf += chunk
+    return bytes(buf)
@@ -0,0 +1,156 @@
+import logging
+import os
+import signal
+import socket
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import urwid
+
+from clisnips.dic import DependencyInjectionContainer
+from clisnips.tui.app import Application
+from clisnips.tui.loop import get_event_loop
+
+from .protocol import AttachMessage, recv_message, send_message
+
+logger = logging.getLogger(__name__)
+
+
+class ServerAlreadyRunning(RuntimeError):
+    def __init__(self, path: Path):
+        super().__init__(f'A clisnips server is already listening on {path}')
+
+
+class Server:
+    """
+    Keeps the dependency container, the database connection and the snippets store resident,
+    and runs a TUI session on the terminal of each client that attaches to it.
+
+    Sessions are served one at a time. Clients connecting while a session is running
+    are told the server is busy, and fall back to running clisnips themselves.
+    """
+
+    def __init__(self, dic: DependencyInjectionContainer, socket_path: Path):
+        self._container = dic
+        self._socket_path = socket_path
+        self._listener: socket.socket | None = None
+
+    def serve_forever(self):
+        self._listener = self._listen()
+        logger.info(f'Listening on {self._socket_path}')
+        # warm up the database, pager and store before the first client attaches
+        self._container.snippets_store
+        try:
+            while True:
+                conn, _ = self._listener.accept()
+                with conn:
+                    try:
+                        self._handle_client(conn)
+                    except Exception as err:
+                        logger.exception(err)
+                # the client is gone, so this is a good time for some housekeeping
+                self._container.database.optimize()
+        finally:
+            self._listener.close()
+            self._socket_path.unlink(True)
+
+    def _listen(self) -> socket.socket:
+        if self._socket_path.exists():
+            if self._is_alive():
+                raise ServerAlreadyRunning(self._socket_path)
+            self._socket_path.unlink()
+        self._socket_path.parent.mkdir(parents=True, exist_ok=True)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(str(self._socket_path))
+        os.chmod(self._socket_path, 0o600)
+        sock.listen()
+        return sock
+
+    def _is_alive(self) -> bool:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(str(self._socket_path))
+            except OSError:
+                return False
+            return True
+
+    def _handle_client(self, conn: socket.socket):
+        try:
+            message, fds = recv_message(conn)
+        except (OSError, ValueError) as err:
+            logger.warning(f'Invalid client request: {err}')
+            return
+        match message:
+            case {'type': 'attach'} if len(fds) == 2:
+                status, output = self._run_session(conn, message, fds)  # type: ignore
+                try:
+                    send_message(conn, {'type': 'exit', 'status': status, 'output': output})
+                except OSError:
+                    logger.debug('client disconnected before the end of the session')
+            case _:
+                logger.warning(f'Invalid client request: {message!r}')
+                for fd in fds:
+                    os.close(fd)
+
+    def _run_session(self, conn: socket.socket, message: AttachMessage, fds: list[int]) -> tuple[int, str | None]:
+        logger.debug('client attached')
+        with _terminal_type(message['term']), os.fdopen(fds[0], 'r') as tty_in, os.fdopen(fds[1], 'w') as tty_out:
+            screen = urwid.raw_display.Screen(input=tty_in, output=tty_out)
+            app = Application(self._container, screen)
+            self._container.snippets_store.change_search_query('')
+
+            def on_client_message():
+                try:
+                    msg, _ = recv_message(conn)
+                except OSError:
+                    msg = None
+                match msg:
+                    case {'type': 'resize'}:
+                        screen._sigwinch_handler(signal.SIGWINCH, None)
+                    case {'type': 'terminate'} | None:
+                        app.ui.stop()
+
+            loop = get_event_loop()
+            handles = (
+                loop.watch_file(conn.fileno(), on_client_message),
+                loop.watch_file(self._listener.fileno(), self._reject_client),  # type: ignore
+            )
+            try:
+                status = app.run()
+            except Exception as err:
+                logger.exception(err)
+                return 128, None
+            finally:
+                for handle in handles:
+                    loop.remove_watch_file(handle)
+        logger.debug('client detached')
+        return status, app.output
+
+    def _reject_client(self):
+        conn, _ = self._listener.accept()  # type: ignore
+        with conn:
+            try:
+                _, fds = recv_message(conn)
+                for fd in fds:
+                    os.close(fd)
+                send_message(conn, {'type': 'busy'})
+            except (OSError, ValueError) as err:
+                logger.warning(f'Invalid client request: {err}')
+
+
+@contextmanager
+def _terminal_type(term: str) -> Iterator[None]:
+    """
+    urwid reads the terminal type from the environment,
+    so the client's one replaces the server's own for the duration of a session.
+    """
+    previous = os.environ.get('TERM')
+    os.environ['TERM'] = term
+    try:
+        yield
+    finally:
+        if previous is None:
+            del os.environ['TERM']
+        else:
+            os.environ['TERM'] = previous
@@ -1,9 +1,8 @@
-import time
 from enum import StrEnum, auto
-from typing import Self
+from typing import TYPE_CHECKING, Literal, NamedTuple, Self, TypedDict
 
-from pydantic import Field
-from typing_extensions import Annotated, TypedDict  # noqa: UP035 (pydantic needs this)
+if TYPE_CHECKING:
+    from .importable import ImportableSnippet  # noqa: F401 (resolved lazily by __getattr__)
 
 
 class ScrollDirection(StrEnum):
@@ -44,7 +43,7 @@ class Column(StrEnum):
     ID = 'rowid'
     TITLE = auto()
     CMD = auto()
-    TAGS = auto()
+    TAG = auto()
     DOC = auto()
     RANKING = auto()
     USAGE_COUNT = auto()
@@ -57,6 +56,45 @@ class SortColumn(StrEnum):
     USAGE_COUNT = str(Column.USAGE_COUNT)
     LAST_USED_AT = str(Column.LAST_USED_AT)
     CREATED_AT = str(Column.CREATED_AT)
+    # only meaningful when searching, see `RelevanceWeights`
+    RELEVANCE = 'relevance'
+
+
+class RelevanceWeights(NamedTuple):
+    """
+    Weights of the search index columns when computing the relevance of search results.
+    """
+
+    title: float = 10.0
+    tag: float = 5.0
+    cmd: float = 2.0
+    doc: float = 1.0
+
+
+class SnippetHighlights(TypedDict):
+    """
+    The parts of a search result matched by the search terms.
+
+    Each field is split into alternating unmatched and matched parts, i.e. `['', 'dock', 'er ps']`.
+    """
+
+    title: list[str]
+    tag: list[str]
+    cmd: list[str]
+
+
+class TagFilter(NamedTuple):
+    """
+    Restricts search results to the snippets with the given tag, or a tag starting with it.
+    """
+
+    name: str
+    prefix: bool = False
+
+
+class TagCount(TypedDict):
+    name: str
+    count: int
 
 
 class Snippet(TypedDict):
@@ -71,6 +109,29 @@ class Snippet(TypedDict):
     ranking: float
 
 
+class SnippetListing(TypedDict):
+    """
+    A snippet without its documentation, as displayed in the snippets list.
+    """
+
+    id: int
+    title: str
+    cmd: str
+    tag: str
+    created_at: int
+    last_used_at: int
+    usage_count: int
+    ranking: float
+
+
+class SnippetStats(TypedDict):
+    id: int
+    created_at: int
+    last_used_at: int
+    usage_count: int
+    ranking: float
+
+
 class NewSnippet(TypedDict):
     title: str
     cmd: str
@@ -78,12 +139,34 @@ class NewSnippet(TypedDict):
     doc: str
 
 
-class ImportableSnippet(TypedDict):
-    title: Annotated[str, Field(min_length=1)]
-    cmd: Annotated[str, Field(min_length=1)]
-    tag: Annotated[str, Field(default='')]
-    doc: Annotated[str, Field(default='')]
-    created_at: Annotated[int, Field(ge=0, default_factory=lambda: int(time.time()))]
-    last_used_at: Annotated[int, Field(ge=0, default=0)]
-    usage_count: Annotated[int, Field(ge=0, default=0)]
-    ranking: Annotated[float, Field(ge=0.0, default=0.0)]
+class ConnectionProfile(TypedDict, total=False):
+    """
+    SQLite pragmas applied to every connection to the snippets database.
+    """
+
+    journal_mode: Literal['delete', 'truncate', 'persist', 'memory', 'wal', 'off']
+    synchronous: Literal['off', 'normal', 'full', 'extra']
+    cache_size: int
+    mmap_size: int
+    temp_store: Literal['default', 'file', 'memory']
+
+
+class IndexTuning(TypedDict, total=False):
+    """
+    FTS5 options controlling how the segments of the search index are merged.
+
+    They are persisted in the database, see https://sqlite.org/fts5.html#the_automerge_configuration_option
+    """
+
+    automerge: int
+    crisismerge: int
+    usermerge: int
+
+
+def __getattr__(name: str):
+    # ImportableSnippet is validated by pydantic, which we only need when importing snippets.
+    if name == 'ImportableSnippet':
+        from .importable import ImportableSnippet
+
+        return ImportableSnippet
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,52 @@
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Mapping
+
+from .snippets_db import QueryParameters
+
+CacheKey = tuple[str, tuple]
+
+
+class CountCache:
+    """
+    Caches the results of count queries until the database changes.
+
+    `version` must return a value that changes whenever the database is written to,
+    like `SnippetsDatabase.data_version`.
+    """
+
+    def __init__(self, version: Callable[[], Hashable], max_size: int = 128):
+        self._version = version
+        self._max_size = max_size
+        self._cached_version: Hashable = None
+        self._counts: OrderedDict[CacheKey, int] = OrderedDict()
+
+    def get(self, query: str, params: QueryParameters) -> int | None:
+        self._check_version()
+        key = _make_key(query, params)
+        if (count := self._counts.get(key)) is not None:
+            self._counts.move_to_end(key)
+        return count
+
+    def set(self, query: str, params: QueryParameters, count: int):
+        self._check_version()
+        self._counts[_make_key(query, params)] = count
+        if len(self._counts) > self._max_size:
+            self._counts.popitem(last=False)
+
+    def clear(self):
+        self._counts.clear()
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def _check_version(self):
+        version = self._version()
+        if version != self._cached_version:
+            self._counts.clear()
+            self._cached_version = version
+
+
+def _make_key(query: str, params: QueryParameters) -> CacheKey:
+    if isinstance(params, Mapping):
+        return query, tuple(sorted(params.items()))
+    return query, tuple(params)
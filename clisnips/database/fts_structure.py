@@ -0,0 +1,96 @@
+"""
+Decodes the structure record of an FTS5 index, which lists the b-tree segments of the index.
+
+See the comments at the top of `ext/fts5/fts5_index.c` in the SQLite sources for the format.
+"""
+
+import sqlite3
+from typing import NamedTuple
+
+# rowid of the structure record in the %_data table
+STRUCTURE_ROWID = 10
+# marks the structure records that hold additional per-segment fields (SQLite >= 3.45)
+_V2_MARKER = b'\xff\x00\x00\x01'
+
+
+class Segment(NamedTuple):
+    id: int
+    first_page: int
+    last_page: int
+
+    @property
+    def page_count(self) -> int:
+        return self.last_page - self.first_page + 1
+
+
+class Level(NamedTuple):
+    # number of segments of this level being merged into the next one
+    merging: int
+    segments: tuple[Segment, ...]
+
+    @property
+    def page_count(self) -> int:
+        return sum(s.page_count for s in self.segments)
+
+
+class IndexStructure(NamedTuple):
+    write_counter: int
+    levels: tuple[Level, ...]
+
+    @property
+    def segment_count(self) -> int:
+        return sum(len(level.segments) for level in self.levels)
+
+    @property
+    def page_count(self) -> int:
+        return sum(level.page_count for level in self.levels)
+
+
+def read_structure(cx: sqlite3.Connection, table: str = 'snippets_index') -> IndexStructure:
+    row = cx.execute(f'SELECT block FROM {table}_data WHERE id = ?', (STRUCTURE_ROWID,)).fetchone()
+    if row is None:
+        return IndexStructure(0, ())
+    return decode_structure(row[0])
+
+
+def decode_structure(record: bytes) -> IndexStructure:
+    # skips the configuration cookie
+    pos = 4
+    v2 = record[pos : pos + 4] == _V2_MARKER
+    if v2:
+        pos += 4
+    level_count, pos = _read_varint(record, pos)
+    _, pos = _read_varint(record, pos)  # total number of segments
+    write_counter, pos = _read_varint(record, pos)
+    if v2:
+        _, pos = _read_varint(record, pos)  # origin counter
+    levels: list[Level] = []
+    for _ in range(level_count):
+        merging, pos = _read_varint(record, pos)
+        segment_count, pos = _read_varint(record, pos)
+        segments: list[Segment] = []
+        for _ in range(segment_count):
+            segment_id, pos = _read_varint(record, pos)
+            first_page, pos = _read_varint(record, pos)
+            last_page, pos = _read_varint(record, pos)
+            if v2:
+                # origin range, tombstone pages and entries, number of entries
+                for _ in range(5):
+                    _, pos = _read_varint(record, pos)
+            segments.append(Segment(segment_id, first_page, last_page))
+        levels.append(Level(merging, tuple(segments)))
+    return IndexStructure(write_counter, tuple(levels))
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    """
+    Reads an SQLite variable-length integer: big-endian groups of 7 bits,
+    the high bit being set on every byte but the last, and the 9th byte contributing 8 bits.
+    """
+    value = 0
+    for i in range(8):
+        byte = data[pos + i]
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            return value, pos + i + 1
+    return (value << 8) | data[pos + 8], pos + 9
@@ -0,0 +1,408 @@
+"""
+Fuzzy search, i.e. `dcup` matching "docker compose up".
+
+A search term matches a snippet when its characters appear in order in the snippet's title, tag or command.
+Matches are scored like fzf does: the fewer characters between the matched ones, the better,
+with a bonus for matches starting at the beginning of a word.
+
+Snippets are kept in memory as a single string with one line per snippet, so that most of the work
+is done by the regular expression engine, which finds the lines matching the search terms.
+Scoring happens in Python though, so only the first `MAX_MATCHES` matches (by popularity) are scored.
+This bounds the work done for short, unselective queries, and the limit stops mattering as the query grows.
+
+Searching as you type only scans the whole corpus once per query: each query extending the previous one
+searches the previous matches, then resumes scanning the corpus where the previous search stopped.
+
+Large corpora can instead be split between worker processes, which receive the corpus once when they start.
+Each of them then scans its part of the corpus and scores its first `MAX_MATCHES` matches,
+which divides the time taken by selective queries, and widens the set of matches that unselective ones score.
+"""
+
+import heapq
+import json
+import multiprocessing
+import re
+from bisect import bisect_right
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import accumulate, chain
+from math import ceil
+from typing import Any
+
+from . import SnippetListing
+from .projection import LISTING
+from .snippets_db import SnippetsDatabase
+
+# (cost, position of the match in the line, line number in the corpus), lower is better
+Match = tuple[int, int, int]
+
+# maximum number of matches to score and return
+MAX_MATCHES = 1000
+# cost of a match that doesn't start at the beginning of a word
+NOT_A_WORD_START_COST = 2
+# minimum number of snippets to split between worker processes
+PARALLEL_THRESHOLD = 50_000
+
+
+def _chain(term: str) -> str:
+    # Possessive quantifiers find the first occurrence of each character without backtracking.
+    return ''.join(f'[^\\n{c}]*+{c}' for c in map(re.escape, term))
+
+
+@lru_cache(maxsize=64)
+def _compile_terms(terms: tuple[str, ...], anchored: bool) -> re.Pattern[str]:
+    """
+    Compiles a pattern matching the lines containing all the terms, where group `i` marks the end of term `i - 1`.
+    The rest of the line is consumed so that each line matches at most once.
+
+    Unless `anchored`, the pattern starts with the first character of the only term,
+    so that the regex engine can quickly skip to the candidates.
+    When that character occurs several times per line though, the engine would try the rest of the term
+    from each of them, so anchored patterns start at the newline preceding each line instead,
+    and find each term from there.
+    """
+    if anchored:
+        return re.compile('\\n{}[^\\n]*+'.format(''.join(f'(?={_chain(t)}())' for t in terms)))
+    (term,) = terms
+    return re.compile(f'{re.escape(term[0])}{_chain(term[1:])}()[^\\n]*+')
+
+
+def _split_terms(query: str) -> tuple[str, ...]:
+    # the longest term is the most selective
+    return tuple(sorted(query.lower().split(), key=len, reverse=True))
+
+
+class Corpus:
+    """
+    A set of lines to search, along with the snippet each of them belongs to.
+
+    The text starts with a newline, and `offsets` holds the position of the newline preceding each line,
+    followed by the length of the text.
+    """
+
+    __slots__ = ('lines', 'indices', 'text', 'offsets', '_char_counts')
+
+    def __init__(self, lines: Sequence[str], indices: Sequence[int]):
+        self.lines = lines
+        self.indices = indices
+        self.text = '\n' + '\n'.join(lines)
+        self.offsets = list(accumulate((len(line) + 1 for line in lines), initial=0))
+        self._char_counts: dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.lines)
+
+    def search(
+        self, terms: Sequence[str], limit: int, from_line: int = 0, to_line: int | None = None
+    ) -> tuple[list[Match], int]:
+        """
+        Returns the matches of all the terms in the first lines from `from_line` up to `to_line`, in line order,
+        along with the line where the search stopped, i.e. after the last match when `limit` is reached.
+        """
+        to_line = len(self.lines) if to_line is None else to_line
+        if not terms or from_line >= to_line:
+            return [], to_line
+        text, offsets, lines = self.text, self.offsets, self.lines
+        rfind = text.rfind
+        results: list[Match] = []
+        if self._is_frequent(terms[0][0]):
+            pattern, others = _compile_terms(tuple(terms), True), []
+        else:
+            pattern, others = _compile_terms(terms[:1], False), [_compile_terms((t,), False) for t in terms[1:]]
+        line = from_line
+        for m in pattern.finditer(text, offsets[from_line], offsets[to_line]):
+            line = bisect_right(offsets, m.start(), line) - 1
+            line_start = offsets[line] + 1
+            ends = [m.start(i) for i in range(1, pattern.groups + 1)]
+            for other in others:
+                if not (n := other.search(lines[line])):
+                    break
+                ends.append(line_start + n.start(1))
+            else:
+                # scan backwards from the end of each term, to find its most compact match
+                cost, position = 0, -1
+                for term, end in zip(terms, ends):
+                    start = end
+                    for char in reversed(term):
+                        start = rfind(char, line_start, start)
+                    cost += end - start - len(term)
+                    if start > line_start and text[start - 1].isalnum():
+                        cost += NOT_A_WORD_START_COST
+                    if position < 0:
+                        position = start - line_start
+                results.append((cost, position, line))
+                if len(results) >= limit:
+                    return results, line + 1
+        return results, to_line
+
+    def narrow(self, lines: Iterable[int]) -> 'Corpus':
+        """
+        Returns the corpus restricted to the given lines.
+        """
+        texts, indices = self.lines, self.indices
+        lines = list(lines)
+        return Corpus([texts[i] for i in lines], [indices[i] for i in lines])
+
+    def _is_frequent(self, char: str) -> bool:
+        if (count := self._char_counts.get(char)) is None:
+            count = self._char_counts[char] = self.text.count(char)
+        return count > len(self.lines)
+
+
+# the corpus searched by a worker process, see `WorkerPool`
+_worker_corpus: Corpus | None = None
+
+
+def _start_worker(lines: list[str]):
+    global _worker_corpus
+    _worker_corpus = Corpus(lines, range(len(lines)))
+
+
+def _search_part(terms: tuple[str, ...], start: int, stop: int, limit: int) -> tuple[list[Match], bool]:
+    assert _worker_corpus is not None
+    found, _ = _worker_corpus.search(terms, limit, start, stop)
+    # whether every match of the part was found
+    return found, len(found) < limit
+
+
+class WorkerPool:
+    """
+    Processes splitting the search of a corpus between them.
+
+    Each process receives the corpus when it starts, so that searching only sends the search terms
+    and the part of the corpus to search to each of them.
+    """
+
+    def __init__(self, lines: list[str], workers: int):
+        # Forking the search thread's process isn't safe, so processes are forked from a server process instead,
+        # or spawned where there's no such thing.
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        self._executor = ProcessPoolExecutor(
+            workers,
+            multiprocessing.get_context(method),
+            initializer=_start_worker,
+            initargs=(lines,),
+        )
+        size = ceil(len(lines) / workers)
+        self._parts = [(start, min(start + size, len(lines))) for start in range(0, len(lines), size)]
+        # Start every process now, rather than on the first keystroke.
+        for future in [self._executor.submit(len, ()) for _ in range(workers)]:
+            future.result()
+
+    def search(self, terms: tuple[str, ...], limit: int) -> tuple[list[Match], list[int] | None]:
+        """
+        Scores the first `limit` matches of all the terms in each part of the corpus, and returns the best of them,
+        along with every line matching the terms, unless there are more than `limit`.
+        """
+        futures = [self._executor.submit(_search_part, terms, start, stop, limit) for start, stop in self._parts]
+        results = [future.result() for future in futures]
+        best = heapq.nsmallest(limit, chain.from_iterable(found for found, _ in results))
+        if all(complete for _, complete in results) and sum(len(found) for found, _ in results) <= limit:
+            return best, [line for found, _ in results for *_, line in found]
+        return best, None
+
+    def close(self):
+        self._executor.shutdown(cancel_futures=True)
+
+
+class FuzzyIndex:
+    """
+    The searchable text of every snippet (title, tag and command), loaded once in memory.
+
+    Snippets are loaded by decreasing ranking, so that equally scored matches are sorted by popularity.
+    When the search query extends the previous one, only the previous matches are searched again,
+    then the rest of the snippets from where the previous search stopped, if it reached `max_matches`.
+
+    With more than one of `workers` and at least `PARALLEL_THRESHOLD` snippets,
+    the search is split between worker processes started along with the index,
+    each scoring the first `max_matches` matches of its part of the snippets.
+    When the previous search found at most `max_matches` matches in all,
+    queries extending it search these matches in this process instead.
+    """
+
+    def __init__(self, rows: Iterable[tuple[int, str, str, str]], max_matches: int = MAX_MATCHES, workers: int = 0):
+        self.ids: list[int] = []
+        lines: list[str] = []
+        for rowid, title, tag, cmd in rows:
+            self.ids.append(rowid)
+            lines.append(f'{title}\t{tag or ""}\t{cmd}'.lower().replace('\n', ' '))
+        self._corpus = Corpus(lines, range(len(lines)))
+        self._max_matches = max_matches
+        # the previous query, the lines it matched and the line where its search stopped
+        self._previous: tuple[str, list[int], int] | None = None
+        self._pool = WorkerPool(lines, workers) if workers > 1 and len(lines) >= PARALLEL_THRESHOLD else None
+
+    @classmethod
+    def load(cls, db: SnippetsDatabase, max_matches: int = MAX_MATCHES, workers: int = 0):
+        query = 'SELECT rowid, title, tag, cmd FROM snippets ORDER BY ranking DESC, rowid ASC'
+        cursor = db.connection.execute(query)
+        cursor.row_factory = None  # type: ignore
+        return cls(cursor, max_matches, workers)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def close(self):
+        """
+        Stops the worker processes, if any.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    def search(self, query: str) -> list[int]:
+        """
+        Returns the ids of the matching snippets, best matches first.
+        """
+        terms = _split_terms(query)
+        if self._pool is None:
+            matches = self._search_first(query, terms)
+        else:
+            matches = self._search_best(query, terms)
+        ids = self.ids
+        return [ids[line] for *_, line in matches]
+
+    def _search_first(self, query: str, terms: tuple[str, ...]) -> list[Match]:
+        corpus, limit = self._corpus, self._max_matches
+        if self._previous and query.startswith(self._previous[0]):
+            # every match of the new query is a match of the previous one,
+            # which found every match before the line where it stopped
+            _, previous_lines, stop = self._previous
+            narrowed = corpus.narrow(previous_lines)
+            found, narrowed_stop = narrowed.search(terms, limit)
+            matches = [(cost, position, narrowed.indices[line]) for cost, position, line in found]
+            if len(matches) < limit:
+                more, stop = corpus.search(terms, limit - len(matches), stop)
+                matches.extend(more)
+            else:
+                stop = narrowed.indices[narrowed_stop - 1] + 1
+        else:
+            matches, stop = corpus.search(terms, limit)
+        self._previous = (query, [line for *_, line in matches], stop) if terms else None
+        matches.sort()
+        return matches
+
+    def _search_best(self, query: str, terms: tuple[str, ...]) -> list[Match]:
+        assert self._pool is not None
+        if not terms:
+            self._previous = None
+            return []
+        if self._previous and query.startswith(self._previous[0]):
+            # the previous search kept every line it matched
+            narrowed = self._corpus.narrow(self._previous[1])
+            found, _ = narrowed.search(terms, len(narrowed))
+            best = [(cost, position, narrowed.indices[line]) for cost, position, line in found]
+            lines: list[int] | None = [line for *_, line in best]
+            best.sort()
+        else:
+            best, lines = self._pool.search(terms, self._max_matches)
+        self._previous = (query, lines, len(self._corpus)) if lines is not None else None
+        return best
+
+
+class FuzzyPager:
+    """
+    Paginates the results of a `FuzzyIndex` search.
+
+    Results are always sorted by score, so the sort columns are ignored.
+    The index is reloaded when the database has been modified since it was loaded,
+    along with its worker processes if there are more than one `workers`.
+    """
+
+    def __init__(self, db: SnippetsDatabase, page_size: int = 50, max_matches: int = MAX_MATCHES, workers: int = 0):
+        self._db = db
+        self._max_matches = max_matches
+        self._workers = workers
+        self._index: FuzzyIndex | None = None
+        self._version: Any = None
+        self._page_size = page_size
+        self._ids: list[int] = []
+        self._current_page = 1
+        self._query = f'SELECT {LISTING.select_list()} FROM snippets WHERE rowid IN (SELECT value FROM json_each(?))'
+
+    def __len__(self) -> int:
+        return self.page_count
+
+    @property
+    def page_size(self) -> int:
+        return self._page_size
+
+    @property
+    def page_count(self) -> int:
+        return max(1, ceil(len(self._ids) / self._page_size))
+
+    @property
+    def current_page(self) -> int:
+        return self._current_page
+
+    @property
+    def is_first_page(self) -> bool:
+        return self._current_page == 1
+
+    @property
+    def is_last_page(self) -> bool:
+        return self._current_page == self.page_count
+
+    @property
+    def must_paginate(self) -> bool:
+        return self.page_count > 1
+
+    @property
+    def total_rows(self) -> int:
+        return len(self._ids)
+
+    @property
+    def count_pending(self) -> bool:
+        return False
+
+    @property
+    def index(self) -> FuzzyIndex:
+        version = self._db.data_version()
+        if self._index is None or version != self._version:
+            self.close()
+            self._index = FuzzyIndex.load(self._db, self._max_matches, self._workers)
+            self._version = version
+        return self._index
+
+    def set_page_size(self, size: int):
+        self._page_size = size
+        self._current_page = min(self._current_page, self.page_count)
+
+    def set_sort_columns(self, columns):
+        ...
+
+    def search(self, query: str) -> list[SnippetListing]:
+        self._ids = self.index.search(query)
+        return self.first()
+
+    def count(self):
+        ...
+
+    def get_page(self, page: int) -> list[SnippetListing]:
+        self._current_page = max(1, min(page, self.page_count))
+        start = (self._current_page - 1) * self._page_size
+        ids = self._ids[start : start + self._page_size]
+        if not ids:
+            return []
+        rows = {r['id']: r for r in self._db.connection.execute(self._query, (json.dumps(ids),))}
+        return [rows[i] for i in ids if i in rows]
+
+    def first(self) -> list[SnippetListing]:
+        return self.get_page(1)
+
+    def last(self) -> list[SnippetListing]:
+        return self.get_page(self.page_count)
+
+    def next(self) -> list[SnippetListing]:
+        return self.get_page(self._current_page + 1)
+
+    def previous(self) -> list[SnippetListing]:
+        return self.get_page(self._current_page - 1)
+
+    def close(self):
+        """
+        Stops the worker processes of the index, if any.
+        """
+        if self._index is not None:
+            self._index.close()
@@ -0,0 +1,106 @@
+"""
+Versioned schema migrations.
+
+Migrations are SQL scripts living in the `clisnips/resources/migrations` directory,
+and are named `<version>_<description>.sql`.
+The schema version of a database is stored in `PRAGMA user_version`,
+so opening an up-to-date database costs a single pragma query.
+"""
+
+import logging
+import re
+import sqlite3
+from collections.abc import Iterator
+from functools import cache
+from importlib import resources
+from importlib.resources.abc import Traversable
+from typing import NamedTuple
+
+from .ranking import register_functions
+
+logger = logging.getLogger(__name__)
+
+_FILENAME_RX = re.compile(r'^(?P<version>\d+)_(?P<name>\w+)\.sql$')
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    path: Traversable
+
+
+class MigrationError(RuntimeError):
+    def __init__(self, migration: Migration):
+        super().__init__(f'Migration {migration.version} ({migration.name}) failed.')
+        self.migration = migration
+
+
+@cache
+def get_migrations() -> tuple[Migration, ...]:
+    migrations: list[Migration] = []
+    for path in resources.files('clisnips.resources').joinpath('migrations').iterdir():
+        if m := _FILENAME_RX.match(path.name):
+            migrations.append(Migration(int(m['version']), m['name'], path))
+    return tuple(sorted(migrations, key=lambda m: m.version))
+
+
+def get_latest_version() -> int:
+    migrations = get_migrations()
+    return migrations[-1].version if migrations else 0
+
+
+def get_schema_version(cx: sqlite3.Connection) -> int:
+    return cx.execute('PRAGMA user_version').fetchone()[0]
+
+
+def needs_migration(cx: sqlite3.Connection) -> bool:
+    return get_schema_version(cx) < get_latest_version()
+
+
+def migrate(cx: sqlite3.Connection) -> int:
+    """
+    Applies pending migrations, returning the resulting schema version.
+
+    All pending migrations run in a single immediate transaction,
+    so concurrent processes opening an outdated database never apply a migration twice.
+    """
+    if (version := get_schema_version(cx)) >= get_latest_version():
+        return version
+
+    # migrations may use our custom SQL functions
+    register_functions(cx)
+    cx.execute('BEGIN IMMEDIATE')
+    try:
+        # another process may have migrated the database while we were waiting for the lock
+        version = get_schema_version(cx)
+        for migration in get_migrations():
+            if migration.version <= version:
+                continue
+            logger.info('Applying migration %d (%s)', migration.version, migration.name)
+            try:
+                for statement in _split_statements(migration.path.read_text()):
+                    cx.execute(statement)
+            except sqlite3.Error as err:
+                raise MigrationError(migration) from err
+            version = migration.version
+            cx.execute(f'PRAGMA user_version = {version:d}')
+    except BaseException:
+        cx.rollback()
+        raise
+    cx.commit()
+    return version
+
+
+def _split_statements(script: str) -> Iterator[str]:
+    buf = ''
+    for line in script.splitlines(keepends=True):
+        buf += line
+        if sqlite3.complete_statement(buf):
+            yield buf
+            buf = ''
+    if buf.strip() and not _is_comment(buf):
+        yield buf
+
+
+def _is_comment(text: str) -> bool:
+    return all(not line.strip() or line.lstrip().startswith('--') for line in text.splitlines())
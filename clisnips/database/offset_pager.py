@@ -4,16 +4,28 @@ from typing import Generic, Self
 
 from clisnips.database.snippets_db import QueryParameters
 
+from .count_cache import CountCache
 from .pager import Page, Row
 
 
 class OffsetPager(Generic[Row]):
-    def __init__(self, connection: sqlite3.Connection, page_size: int = 100):
+    def __init__(
+        self,
+        connection: sqlite3.Connection,
+        page_size: int = 100,
+        count_cache: CountCache | None = None,
+        lazy_count: bool = False,
+    ):
         self._con = connection
         self._current_page: int = 1
         self._page_count: int = 1
         self._page_size: int = page_size
         self._total_size = 0
+        self._count_cache = count_cache
+        # When enabled, execute() doesn't count the rows unless the count is cached.
+        # The count is then deduced from a short first page, or computed by an explicit call to count().
+        self.lazy_count = lazy_count
+        self._count_pending = False
         self._query = ''
         self._query_params = ()
         self._count_query = ''
@@ -56,6 +68,13 @@ class OffsetPager(Generic[Row]):
     def total_rows(self) -> int:
         return self._total_size
 
+    @property
+    def count_pending(self) -> bool:
+        """
+        Whether the rows have yet to be counted, in which case `total_rows` and `page_count` are meaningless.
+        """
+        return self._count_pending
+
     def set_query(self, query: str, params: QueryParameters = ()):
         self._executed = False
         self._query = query
@@ -80,12 +99,16 @@ class OffsetPager(Generic[Row]):
             self._query_params = params
         if count_params:
             self._count_query_params = count_params
-        self.count()
+        if self.lazy_count and self._get_cached_count() is None:
+            self._defer_count()
+        else:
+            self.count()
         self._executed = True
         return self
 
     def get_page(self, page: int) -> Page[Row]:
         self._check_executed()
+        self._ensure_counted()
         if page <= 1:
             page = 1
         elif page >= self._page_count:
@@ -101,7 +124,14 @@ class OffsetPager(Generic[Row]):
         return cursor.fetchall()
 
     def first(self) -> Page[Row]:
-        return self.get_page(1)
+        if not self._count_pending:
+            return self.get_page(1)
+        self._check_executed()
+        self._current_page = 1
+        query = f'SELECT * FROM ({self._query}) LIMIT {self._page_size}'
+        rows = self._con.execute(query, self._query_params).fetchall()
+        self._count_first_page(rows)
+        return rows
 
     def last(self) -> Page[Row]:
         return self.get_page(self._page_count)
@@ -113,16 +143,45 @@ class OffsetPager(Generic[Row]):
         return self.get_page(self._current_page - 1)
 
     def count(self):
+        if (count := self._get_cached_count()) is None:
+            query, params = self._get_count_query()
+            count = self._con.execute(query, params).fetchone()[0]
+            if self._count_cache is not None:
+                self._count_cache.set(query, params, count)
+        self._set_count(count)
+
+    def _get_count_query(self) -> tuple[str, QueryParameters]:
         if not self._count_query:
-            query = f'SELECT COUNT(*) FROM ({self._query})'
-            params = self._query_params
-        else:
-            query = self._count_query
-            params = self._count_query_params
-        count = self._con.execute(query, params).fetchone()[0]
+            return f'SELECT COUNT(*) FROM ({self._query})', self._query_params
+        return self._count_query, self._count_query_params
+
+    def _get_cached_count(self) -> int | None:
+        if self._count_cache is None:
+            return None
+        return self._count_cache.get(*self._get_count_query())
+
+    def _set_count(self, count: int):
+        self._count_pending = False
         self._total_size = count
         self._page_count = int(ceil(count / self._page_size))
 
+    def _defer_count(self):
+        self._count_pending = True
+        self._current_page = 1
+        self._total_size = 0
+        self._page_count = 1
+
+    def _ensure_counted(self):
+        if self._count_pending:
+            self.count()
+
+    def _count_first_page(self, rows: Page[Row]):
+        # A short first page holds the whole result set.
+        if self._count_pending and len(rows) < self._page_size:
+            if self._count_cache is not None:
+                self._count_cache.set(*self._get_count_query(), len(rows))
+            self._set_count(len(rows))
+
     def _check_executed(self):
         if not self._executed:
             raise RuntimeError('You must execute the pager first.')
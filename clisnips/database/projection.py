@@ -0,0 +1,81 @@
+from typing import Generic, TypeVar
+
+from . import Column, Snippet, SnippetListing, SnippetStats
+
+Row = TypeVar('Row')
+
+
+class Projection(Generic[Row]):
+    """
+    The set of columns to fetch from the snippets table, typed by the resulting row type.
+
+    The documentation lives in a separate table, so that scanning the snippets table
+    doesn't have to go through it. Projections that include it read from the `snippets_with_doc` view.
+    """
+
+    __slots__ = ('columns',)
+
+    def __init__(self, *columns: Column):
+        self.columns = columns
+
+    @property
+    def with_doc(self) -> bool:
+        return Column.DOC in self.columns
+
+    @property
+    def table(self) -> str:
+        return 'snippets_with_doc' if self.with_doc else 'snippets'
+
+    @property
+    def key(self) -> str:
+        """
+        The expression to use to filter rows by id.
+        """
+        return 'id' if self.with_doc else 'rowid'
+
+    def select_list(self, alias: str = '') -> str:
+        prefix = f'{alias}.' if alias else ''
+        return ', '.join(f'{prefix}{self._select_column(c)}' for c in self.columns)
+
+    def select(self) -> str:
+        return f'SELECT {self.select_list()} FROM {self.table}'
+
+    def _select_column(self, column: Column) -> str:
+        if column is Column.ID:
+            return 'id' if self.with_doc else 'rowid AS id'
+        return column
+
+    def __repr__(self) -> str:
+        return f'Projection({", ".join(self.columns)})'
+
+
+FULL: Projection[Snippet] = Projection(
+    Column.ID,
+    Column.TITLE,
+    Column.CMD,
+    Column.TAG,
+    Column.DOC,
+    Column.CREATED_AT,
+    Column.LAST_USED_AT,
+    Column.USAGE_COUNT,
+    Column.RANKING,
+)
+
+LISTING: Projection[SnippetListing] = Projection(
+    Column.ID,
+    Column.TITLE,
+    Column.CMD,
+    Column.TAG,
+    Column.CREATED_AT,
+    Column.LAST_USED_AT,
+    Column.USAGE_COUNT,
+    Column.RANKING,
+)
+
+STATS: Projection[SnippetStats] = Projection(
+    Column.ID,
+    Column.CREATED_AT,
+    Column.LAST_USED_AT,
+    Column.USAGE_COUNT,
+    Column.RANKING,
+)
@@ -0,0 +1,102 @@
+"""
+Frecency ranking of snippets.
+
+Each use of a snippet contributes a score that halves every `HALF_LIFE` seconds.
+Instead of storing the decayed sum of these contributions, which would have to be recomputed
+for every row as time passes, we store its logarithm relative to the epoch:
+
+    ranking = log(sum(exp(DECAY * t) for t in usage_timestamps))
+
+Since the decay factor is the same for every snippet, ordering by this score is the same
+as ordering by the decayed sum at any given time, so the stored rankings never go stale.
+"""
+
+import math
+import sqlite3
+from collections.abc import Sequence
+from functools import cache
+from types import ModuleType
+
+SECONDS_TO_DAYS = float(60 * 60 * 24)
+HALF_LIFE = 30 * SECONDS_TO_DAYS
+DECAY = math.log(2) / HALF_LIFE
+# absorbs the rounding errors of the rankings
+_TOLERANCE = 1e-6
+
+
+def compute_frecency(previous: float, now: float) -> float:
+    """
+    Returns the ranking of a snippet used at `now`, given its `previous` ranking.
+
+    A ranking of zero means the snippet has never been used.
+    """
+    current = now * DECAY
+    if previous == 0.0:
+        return current
+    return _log_add_exp(previous, current)
+
+
+def estimate_frecency(last_used: float, usage_count: int) -> float:
+    """
+    Estimates the ranking of a snippet for which we only know usage statistics,
+    as if every use happened at `last_used`.
+    """
+    if usage_count <= 0:
+        return 0.0
+    return last_used * DECAY + math.log(usage_count)
+
+
+def restore_frecency(ranking: float, last_used: float, usage_count: int) -> float:
+    """
+    Returns `ranking` if it is a frecency score consistent with the usage statistics,
+    otherwise estimates it with `estimate_frecency`.
+
+    This is meant for rankings coming from elsewhere, i.e. exports made before rankings were frecency scores.
+    Since every use happened at or before `last_used`, and the last one at `last_used`,
+    a consistent ranking lies between the scores of a single use and of `usage_count` uses at `last_used`.
+    """
+    if usage_count <= 0:
+        return 0.0
+    lowest = last_used * DECAY
+    # uses are recorded at fractional seconds, but `last_used` is truncated to whole seconds
+    if lowest - _TOLERANCE <= ranking <= lowest + DECAY + math.log(usage_count) + _TOLERANCE:
+        return ranking
+    return estimate_frecency(last_used, usage_count)
+
+
+def restore_frecencies(
+    rankings: Sequence[float], last_used: Sequence[float], usage_counts: Sequence[int]
+) -> list[float]:
+    """
+    Vectorized version of `restore_frecency`, using NumPy when it is available.
+    """
+    if np := _numpy():
+        ranks = np.asarray(rankings, dtype=np.float64)
+        lowest = np.asarray(last_used, dtype=np.float64) * DECAY
+        counts = np.asarray(usage_counts, dtype=np.float64)
+        logs = np.log(np.maximum(counts, 1.0))
+        consistent = (lowest - _TOLERANCE <= ranks) & (ranks <= lowest + DECAY + logs + _TOLERANCE)
+        restored = np.where(consistent, ranks, lowest + logs)
+        return np.where(counts > 0, restored, 0.0).tolist()
+    return [restore_frecency(r, t, n) for r, t, n in zip(rankings, last_used, usage_counts)]
+
+
+def register_functions(cx: sqlite3.Connection):
+    cx.create_function('frecency', 2, compute_frecency, deterministic=True)
+    cx.create_function('estimate_frecency', 2, estimate_frecency, deterministic=True)
+
+
+def _log_add_exp(a: float, b: float) -> float:
+    # log(exp(a) + exp(b)), without overflowing
+    hi, lo = (a, b) if a > b else (b, a)
+    return hi + math.log1p(math.exp(lo - hi))
+
+
+@cache
+def _numpy() -> ModuleType | None:
+    # NumPy is an optional dependency, and is slow to import.
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
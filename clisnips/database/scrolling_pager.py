@@ -5,6 +5,7 @@ from typing import Any, Literal, Self, TypeAlias
 from clisnips.database.snippets_db import QueryParameters
 
 from . import ScrollDirection, SortOrder
+from .count_cache import CountCache
 from .offset_pager import OffsetPager
 from .pager import Page, Row
 
@@ -19,8 +20,10 @@ class ScrollingPager(OffsetPager[Row]):
         connection: sqlite3.Connection,
         page_size: int = 100,
         sort_columns: Iterable[SortColumnDefinition] | None = None,
+        count_cache: CountCache | None = None,
+        lazy_count: bool = False,
     ):
-        super().__init__(connection, page_size)
+        super().__init__(connection, page_size, count_cache, lazy_count)
         # Keeps track of the resultset bounds after each query
         self._cursor = Cursor.with_columns(sort_columns) if sort_columns else Cursor()
 
@@ -36,6 +39,7 @@ class ScrollingPager(OffsetPager[Row]):
 
     def get_page(self, page: int) -> Page[Row]:
         self._check_executed()
+        self._ensure_counted()
         if page <= 1:
             self._current_page = 1
             return self.first()
@@ -44,8 +48,7 @@ class ScrollingPager(OffsetPager[Row]):
             return self.last()
         self._current_page = page
         offset = (page - 1) * self._page_size
-        query = self._get_page_fmt.format(offset=offset)
-        rs = self._con.execute(query, self._query_params).fetchall()
+        rs = self._con.execute(self._get_page_query, self._bind({'pager_offset': offset})).fetchall()
         self._cursor.update(rs)
         return rs
 
@@ -55,10 +58,12 @@ class ScrollingPager(OffsetPager[Row]):
         query, params = self._first_query, self._query_params
         rs = self._con.execute(query, params).fetchall()
         self._cursor.update(rs)
+        self._count_first_page(rs)
         return rs
 
     def last(self) -> Page[Row]:
         self._check_executed()
+        self._ensure_counted()
         self._current_page = self._page_count
         query, params = self._last_query, self._query_params
         rs = self._con.execute(query, params).fetchall()
@@ -69,11 +74,12 @@ class ScrollingPager(OffsetPager[Row]):
 
     def next(self) -> Page[Row]:
         self._check_executed()
+        self._ensure_counted()
         if self._current_page >= self._page_count:
             return self.last()
         self._current_page += 1
-        query = self._next_fmt.format(cursor=self._cursor)
-        rs = self._con.execute(query, self._query_params).fetchall()
+        params = self._bind(self._cursor.as_parameters(ScrollDirection.FWD))
+        rs = self._con.execute(self._next_query, params).fetchall()
         self._cursor.update(rs)
         return rs
 
@@ -82,15 +88,19 @@ class ScrollingPager(OffsetPager[Row]):
         if self._current_page <= 2:
             return self.first()
         self._current_page -= 1
-        query = self._prev_fmt.format(cursor=self._cursor)
-        rs = self._con.execute(query, self._query_params).fetchall()
+        params = self._bind(self._cursor.as_parameters(ScrollDirection.BWD))
+        rs = self._con.execute(self._prev_query, params).fetchall()
         # reverse result set
         rs.reverse()
         self._cursor.update(rs)
         return rs
 
-    def count(self):
-        super().count()
+    def _set_count(self, count: int):
+        super()._set_count(count)
+        self._compile_queries()
+
+    def _defer_count(self):
+        super()._defer_count()
         self._compile_queries()
 
     def _compile_queries(self):
@@ -109,12 +119,25 @@ class ScrollingPager(OffsetPager[Row]):
         self._first_query = f'SELECT * FROM ({query}) ORDER BY {fwd_orderby} LIMIT {self._page_size}'
         # query for self.last()
         self._last_query = f'SELECT * FROM ({query}) ORDER BY {bwd_orderby} LIMIT {last_page_size}'
+        # The cursor values and the offset are bound as parameters,
+        # so that each query is prepared once and then reused from the statement cache.
         # query for self.next()
-        self._next_fmt = f'SELECT * FROM ({query}) WHERE ({fwd_where}) ORDER BY {fwd_orderby} LIMIT {self._page_size}'
+        self._next_query = f'SELECT * FROM ({query}) WHERE ({fwd_where}) ORDER BY {fwd_orderby} LIMIT {self._page_size}'
         # query for self.previous()
-        self._prev_fmt = f'SELECT * FROM ({query}) WHERE ({bwd_where}) ORDER BY {bwd_orderby} LIMIT {self._page_size}'
+        self._prev_query = f'SELECT * FROM ({query}) WHERE ({bwd_where}) ORDER BY {bwd_orderby} LIMIT {self._page_size}'
         # query for self.get_page()
-        self._get_page_fmt = f'SELECT * FROM ({query}) ORDER BY {fwd_orderby} LIMIT {self._page_size} OFFSET {{offset}}'
+        self._get_page_query = (
+            f'SELECT * FROM ({query}) ORDER BY {fwd_orderby} LIMIT {self._page_size} OFFSET :pager_offset'
+        )
+
+    def _bind(self, params: Mapping[str, Any]) -> Mapping[str, Any]:
+        match self._query_params:
+            case Mapping():
+                return {**self._query_params, **params}
+            case []:
+                return params
+            case _:
+                raise TypeError('Keyset pagination requires named query parameters.')
 
     def _is_unique_column(self, column_name: str, table_name: str):
         # PRAGMA INDEX_LIST(table_name)
@@ -224,20 +247,20 @@ class Cursor:
             case ScrollDirection.BWD:
                 return ', '.join(f'{name} {order.reversed()}' for name, order in self.columns())
 
-    def as_where_clause(self, direction: ScrollDirection, cursor_name: str = 'cursor') -> str:
-        # value format, i.e. `{cursor.first[%s]!r}`
-        value_fmt = '{%s.%s[%%s]!r}' % (  # noqa: UP031 (No, this is more readable!)
-            cursor_name,
-            'last' if direction is ScrollDirection.FWD else 'first',
-        )
-        # comparison format, i.e. `rowid >= {cursor.first['rowid']!r}`
-        cmp_fmt = '{column} {op} {value}'
+    def as_where_clause(self, direction: ScrollDirection, prefix: str = 'cursor') -> str:
+        """
+        Returns the condition selecting the rows after (or before) the cursor.
+
+        The cursor values are named parameters, see `as_parameters()`.
+        """
+        keys = self._parameter_names(prefix)
+        # comparison format, i.e. `rowid >= :cursor_0`
+        cmp_fmt = '{column} {op} :{key}'
 
         # add unique column
         name, order = self._unique_column
         operator = _get_operator(direction, order, unique=True)
-        key = value_fmt % name
-        unique_expr = cmp_fmt.format(column=name, op=operator, value=key)
+        unique_expr = cmp_fmt.format(column=name, op=operator, key=keys[name])
         if not self._sort_columns:
             return unique_expr
 
@@ -247,13 +270,22 @@ class Cursor:
         for name, order in self._sort_columns:
             op1 = _get_operator(direction, order, unique=False)
             op2 = _get_operator(direction, order, unique=True)
-            key = value_fmt % name
-            # last_index = self._cursor[cursor][name]
-            left.append(cmp_fmt.format(column=name, op=op1, value=key))
-            right.append(cmp_fmt.format(column=name, op=op2, value=key))
+            left.append(cmp_fmt.format(column=name, op=op1, key=keys[name]))
+            right.append(cmp_fmt.format(column=name, op=op2, key=keys[name]))
         right.append(unique_expr)
 
         return '({left}) AND ({right})'.format(
             left=' AND '.join(left),
             right=' OR '.join(right),
         )
+
+    def as_parameters(self, direction: ScrollDirection, prefix: str = 'cursor') -> dict[str, Any]:
+        """
+        Returns the parameters to bind to the clause returned by `as_where_clause()`.
+        """
+        row = self._last if direction is ScrollDirection.FWD else self._first
+        return {key: row[name] for name, key in self._parameter_names(prefix).items()}
+
+    def _parameter_names(self, prefix: str) -> dict[str, str]:
+        # column names can be arbitrary expressions, so we number the parameters instead.
+        return {name: f'{prefix}_{i}' for i, name in enumerate(self.column_names())}
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+import json
+import re
 import sqlite3
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
 from contextlib import contextmanager
 from typing import TYPE_CHECKING, Self
 
-from . import Snippet, SortColumn, SortOrder
+from . import RelevanceWeights, SnippetHighlights, SnippetListing, SortColumn, SortOrder, TagFilter
+from .count_cache import CountCache
+from .fuzzy import FuzzyPager
 from .scrolling_pager import ScrollingPager, SortColumnDefinition
-from .snippets_db import QueryParameters, SnippetsDatabase
+from .search_scope import SearchScope
+from .snippets_db import HIGHLIGHT_END, HIGHLIGHT_START, QueryParameters, SnippetsDatabase
+
+_HIGHLIGHT_RX = re.compile(f'[{HIGHLIGHT_START}{HIGHLIGHT_END}]')
 
 
 class SearchSyntaxError(RuntimeError):
@@ -16,29 +23,69 @@ class SearchSyntaxError(RuntimeError):
 
 # There's no way to declare a proxy type with the current type-checkers
 # so we extend
-class SearchPager(ScrollingPager[Snippet] if TYPE_CHECKING else object):
+class SearchPager(ScrollingPager[SnippetListing] if TYPE_CHECKING else object):
     def __init__(
         self,
         db: SnippetsDatabase,
         sort_column: tuple[SortColumn, SortOrder] = (SortColumn.RANKING, SortOrder.DESC),
         page_size: int = 50,
+        lazy_count: bool = False,
+        relevance_weights: RelevanceWeights = RelevanceWeights(),
+        fuzzy_pager: FuzzyPager | None = None,
+        scope: SearchScope | None = None,
     ):
+        self._db = db
         self._page_size = page_size
-        self._list_pager: ScrollingPager[Snippet] = ScrollingPager(db.connection, page_size)
+        count_cache = CountCache(db.data_version)
+        self._list_pager: ScrollingPager[SnippetListing] = ScrollingPager(
+            db.connection,
+            page_size,
+            count_cache=count_cache,
+            lazy_count=lazy_count,
+        )
         self._list_pager.set_query(db.get_listing_query())
         self._list_pager.set_count_query(db.get_listing_count_query())
 
-        self._search_pager: ScrollingPager[Snippet] = ScrollingPager(db.connection, page_size)
-        self._search_pager.set_query(db.get_search_query())
-        self._search_pager.set_count_query(db.get_search_count_query())
+        self._search_pager: ScrollingPager[SnippetListing] = ScrollingPager(
+            db.connection,
+            page_size,
+            count_cache=count_cache,
+            lazy_count=lazy_count,
+        )
+        self._relevance_weights = relevance_weights
+
+        # lists the snippets not matching a search term or having some tags, when there's nothing to search for
+        self._filter_pager: ScrollingPager[SnippetListing] = ScrollingPager(
+            db.connection,
+            page_size,
+            count_cache=count_cache,
+            lazy_count=lazy_count,
+        )
+
+        # replaces full-text search when provided
+        self._fuzzy_pager = fuzzy_pager
+        if fuzzy_pager is not None:
+            fuzzy_pager.set_page_size(page_size)
+
+        # narrows search-as-you-type queries down to the results of a previous search
+        self._scope = scope
+        # the last search that wasn't narrowed, to be captured by the scope once its results are counted
+        self._capturable_search: tuple[str, str, dict[str, str]] | None = None
+        self._sorts_by_relevance = False
 
         self._is_searching = False
+        self._search_term = ''
+        self._highlight_query = db.get_highlight_query()
         self._current_pager = self._list_pager
         self.set_sort_column(*sort_column)
 
     def __getattr__(self, attr: str):
         return getattr(self._current_pager, attr)
 
+    @property
+    def database(self) -> SnippetsDatabase:
+        return self._db
+
     @property
     def is_searching(self) -> bool:
         return self._is_searching
@@ -51,34 +98,111 @@ class SearchPager(ScrollingPager[Snippet] if TYPE_CHECKING else object):
     def page_size(self, size: int):
         self.set_page_size(size)
 
-    def search(self, term: str):
+    def search(self, term: str, exclude: str = '', tags: Sequence[TagFilter] = (), query: str | None = None):
+        """
+        Searches for the snippets matching the `term` FTS5 query but not the `exclude` one,
+        and having the given tags.
+
+        Each can be empty, see `clisnips.database.search_query.CompiledQuery`.
+        `query` is the search query they were compiled from, if any,
+        in which case the search only looks at the results of a previous one it narrows.
+        The fuzzy pager, when provided, searches for `term` and ignores the filters.
+        """
         self._is_searching = True
-        self._current_pager = self._search_pager
-        params = {'term': term}
+        self._capturable_search = None
+        if self._fuzzy_pager is not None:
+            self._current_pager = self._fuzzy_pager
+            return self._fuzzy_pager.search(term)
+        if exclude and term:
+            term = f'({term}) NOT ({exclude})'
+        self._search_term = term
+        db = self._db
+        params: dict[str, str] = db.get_tag_parameters(tags)
+        if term:
+            params['term'] = term
+            index = 'snippets_index'
+            if query is not None and self._scope is not None:
+                # the relevance of the narrowed results would be relative to the previous results only
+                if not self._sorts_by_relevance and self._scope.covers(query):
+                    index = SearchScope.TABLE
+                else:
+                    self._capturable_search = query, db.get_search_count_query(tags), params
+            self._current_pager = self._search_pager
+            self._search_pager.set_query(db.get_search_query(self._relevance_weights, tags, index))
+            self._search_pager.set_count_query(db.get_search_count_query(tags, index))
+        else:
+            # nothing to search for, nothing to highlight
+            self._current_pager = self._filter_pager
+            self._filter_pager.set_query(db.get_filter_query(bool(exclude), tags))
+            self._filter_pager.set_count_query(db.get_filter_count_query(bool(exclude), tags))
+            if exclude:
+                params['exclude'] = exclude
         self.execute(params, params)
-        return self.first()
+        # when counting lazily, the first page is where syntax errors show up
+        with self._convert_exceptions():
+            page = self.first()
+        self._capture_search()
+        return page
 
     def list(self):
         self._is_searching = False
+        self._capturable_search = None
         self._current_pager = self._list_pager
         return self.execute().first()
 
+    def get_highlights(self, rows: Iterable[SnippetListing]) -> dict[int, SnippetHighlights]:
+        """
+        Returns the matched parts of the given search results, usually the current page.
+
+        Only the given rows are highlighted, so the cost depends on the page size, not on the number of results.
+        Fuzzy search results, and the results of queries only excluding snippets, are not highlighted.
+        """
+        ids = [r['id'] for r in rows]
+        if not ids or not self._is_searching or not self._search_term or self._fuzzy_pager is not None:
+            return {}
+        params = {
+            'term': self._search_term,
+            'start': HIGHLIGHT_START,
+            'end': HIGHLIGHT_END,
+            'min_id': min(ids),
+            'max_id': max(ids),
+            'ids': json.dumps(ids),
+        }
+        with self._convert_exceptions():
+            cursor = self._db.connection.execute(self._highlight_query, params)
+            return {
+                row['id']: {
+                    'title': _split_highlight(row['title']),
+                    'tag': _split_highlight(row['tag']),
+                    'cmd': _split_highlight(row['cmd']),
+                }
+                for row in cursor
+            }
+
     def set_sort_column(self, column: SortColumn, order: SortOrder = SortOrder.DESC):
-        self.set_sort_columns(
-            (
-                (column, order),
-                ('id', SortOrder.ASC, True),
-            )
-        )
+        self._sorts_by_relevance = column is SortColumn.RELEVANCE
+        unique_column = ('id', SortOrder.ASC, True)
+        self._search_pager.set_sort_columns(((column, order), unique_column))
+        # there's no relevance without a search term, so we fall back to popularity
+        if column is SortColumn.RELEVANCE:
+            column = SortColumn.RANKING
+        self._list_pager.set_sort_columns(((column, order), unique_column))
+        self._filter_pager.set_sort_columns(((column, order), unique_column))
 
     def set_sort_columns(self, columns: Iterable[SortColumnDefinition]):
+        columns = tuple(columns)
+        self._sorts_by_relevance = any(column[0] == SortColumn.RELEVANCE for column in columns)
         self._list_pager.set_sort_columns(columns)
         self._search_pager.set_sort_columns(columns)
+        self._filter_pager.set_sort_columns(columns)
 
     def set_page_size(self, size: int):
         self._page_size = size
         self._list_pager.set_page_size(size)
         self._search_pager.set_page_size(size)
+        self._filter_pager.set_page_size(size)
+        if self._fuzzy_pager is not None:
+            self._fuzzy_pager.set_page_size(size)
 
     def execute(self, params: QueryParameters = (), count_params: QueryParameters = ()) -> Self:
         with self._convert_exceptions():
@@ -88,10 +212,24 @@ class SearchPager(ScrollingPager[Snippet] if TYPE_CHECKING else object):
     def count(self):
         with self._convert_exceptions():
             self._current_pager.count()
+        self._capture_search()
+
+    def close(self):
+        """
+        Stops the worker processes of the fuzzy pager, if any.
+        """
+        if self._fuzzy_pager is not None:
+            self._fuzzy_pager.close()
 
     def __len__(self):
         return len(self._current_pager)
 
+    def _capture_search(self):
+        if self._capturable_search is None or self._current_pager.count_pending:
+            return
+        self._scope.capture(*self._capturable_search, self._current_pager.total_rows)  # type: ignore
+        self._capturable_search = None
+
     @contextmanager
     def _convert_exceptions(self):
         try:
@@ -102,12 +240,17 @@ class SearchPager(ScrollingPager[Snippet] if TYPE_CHECKING else object):
             raise err
 
 
+def _split_highlight(text: str | None) -> list[str]:
+    return _HIGHLIGHT_RX.split(text or '')
+
+
 def _is_search_syntax_error(err: sqlite3.OperationalError) -> bool:
     if not err.args:
         return False
     msg = str(err.args[0])
     return (
         msg.startswith('fts5: syntax error')
+        or msg.startswith('unterminated string')
         or msg.startswith('no such column')
         or msg.startswith('unknown special query:')
     )
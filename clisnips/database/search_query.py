@@ -0,0 +1,201 @@
+"""
+The search query language, compiled to FTS5 queries.
+
+A query is a list of terms that must all match:
+
+* `docker` matches the snippets containing the word, or a word starting with it in prefix mode.
+* `dock*` matches the words starting with `dock`.
+* `"compose up"` matches the phrase.
+* `title:docker`, `cmd:"compose up"` only match in the given field, one of `title`, `tag`, `cmd` or `doc`.
+* `tag:docker` matches the snippets tagged `docker`, or with a tag starting with it in prefix mode.
+  Tag filters use the tags table instead of the search index, see `TagFilter`.
+* `-docker` excludes the snippets matching the term.
+* `docker OR podman` matches either term.
+
+Any input is a valid query: phrases end with the query when their closing quote is missing,
+incomplete terms (i.e. `-` or `tag:`) are ignored, and everything else is searched for literally,
+so `--no-cache` or `a:b` don't need to be quoted.
+"""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+from . import TagFilter
+
+FIELDS = ('title', 'tag', 'cmd', 'doc')
+
+_FIELD_RX = re.compile(rf'({"|".join(FIELDS)}):')
+_WORD_RX = re.compile(r'[^\s"]+')
+# the characters making up the tokens of the search index, see the `tokenchars` option of the index
+_TOKEN_CHAR_RX = re.compile(r'[\w-]')
+# the characters separating the tags of a snippet, see the snippet_tag_names view
+_TAG_SEPARATOR_RX = re.compile(r'[\s,]')
+
+
+class Term(NamedTuple):
+    text: str
+    field: str | None = None
+    phrase: bool = False
+    prefix: bool = False
+    negated: bool = False
+
+
+# terms joined by OR
+Clause = tuple[Term, ...]
+
+
+class CompiledQuery(NamedTuple):
+    """
+    `match` is the FTS5 query of the snippets to search for, `exclude` the one of the snippets to leave out,
+    and `tags` the tags the snippets must have.
+    Each can be empty, in which case it doesn't filter anything.
+    """
+
+    match: str
+    exclude: str = ''
+    tags: tuple[TagFilter, ...] = ()
+
+    def __bool__(self) -> bool:
+        return bool(self.match or self.exclude or self.tags)
+
+
+def parse_query(query: str) -> tuple[Clause, ...]:
+    clauses: list[list[Term]] = []
+    pos, length = 0, len(query)
+    pending_or = False
+    while pos < length:
+        if query[pos].isspace():
+            pos += 1
+            continue
+        if query.startswith('OR', pos) and (pos + 2 == length or query[pos + 2].isspace()):
+            pending_or = True
+            pos += 2
+            continue
+        term, pos = _parse_term(query, pos)
+        if term is None:
+            continue
+        if pending_or and clauses and not term.negated and not clauses[-1][0].negated:
+            clauses[-1].append(term)
+        else:
+            clauses.append([term])
+        pending_or = False
+    return tuple(tuple(c) for c in clauses)
+
+
+def _parse_term(query: str, pos: int) -> tuple[Term | None, int]:
+    negated = False
+    # `--foo` is a command-line option, not the negation of `-foo`
+    if query[pos] == '-' and pos + 1 < len(query) and query[pos + 1] not in '-' and not query[pos + 1].isspace():
+        negated = True
+        pos += 1
+    field = None
+    if m := _FIELD_RX.match(query, pos):
+        field = m[1]
+        pos = m.end()
+    if query.startswith('"', pos):
+        end = query.find('"', pos + 1)
+        end = len(query) if end < 0 else end
+        text, pos = query[pos + 1 : end], end + 1
+        prefix = query.startswith('*', pos)
+        pos += prefix
+        term = Term(text, field, True, prefix, negated)
+    elif m := _WORD_RX.match(query, pos):
+        text, pos = m[0], m.end()
+        stripped = text.rstrip('*')
+        term = Term(stripped, field, False, stripped != text, negated)
+    else:
+        # i.e. `tag:` at the end of the query
+        return None, pos
+    if term.text == '-' or not _TOKEN_CHAR_RX.search(term.text):
+        # an incomplete negation, or the search index would find nothing
+        return None, pos
+    return term, pos
+
+
+@lru_cache(maxsize=256)
+def compile_query(query: str, prefix: bool = False) -> CompiledQuery:
+    """
+    Compiles a search query to FTS5 queries.
+
+    With `prefix`, the words of the query match the words they start, i.e. `dock` matches `docker`.
+    """
+    matches: list[str] = []
+    excludes: list[str] = []
+    tags: list[TagFilter] = []
+    for clause in parse_query(query):
+        term = clause[0]
+        if term.negated:
+            excludes.append(_compile_term(term, prefix))
+        elif len(clause) == 1 and _is_tag_filter(term):
+            tags.append(TagFilter(term.text, term.prefix or (prefix and not term.phrase)))
+        else:
+            matches.append(_compile_clause(clause, prefix))
+    match = ' AND '.join(matches)
+    exclude = ' OR '.join(excludes)
+    if match and exclude:
+        return CompiledQuery(f'({match}) NOT ({exclude})', '', tuple(tags))
+    return CompiledQuery(match, exclude, tuple(tags))
+
+
+def _is_tag_filter(term: Term) -> bool:
+    # a single tag, since the tags table holds the tags split on separators
+    return term.field == 'tag' and not _TAG_SEPARATOR_RX.search(term.text)
+
+
+def _compile_clause(clause: Clause, prefix: bool) -> str:
+    if len(clause) == 1:
+        return _compile_term(clause[0], prefix)
+    return f'({" OR ".join(_compile_term(t, prefix) for t in clause)})'
+
+
+def _compile_term(term: Term, prefix: bool) -> str:
+    text = '"{}"'.format(term.text.replace('"', '""'))
+    if term.prefix or (prefix and not term.phrase):
+        text += '*'
+    if term.field:
+        text = f'{term.field} : {text}'
+    return text
+
+
+def is_narrowing(previous: str, query: str, prefix: bool = False) -> bool:
+    """
+    Returns whether `query` is guaranteed to match a subset of the rows matched by `previous`.
+
+    This is the case when `query` only appends terms to `previous`, since they must all match.
+    In prefix mode, extending the last word of `previous` also narrows the results.
+    """
+    before, after = parse_query(previous), parse_query(query)
+    if not before or len(after) < len(before) or before == after:
+        return False
+    if any(len(c) > 1 for c in after):
+        return False
+    *same, last = before
+    if tuple(after[: len(same)]) != tuple(same):
+        return False
+    return last == after[len(same)] or _extends(last[0], after[len(same)][0], prefix)
+
+
+def _extends(term: Term, other: Term, prefix: bool) -> bool:
+    """
+    Returns whether `other` matches a subset of what `term` matches.
+    """
+    if term.negated or other.negated or term.field != other.field or term.phrase or other.phrase:
+        return False
+    # `doc*` matches everything `docker` does, but `doc` doesn't match `docker`
+    return (term.prefix or prefix) and other.text.startswith(term.text)
+
+
+class QueryParser:
+    """
+    Compiles the search queries typed by the user, see `compile_query`.
+    """
+
+    def __init__(self, prefix: bool = False):
+        self.prefix = prefix
+
+    def compile(self, query: str) -> CompiledQuery:
+        return compile_query(query, self.prefix)
+
+    def is_narrowing(self, previous: str, query: str) -> bool:
+        return is_narrowing(previous, query, self.prefix)
@@ -0,0 +1,80 @@
+"""
+Runs search-as-you-type queries against the results of the query they narrow.
+
+FTS5 can't restrict a query to a set of rowids efficiently: it evaluates the whole query once per rowid,
+expanding its prefix terms every time, which is orders of magnitude slower than the unrestricted query.
+So the results of a small enough search are instead copied, along with their indexed columns,
+into a temporary full-text index, which the queries narrowing that search then run against.
+"""
+
+from collections.abc import Callable, Hashable
+
+from .snippets_db import QueryParameters, SnippetsDatabase
+
+# The maximum number of results to copy, each costing about as much as indexing a snippet:
+# copying more than this outweighs what the queries narrowing them save.
+MAX_ROWS = 200
+
+# Must match the options of the `snippets_index` table, see the migrations.
+INDEX_OPTIONS = """tokenize = "unicode61 remove_diacritics 2 tokenchars '-_'", prefix = '2 3 4'"""
+
+
+class SearchScope:
+    """
+    Remembers the last search whose results are few enough to be copied to the `search_scope` index.
+
+    The results are only copied when a query narrowing that search comes, and are forgotten
+    as soon as the database changes.
+    """
+
+    TABLE = 'search_scope'
+
+    def __init__(self, db: SnippetsDatabase, is_narrowing: Callable[[str, str], bool], max_rows: int = MAX_ROWS):
+        self.max_rows = max_rows
+        self._db = db
+        self._is_narrowing = is_narrowing
+        # (query, the query listing the ids of its results, their parameters, database version)
+        self._search: tuple[str, str, QueryParameters, Hashable] | None = None
+        self._filled = False
+
+    def capture(self, query: str, ids_query: str, params: QueryParameters, count: int):
+        """
+        Remembers a search having `count` results, listed by `ids_query`, if they are few enough to be copied.
+        """
+        if count > self.max_rows:
+            return
+        self._search = query, ids_query, params, self._db.data_version()
+        self._filled = False
+
+    def covers(self, query: str) -> bool:
+        """
+        Returns whether `query` narrows the captured search, in which case its results are ready to be searched.
+        """
+        if self._search is None:
+            return False
+        previous, ids_query, params, version = self._search
+        if version != self._db.data_version():
+            # the copied results are outdated
+            self._search = None
+            return False
+        if not self._is_narrowing(previous, query):
+            return False
+        if not self._filled:
+            self._fill(ids_query, params)
+        return True
+
+    def _fill(self, ids_query: str, params: QueryParameters):
+        cx = self._db.connection
+        with cx:
+            cx.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS temp.{self.TABLE} USING fts5(title, tag, cmd, doc, {INDEX_OPTIONS})'
+            )
+            cx.execute(f'DELETE FROM temp.{self.TABLE}')
+            cx.execute(
+                f"""
+                INSERT INTO temp.{self.TABLE}(rowid, title, tag, cmd, doc)
+                SELECT id, title, tag, cmd, doc FROM snippets_with_doc WHERE id IN ({ids_query})
+                """,
+                params,
+            )
+        self._filled = True
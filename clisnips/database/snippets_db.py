@@ -1,53 +1,40 @@
 import logging
-import math
 import os
 import sqlite3
 import stat
-from collections.abc import Iterable, Iterator, Mapping, Sequence
-from importlib import resources
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from contextlib import closing, contextmanager
 from pathlib import Path
-from typing import Any, Literal, Self, TypeAlias
+from typing import TYPE_CHECKING, Any, Self, TypeAlias, TypeVar
 
 from clisnips.ty import AnyPath
 
-from . import Column, ImportableSnippet, NewSnippet, Snippet
+from . import ConnectionProfile, IndexTuning, NewSnippet, RelevanceWeights, Snippet, TagCount, TagFilter
+from .fts_structure import IndexStructure, read_structure
+from .migrations import migrate, needs_migration
+from .projection import FULL, LISTING, STATS, Projection
+from .ranking import register_functions, restore_frecencies
+
+if TYPE_CHECKING:
+    from .importable import ImportableSnippet
 
 
 QueryParameter: TypeAlias = str | int | float
 QueryParameters: TypeAlias = Sequence[QueryParameter] | Mapping[str, QueryParameter]
 
-logger = logging.getLogger(__name__)
-
-with resources.files('clisnips.resources').joinpath('schema.sql').open() as fp:
-    SCHEMA_QUERY = fp.read()
-
-SECONDS_TO_DAYS = float(60 * 60 * 24)
-# ranking decreases much faster for older items
-# when gravity is increased
-GRAVITY = 1.2
-
-
-def compute_ranking(created: int, last_used: int, num_used: int, now: float) -> float:
-    assert num_used > 0, 'Ranking must be computed after a snippet is used.'
-    assert now > created, 'Ranking must not be computed for newly created snippets.'
-    assert now > last_used, 'Ranking must not be computed after updating the usage timestamp.'
-
-    age = (now - created) / SECONDS_TO_DAYS
-    last_used_days = (now - last_used) / SECONDS_TO_DAYS
-    return num_used / pow(last_used_days / age, GRAVITY)
+Row = TypeVar('Row')
 
+logger = logging.getLogger(__name__)
 
-# TODO: test this frecency algo for sorting
-LOG_2 = math.log(2)
-FRECENCY_HALF_LIFE = SECONDS_TO_DAYS
-FRECENCY_DECAY = LOG_2 / FRECENCY_HALF_LIFE
+# The pagers prepare a handful of statements per sort order and search query.
+STATEMENT_CACHE_SIZE = 256
 
+# Delimit the matched parts of the highlighted search results.
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
 
-def compute_frecency(now: float, previous: float) -> float:
-    current_decay = now * FRECENCY_DECAY
-    if previous == 0.0:
-        return current_decay
-    return math.log(math.exp(previous - current_decay) + 1) + current_decay
+# The values FTS5 uses for the options missing from the index configuration.
+INDEX_TUNING_DEFAULTS: IndexTuning = {'automerge': 4, 'crisismerge': 16, 'usermerge': 4}
 
 
 class SnippetNotFound(RuntimeError):
@@ -56,25 +43,75 @@ class SnippetNotFound(RuntimeError):
 
 
 class SnippetsDatabase:
-    def __init__(self, connection: sqlite3.Connection):
+    """
+    When opened in read-only mode, the database is browsed through a read-only connection,
+    which never takes the write lock, and every write opens a short-lived read-write connection.
+    This lets several TUI sessions browse the database while another process writes to it.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, connect_writer: Callable[[], sqlite3.Connection] | None = None):
         self.connection = connection
         self.cursor = connection.cursor()
         self.closed = False
         self.block_size = 1024
         self._num_rows = 0
+        self._connect_writer = connect_writer
+        # bumped after each write, since PRAGMA data_version ignores the writes made by its own connection.
+        self._write_generation = 0
 
     @classmethod
-    def open(cls, db_file: AnyPath = ':memory:') -> Self:
+    def open(
+        cls,
+        db_file: AnyPath = ':memory:',
+        profile: ConnectionProfile | None = None,
+        read_only: bool = False,
+    ) -> Self:
         db_file = Path(db_file)
-        if db_file.name != ':memory:' and not db_file.is_file():
+        profile = profile or {}
+        if db_file.name == ':memory:':
+            # every connection to :memory: opens a distinct database
+            read_only = False
+        elif not db_file.is_file():
             db_file.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
             os.mknod(db_file, 0o644 | stat.S_IFREG)
         logger.info('db: %s', db_file)
-        cx = sqlite3.connect(db_file)
-        cx.row_factory = sqlite3.Row
-        cx.executescript(SCHEMA_QUERY)
+        if not read_only:
+            cx = _connect(db_file, profile)
+            migrate(cx)
+            return cls(cx)
+
+        cx = _connect_read_only(db_file, profile)
+        if needs_migration(cx) or _needs_journal_mode(cx, profile):
+            with closing(_connect(db_file, profile)) as writer:
+                migrate(writer)
+        return cls(cx, lambda: _connect(db_file, profile))
+
+    @property
+    def read_only(self) -> bool:
+        return self._connect_writer is not None
+
+    @contextmanager
+    def _writing(self, changes_data: bool = True) -> Iterator[sqlite3.Cursor]:
+        """
+        Yields a cursor to run writes in a transaction.
 
-        return cls(cx)
+        `changes_data` is false for the writes that leave the snippets untouched, like merging index segments.
+        """
+        if self._connect_writer is None:
+            with self.connection:
+                yield self.cursor
+        else:
+            with closing(self._connect_writer()) as cx:
+                with cx:
+                    yield cx.cursor()
+        if changes_data:
+            self._write_generation += 1
+
+    def data_version(self) -> tuple[int, int]:
+        """
+        Returns a value that changes whenever the database is modified, by us or by another connection.
+        """
+        return self._write_generation, self.connection.execute('PRAGMA data_version').fetchone()[0]
 
     def get_connection(self) -> sqlite3.Connection:
         return self.connection
@@ -89,9 +126,27 @@ class SnippetsDatabase:
     def close(self):
         if not self.closed:
             self.save()
+            self.optimize()
             self.connection.close()
             self.closed = True
 
+    def optimize(self):
+        """
+        Lets SQLite refresh the query planner statistics, if it deems it necessary.
+
+        This is cheap enough to run before closing the database.
+        It is a no-op in read-only mode, since it would need to write the statistics.
+        """
+        if not self.read_only:
+            self.connection.execute('PRAGMA optimize')
+
+    def analyze(self):
+        """
+        Unconditionally gathers the query planner statistics for the whole database.
+        """
+        with self._writing() as cursor:
+            cursor.execute('ANALYZE')
+
     def __len__(self):
         if not self._num_rows:
             self.cursor.execute('SELECT COUNT(rowid) AS count FROM snippets')
@@ -100,54 +155,149 @@ class SnippetsDatabase:
 
     def rebuild_index(self):
         query = 'INSERT INTO snippets_index(snippets_index) VALUES("rebuild")'
-        with self.connection:
-            self.cursor.execute(query)
+        with self._writing() as cursor:
+            cursor.execute(query)
 
     def optimize_index(self):
         query = 'INSERT INTO snippets_index(snippets_index) VALUES("optimize")'
-        with self.connection:
-            self.cursor.execute(query)
+        with self._writing() as cursor:
+            cursor.execute(query)
+
+    def configure_index(self, tuning: IndexTuning):
+        """
+        Stores the FTS5 merge options in the database, when they differ from the current ones.
+        """
+        current = {k: v for k, v in self.connection.execute('SELECT k, v FROM snippets_index_config')}
+        changes = [(k, v) for k, v in tuning.items() if current.get(k, INDEX_TUNING_DEFAULTS.get(k)) != v]
+        if not changes:
+            return
+        query = 'INSERT INTO snippets_index(snippets_index, rank) VALUES(?, ?)'
+        with self._writing(changes_data=False) as cursor:
+            cursor.executemany(query, changes)
+
+    def merge_index(self, pages: int) -> bool:
+        """
+        Runs an incremental merge of the search index segments, writing about `pages` pages at most.
+
+        Returns whether some segments were merged, in which case another merge may be useful.
+        """
+        query = "INSERT INTO snippets_index(snippets_index, rank) VALUES('merge', ?)"
+        with self._writing(changes_data=False) as cursor:
+            changes = cursor.connection.total_changes
+            cursor.execute(query, (pages,))
+            # a merge that has nothing to do only counts the 'merge' command itself as a change
+            return cursor.connection.total_changes - changes >= 2
+
+    def index_structure(self) -> IndexStructure:
+        """
+        Returns the segments of the search index.
+        """
+        return read_structure(self.connection)
 
     def __iter__(self) -> Iterator[Snippet]:
-        return self.iter('*')
+        return self.iter(FULL)
 
-    def iter(self, *columns: Column | Literal['*']) -> Iterator[Snippet]:
-        query = 'SELECT rowid AS id, %s from snippets' % ','.join(columns)
+    def iter(self, projection: Projection[Row] = FULL) -> Iterator[Row]:
+        for block in self.iter_blocks(projection):
+            yield from block
+
+    def iter_blocks(self, projection: Projection[Row] = FULL) -> Iterator[list[Row]]:
+        """
+        Yields lists of at most `block_size` rows.
+        """
         with self.connection:
-            self.cursor.execute(query)
-            while rows := self.cursor.fetchmany(self.block_size):
-                yield from rows
+            yield from self._iter_blocks(self.connection, projection)
+
+    def _iter_blocks(self, cx: sqlite3.Connection, projection: Projection[Row]) -> Iterator[list[Row]]:
+        cursor = cx.execute(projection.select())
+        while rows := cursor.fetchmany(self.block_size):
+            yield rows
 
-    def get(self, rowid: int) -> Snippet:
-        if snippet := self.find(rowid):
+    def get(self, rowid: int, projection: Projection[Row] = FULL) -> Row:
+        if snippet := self.find(rowid, projection):
             return snippet
         raise SnippetNotFound(rowid)
 
-    def find(self, rowid: int) -> Snippet | None:
-        query = 'SELECT rowid AS id, * FROM snippets WHERE rowid = :id'
+    def find(self, rowid: int, projection: Projection[Row] = FULL) -> Row | None:
+        query = f'{projection.select()} WHERE {projection.key} = :id'
         return self.cursor.execute(query, {'id': rowid}).fetchone()
 
     @staticmethod
     def get_listing_query() -> str:
-        return 'SELECT rowid AS id, title, cmd, tag, created_at, last_used_at, usage_count, ranking FROM snippets'
+        return LISTING.select()
 
     @staticmethod
     def get_listing_count_query() -> str:
         return 'SELECT rowid FROM snippets'
 
     @staticmethod
-    def get_search_query() -> str:
+    def get_search_query(
+        weights: RelevanceWeights = RelevanceWeights(),
+        tags: Sequence[TagFilter] = (),
+        index: str = 'snippets_index',
+    ) -> str:
+        """
+        `index` is the full-text index to search, i.e. one having the same columns as `snippets_index`.
+        """
+        # bm25() returns better matches as lower negative numbers,
+        # the relevance is negated so that it sorts like the other columns.
+        columns = LISTING.select_list('s')
+        bm25_weights = ', '.join(f'{float(w)!r}' for w in weights)
+        predicates = [f'{index} MATCH :term', *_tag_predicates('+s.rowid', tags)]
+        return f"""
+            SELECT i.rowid as docid, {columns}, -bm25({index}, {bm25_weights}) AS relevance
+            FROM snippets s JOIN {index} i ON i.rowid = s.rowid
+            WHERE {" AND ".join(predicates)}
+        """
+
+    @staticmethod
+    def get_search_count_query(tags: Sequence[TagFilter] = (), index: str = 'snippets_index') -> str:
+        predicates = [f'{index} MATCH :term', *_tag_predicates('+rowid', tags)]
+        return f'SELECT rowid FROM {index} WHERE {" AND ".join(predicates)}'
+
+    @staticmethod
+    def get_filter_query(exclude: bool = False, tags: Sequence[TagFilter] = ()) -> str:
+        """
+        Lists the snippets not matching the `:exclude` search term and having the given tags.
+        """
+        return f'{LISTING.select()} WHERE {_filter_predicates(exclude, tags)}'
+
+    @staticmethod
+    def get_filter_count_query(exclude: bool = False, tags: Sequence[TagFilter] = ()) -> str:
+        return f'SELECT rowid FROM snippets WHERE {_filter_predicates(exclude, tags)}'
+
+    @staticmethod
+    def get_tag_parameters(tags: Sequence[TagFilter]) -> dict[str, str]:
+        """
+        Returns the parameters of the queries filtering the given tags.
+        """
+        return {f'tag_{i}': tag.name for i, tag in enumerate(tags)}
+
+    @staticmethod
+    def get_highlight_query() -> str:
+        # A single scan of the search index, restricted to the rowid range of the given snippets,
+        # since looking up each snippet would evaluate the search term once per snippet.
+        # The unary plus keeps SQLite from doing just that with the IN operator.
+        # Rows are filtered before the select list is evaluated, so only the given snippets are highlighted.
         return """
-            SELECT i.rowid as docid, s.rowid AS id,
-            s.title, s.cmd, s.tag,
-            s.created_at, s.last_used_at, s.usage_count, s.ranking
-            FROM snippets s JOIN snippets_index i ON i.rowid = s.rowid
+            SELECT rowid AS id,
+                highlight(snippets_index, 0, :start, :end) AS title,
+                highlight(snippets_index, 1, :start, :end) AS tag,
+                highlight(snippets_index, 2, :start, :end) AS cmd
+            FROM snippets_index
             WHERE snippets_index MATCH :term
+            AND rowid BETWEEN :min_id AND :max_id
+            AND +rowid IN (SELECT value FROM json_each(:ids))
         """
 
-    @staticmethod
-    def get_search_count_query() -> str:
-        return 'SELECT rowid FROM snippets_index WHERE snippets_index MATCH :term'
+    def tags(self) -> list[TagCount]:
+        """
+        Returns the tags along with the number of snippets having them, most used first.
+
+        The counts are maintained by triggers, so this only reads the tags table.
+        """
+        query = 'SELECT name, snippet_count AS count FROM tags WHERE snippet_count > 0 ORDER BY count DESC, name'
+        return self.cursor.execute(query).fetchall()
 
     def search(self, term: str) -> list[Snippet]:
         query = 'SELECT rowid AS id FROM snippets_index WHERE snippets_index MATCH :term'
@@ -157,16 +307,31 @@ class SnippetsDatabase:
             return []
 
     def insert(self, data: NewSnippet) -> int:
-        query = 'INSERT INTO snippets(title, cmd, doc, tag) VALUES(:title, :cmd, :doc, :tag)'
-        with self.connection:
-            self.cursor.execute(query, data)
-            if self.cursor.rowcount > 0:
-                self._num_rows += self.cursor.rowcount
-            return self.cursor.lastrowid  # type: ignore
+        query = 'INSERT INTO snippets(title, cmd, tag) VALUES(:title, :cmd, :tag)'
+        with self._writing() as cursor:
+            cursor.execute(query, data)
+            rowid: int = cursor.lastrowid  # type: ignore
+            if self._num_rows:
+                self._num_rows += 1
+            if data['doc']:
+                cursor.execute('INSERT INTO snippets_doc(id, doc) VALUES(?, ?)', (rowid, data['doc']))
+            return rowid
+
+    def insert_many(self, data: Iterable['ImportableSnippet']) -> int:
+        """
+        Inserts the snippets in a single transaction, returning the number of inserted snippets.
+        """
+        count = 0
+
+        def counting():
+            nonlocal count
+            for row in data:
+                count += 1
+                yield row
 
-    def insert_many(self, data: Iterable[ImportableSnippet]):
+        # the view dispatches each row to the snippets and snippets_doc tables
         query = """
-            INSERT INTO snippets(
+            INSERT INTO snippets_with_doc(
                 title, cmd, doc, tag,
                 created_at, last_used_at, usage_count, ranking
             )
@@ -175,32 +340,127 @@ class SnippetsDatabase:
                 :created_at, :last_used_at, :usage_count, :ranking
             )
         """
-        with self.connection:
-            self.cursor.executemany(query, data)
-            if self.cursor.rowcount > 0:
-                self._num_rows += self.cursor.rowcount
+        with self._writing() as cursor:
+            cursor.executemany(query, counting())
+        # changes made by INSTEAD OF triggers don't count in the cursor's rowcount,
+        # so let `__len__` query the new count.
+        self._num_rows = 0
+        return count
 
     def update(self, data: Snippet) -> int:
-        query = 'UPDATE snippets SET title = :title, cmd = :cmd, doc = :doc, tag = :tag WHERE rowid = :id'
-        with self.connection:
-            self.cursor.execute(query, data)
-            return self.cursor.rowcount
+        query = 'UPDATE snippets SET title = :title, cmd = :cmd, tag = :tag WHERE rowid = :id'
+        doc_query = (
+            'INSERT INTO snippets_doc(id, doc) VALUES(:id, :doc) ON CONFLICT(id) DO UPDATE SET doc = excluded.doc'
+        )
+        with self._writing() as cursor:
+            cursor.execute(query, data)
+            if (count := cursor.rowcount) > 0:
+                cursor.execute(doc_query, data)
+            return count
 
     def delete(self, rowid: int):
         query = 'DELETE FROM snippets WHERE rowid = :id'
-        with self.connection:
-            self.cursor.execute(query, {'id': rowid})
-            if self.cursor.rowcount > 0:
-                self._num_rows -= self.cursor.rowcount
+        with self._writing() as cursor:
+            cursor.execute(query, {'id': rowid})
+            if cursor.rowcount > 0:
+                self._num_rows -= cursor.rowcount
+
+    def rerank(self) -> tuple[int, int]:
+        """
+        Re-estimates the rankings that are inconsistent with the usage statistics of their snippet,
+        in a single transaction. Consistent rankings are exact frecency scores, which estimates would only degrade.
+
+        Returns the number of checked snippets, and of those whose ranking was re-estimated.
+        """
+        query = 'UPDATE snippets SET ranking = ? WHERE rowid = ?'
+        checked, updated = 0, 0
+        with self._writing() as cursor:
+            # read from the writing connection, so the whole operation sees a single snapshot.
+            for block in self._iter_blocks(cursor.connection, STATS):
+                rankings = restore_frecencies(
+                    [row['ranking'] for row in block],
+                    [row['last_used_at'] for row in block],
+                    [row['usage_count'] for row in block],
+                )
+                changes = [(new, row['id']) for new, row in zip(rankings, block) if new != row['ranking']]
+                cursor.executemany(query, changes)
+                checked += len(block)
+                updated += len(changes)
+        return checked, updated
 
     def use_snippet(self, rowid: int, now: float):
-        snippet = self.get(rowid)
-        ranking = compute_ranking(snippet['created_at'], snippet['last_used_at'], snippet['usage_count'] + 1, now)
-        # ranking = compute_frecency(now, snippet['ranking'])
         query = (
             'UPDATE snippets '
-            'SET last_used_at = :now, usage_count = usage_count + 1, ranking = :ranking '
+            'SET last_used_at = :timestamp, usage_count = usage_count + 1, ranking = frecency(ranking, :now) '
             'WHERE rowid = :id'
         )
-        with self.connection:
-            self.cursor.execute(query, {'id': rowid, 'now': int(now), 'ranking': ranking})
+        with self._writing() as cursor:
+            cursor.execute(query, {'id': rowid, 'now': now, 'timestamp': int(now)})
+            if cursor.rowcount == 0:
+                raise SnippetNotFound(rowid)
+
+
+def _connect(db_file: AnyPath, profile: ConnectionProfile) -> sqlite3.Connection:
+    cx = sqlite3.connect(db_file, cached_statements=STATEMENT_CACHE_SIZE)
+    cx.row_factory = sqlite3.Row
+    register_functions(cx)
+    # journal_mode must come first, since it is the only setting persisted in the database file.
+    _apply_profile(cx, profile, ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store'))
+    return cx
+
+
+def _connect_read_only(db_file: Path, profile: ConnectionProfile) -> sqlite3.Connection:
+    # We don't use `immutable=1`: it would hide the writes made by our own write connections,
+    # and by other clisnips processes.
+    cx = sqlite3.connect(f'{db_file.absolute().as_uri()}?mode=ro', uri=True, cached_statements=STATEMENT_CACHE_SIZE)
+    cx.row_factory = sqlite3.Row
+    register_functions(cx)
+    # switching the journal mode needs to write to the database, and syncing is irrelevant to readers.
+    _apply_profile(cx, profile, ('cache_size', 'mmap_size', 'temp_store'))
+    return cx
+
+
+def _needs_journal_mode(cx: sqlite3.Connection, profile: ConnectionProfile) -> bool:
+    if (mode := profile.get('journal_mode')) is None:
+        return False
+    return cx.execute('PRAGMA journal_mode').fetchone()[0] != mode
+
+
+def _apply_profile(cx: sqlite3.Connection, profile: ConnectionProfile, pragmas: Iterable[str]):
+    for pragma in pragmas:
+        if (value := profile.get(pragma)) is None:
+            continue
+        match value:
+            case int():
+                statement = f'PRAGMA {pragma} = {value:d}'
+            case str() if value.isalpha():
+                statement = f'PRAGMA {pragma} = {value}'
+            case _:
+                raise ValueError(f'Invalid value for PRAGMA {pragma}: {value!r}')
+        result = cx.execute(statement).fetchone()
+        logger.debug(f'db: {statement} -> {tuple(result) if result else None}')
+
+
+def _tag_predicates(column: str, tags: Sequence[TagFilter]) -> list[str]:
+    # When searching, the column must be prefixed with a unary plus, so that the search index drives the query
+    # instead of evaluating the search term once per tagged snippet.
+    # Tags are stored lowercased by SQLite's lower(), which only folds ASCII characters.
+    # Prefixes are matched with a range scan of the tag names index,
+    # U+10FFFF being the greatest character in the BINARY collation.
+    predicates = []
+    for i, tag in enumerate(tags):
+        if tag.prefix:
+            condition = f't.name >= lower(:tag_{i}) AND t.name < lower(:tag_{i}) || char(1114111)'
+        else:
+            condition = f't.name = lower(:tag_{i})'
+        predicates.append(
+            f'{column} IN (SELECT st.snippet_id FROM tags t JOIN snippet_tags st ON st.tag_id = t.id WHERE {condition})'
+        )
+    return predicates
+
+
+def _filter_predicates(exclude: bool, tags: Sequence[TagFilter]) -> str:
+    predicates = _tag_predicates('rowid', tags)
+    if exclude:
+        predicates.append('rowid NOT IN (SELECT rowid FROM snippets_index WHERE snippets_index MATCH :exclude)')
+    return ' AND '.join(predicates) or 'TRUE'
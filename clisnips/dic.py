@@ -1,22 +1,38 @@
-from clisnips.cli.utils import UrwidMarkupHelper
-from .config import Config
-from .config.state import PersistentState, load_persistent_state
-from .database.search_pager import SearchPager
-from .database.snippets_db import SnippetsDatabase
-from .stores.snippets import SnippetsStore
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from .ty import AnyPath
 from .utils.clock import Clock, SystemClock
 
+if TYPE_CHECKING:
+    from clisnips.cli.utils import UrwidMarkupHelper
+
+    from .config import Config
+    from .config.state import PersistentState
+    from .database.search_pager import SearchPager
+    from .database.snippets_db import SnippetsDatabase
+    from .stores.runner import Runner
+    from .stores.snippets import SnippetsStore
+
 
 class DependencyInjectionContainer:
-    def __init__(self, database: AnyPath | None = None):
+    """
+    Lazily builds the application services.
+
+    Services are imported on first access, so that each command only pays for what it uses.
+    """
+
+    def __init__(self, database: AnyPath | None = None, read_only: bool = False):
         self._parameters = {
             'database': database,
+            'read_only': read_only,
         }
         self._config: Config | None = None
         self._persitent_state: PersistentState | None = None
         self._database: SnippetsDatabase | None = None
         self._pager: SearchPager | None = None
+        self._search_runner: Runner | None = None
         self._snippets_store: SnippetsStore | None = None
         self._clock: Clock = SystemClock()
         self._markup_helper: UrwidMarkupHelper | None = None
@@ -24,41 +40,131 @@ class DependencyInjectionContainer:
     @property
     def config(self) -> Config:
         if not self._config:
+            from .config import Config
+
             self._config = Config()
         return self._config
 
     @property
     def database(self) -> SnippetsDatabase:
         if not self._database:
-            self._database = self.open_database(self._parameters.get('database'))
+            self._database = self.open_database(
+                self._parameters.get('database'),
+                read_only=self._parameters.get('read_only', False),
+            )
+            self._database.configure_index(self.config.index_tuning)
         return self._database
 
-    def open_database(self, path: AnyPath | None = None) -> SnippetsDatabase:
+    def open_database(self, path: AnyPath | None = None, read_only: bool = False) -> SnippetsDatabase:
+        from .database.snippets_db import SnippetsDatabase
+
         path = path or self.config.database_path
-        return SnippetsDatabase.open(path)
+        return SnippetsDatabase.open(path, self.config.connection_profile, read_only=read_only)
 
     @property
     def snippets_store(self) -> SnippetsStore:
         if not self._snippets_store:
+            from .stores.snippets import SnippetsStore
+
             state = SnippetsStore.default_state()
             state.update(self.persistent_state)
-            self._snippets_store = SnippetsStore(state, self.database, self.pager, self._clock)
+            self._snippets_store = SnippetsStore(
+                state,
+                self.database,
+                self.search_runner,
+                self._clock,
+                debounce=self._create_search_debounce(),
+                query_parser=self._create_query_parser(),
+            )
         return self._snippets_store
 
+    def _create_query_parser(self):
+        if self.config.search.mode != 'fts':
+            # fuzzy search has no query syntax
+            return None
+
+        from .database.search_query import QueryParser
+
+        return QueryParser(prefix=self.config.search.prefix_search)
+
+    def _create_search_debounce(self):
+        if not (delay := self.config.search.debounce_delay):
+            return None
+
+        from .tui.loop import debounced
+
+        return debounced(delay)
+
     @property
-    def pager(self):
+    def search_runner(self) -> Runner:
+        if not self._search_runner:
+            from .stores.runner import SyncRunner, ThreadRunner
+
+            path = self._parameters.get('database') or self.config.database_path
+            if str(path) == ':memory:':
+                # an in-memory database can't be shared with another connection
+                self._search_runner = SyncRunner(self.pager)
+            else:
+                from .tui.loop import idle_add
+
+                self._search_runner = ThreadRunner(
+                    lambda: self.open_database(path, read_only=True),
+                    self.create_pager,
+                    deliver=idle_add,
+                )
+        return self._search_runner
+
+    @property
+    def pager(self) -> SearchPager:
         if not self._pager:
-            self._pager = SearchPager(self.database)
+            self._pager = self.create_pager(self.database)
         return self._pager
 
+    def create_pager(self, database: SnippetsDatabase) -> SearchPager:
+        from .database.search_pager import SearchPager
+
+        settings = self.config.search
+        fuzzy_pager = None
+        if settings.mode == 'fuzzy':
+            from .database.fuzzy import FuzzyPager
+
+            fuzzy_pager = FuzzyPager(database, workers=settings.fuzzy_workers)
+        scope = None
+        if query_parser := self._create_query_parser():
+            from .database.search_scope import SearchScope
+
+            scope = SearchScope(database, query_parser.is_narrowing)
+        return SearchPager(
+            database,
+            lazy_count=settings.lazy_count,
+            relevance_weights=self.config.relevance_weights,
+            fuzzy_pager=fuzzy_pager,
+            scope=scope,
+        )
+
     @property
     def persistent_state(self) -> PersistentState:
         if not self._persitent_state:
+            from .config.state import load_persistent_state
+
             self._persitent_state = load_persistent_state()
         return self._persitent_state
 
     @property
     def markup_helper(self) -> UrwidMarkupHelper:
         if not self._markup_helper:
+            from clisnips.cli.utils import UrwidMarkupHelper
+
             self._markup_helper = UrwidMarkupHelper()
         return self._markup_helper
+
+    def close(self):
+        """
+        Stops the search runner and closes the database connection, if they were created.
+        """
+        if self._search_runner is not None:
+            self._search_runner.close()
+            self._search_runner = None
+        if self._database is not None:
+            self._database.close()
+            self._database = None
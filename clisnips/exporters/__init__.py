@@ -1,9 +1,10 @@
-from ._json import JsonExporter
+from ._json import JsonExporter, JsonLinesExporter
 from .toml import TomlExporter
 from .xml import XmlExporter
 
 __all__ = (
     'XmlExporter',
     'JsonExporter',
+    'JsonLinesExporter',
     'TomlExporter',
 )
@@ -1,21 +1,80 @@
 import json
 import logging
 import time
+from json.encoder import encode_basestring_ascii
 from pathlib import Path
+from typing import Any, TextIO
 
-from clisnips.exporters.base import Exporter
+from clisnips.exporters.base import Exporter, open_output
 
 logger = logging.getLogger(__name__)
 
 
 class JsonExporter(Exporter):
+    """
+    Writes the snippets as a JSON array, one block of rows at a time,
+    so that memory usage doesn't depend on the number of snippets.
+
+    The output is the same as `json.dump(snippets, fp, indent=2)`.
+    """
+
     def export(self, path: Path):
         start_time = time.time()
         num_rows = len(self._db)
         logger.info(f'Converting {num_rows:n} snippets to JSON')
 
-        with open(path, 'w') as fp:
-            json.dump([dict(row) for row in self._db], fp, indent=2)
+        with open_output(path) as fp:
+            self._write(fp)
+
+        elapsed_time = time.time() - start_time
+        logger.info(f'Exported {num_rows:n} snippets in {elapsed_time:.1f} seconds.', extra={'color': 'success'})
+
+    def _write(self, fp: TextIO):
+        separator = '[\n  '
+        for block in self._db.iter_blocks():
+            fp.write(separator)
+            fp.write(',\n  '.join(_encode_indented(row) for row in block))
+            separator = ',\n  '
+        fp.write('[]' if separator == '[\n  ' else '\n]')
+
+
+def _encode_indented(row) -> str:
+    """
+    Encodes a row like `json.dumps(dict(row), indent=2)` does as an item of an array,
+    without going through the pure-python encoder that `json` uses when indenting.
+    """
+    members = ',\n    '.join(f'{_encode_string(k)}: {_encode_value(v)}' for k, v in zip(row.keys(), row))
+    return f'{{\n    {members}\n  }}'
+
+
+def _encode_value(value: Any) -> str:
+    match value:
+        case str():
+            return _encode_string(value)
+        case int() if not isinstance(value, bool):
+            return int.__repr__(value)
+        case _:
+            return _encode_scalar(value)
+
+
+_encode_string = encode_basestring_ascii
+_encode_scalar = json.JSONEncoder().encode
+
+
+class JsonLinesExporter(Exporter):
+    """
+    Writes the snippets as newline-delimited JSON, one object per line.
+    """
+
+    def export(self, path: Path):
+        start_time = time.time()
+        num_rows = len(self._db)
+        logger.info(f'Converting {num_rows:n} snippets to JSON lines')
+
+        encode = json.JSONEncoder(separators=(',', ':')).encode
+        with open_output(path) as fp:
+            for block in self._db.iter_blocks():
+                fp.write(''.join(f'{encode(dict(row))}\n' for row in block))
 
         elapsed_time = time.time() - start_time
         logger.info(f'Exported {num_rows:n} snippets in {elapsed_time:.1f} seconds.', extra={'color': 'success'})
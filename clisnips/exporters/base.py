@@ -1,5 +1,9 @@
+import sys
 from abc import abstractmethod, ABC
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
+from typing import TextIO
 
 from clisnips.database.snippets_db import SnippetsDatabase
 
@@ -11,3 +15,16 @@ class Exporter(ABC):
     @abstractmethod
     def export(self, path: Path):
         return NotImplemented
+
+
+@contextmanager
+def open_output(path: Path) -> Iterator[TextIO]:
+    """
+    Opens the file to export to, `-` being the standard output.
+    """
+    if str(path) == '-':
+        yield sys.stdout
+        sys.stdout.flush()
+        return
+    with open(path, 'w') as fp:
+        yield fp
@@ -1,35 +1,76 @@
 import logging
 import time
 from pathlib import Path
+from typing import Any, TextIO
 
-import tomlkit
-
-from .base import Exporter
+from .base import Exporter, open_output
 
 logger = logging.getLogger(__name__)
 
+# https://toml.io/en/v1.0.0#string
+_BASIC_ESCAPES = {
+    **{c: f'\\u{c:04x}' for c in (*range(0x20), 0x7F)},
+    **{ord(c): e for c, e in (('\b', '\\b'), ('\t', '\\t'), ('\n', '\\n'), ('\f', '\\f'), ('\r', '\\r'))},
+    ord('"'): '\\"',
+    ord('\\'): '\\\\',
+}
+# newlines are kept as is in multiline strings, and so are the quotes, unless there are three of them
+_MULTILINE_ESCAPES = {**_BASIC_ESCAPES, ord('\n'): '\n', ord('"'): '"'}
+# the fields that are written as multiline strings when they contain newlines
+_MULTILINE_FIELDS = frozenset(('cmd', 'doc'))
+
 
 class TomlExporter(Exporter):
+    """
+    Writes the snippets as an array of tables, one block of rows at a time.
+
+    The output is the same as serializing a `tomlkit` document, which is much slower,
+    except for the multiline strings starting with a newline or containing carriage returns,
+    which tomlkit doesn't escape.
+    """
+
     def export(self, path: Path):
         start_time = time.time()
         num_rows = len(self._db)
         logger.info(f'Converting {num_rows:n} snippets to TOML')
 
-        document = tomlkit.document()
-        items = tomlkit.aot()
-        for row in self._db:
-            tbl = tomlkit.table()
-            tbl.update(row)
-            if '\n' in row['cmd']:
-                tbl['cmd'] = tomlkit.string(row['cmd'], multiline=True)
-            if '\n' in row['doc']:
-                tbl['doc'] = tomlkit.string(row['doc'], multiline=True)
-            items.append(tbl)
-        document.add('snippets', items)
-
-        with open(path, 'w') as fp:
-            fp.write(document.as_string())
+        with open_output(path) as fp:
+            self._write(fp)
 
         elapsed_time = time.time() - start_time
         logger.info(f'Exported {num_rows:n} snippets in {elapsed_time:.1f} seconds.', extra={'color': 'success'})
-        return super().export(path)
+
+    def _write(self, fp: TextIO):
+        separator = ''
+        for block in self._db.iter_blocks():
+            fp.write(separator)
+            fp.write('\n'.join(_format_table(row) for row in block))
+            separator = '\n'
+        if not separator:
+            # an empty document has no snippets key
+            fp.write('snippets = []\n')
+
+
+def _format_table(row) -> str:
+    lines = ''.join(f'{key} = {_format_value(key, value)}\n' for key, value in zip(row.keys(), row))
+    return f'[[snippets]]\n{lines}'
+
+
+def _format_value(key: str, value: Any) -> str:
+    match value:
+        case str() if key in _MULTILINE_FIELDS and '\n' in value:
+            return _format_multiline_string(value)
+        case str():
+            return f'"{value.translate(_BASIC_ESCAPES)}"'
+        case None:
+            return '""'
+        case _:
+            return str(value)
+
+
+def _format_multiline_string(value: str) -> str:
+    escaped = value.translate(_MULTILINE_ESCAPES).replace('"""', '""\\"')
+    if escaped.startswith('\n'):
+        # a newline right after the opening delimiter would be trimmed
+        escaped = f'\\n{escaped[1:]}'
+    return f'"""{escaped}"""'
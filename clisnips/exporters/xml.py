@@ -1,54 +1,60 @@
 import logging
 import time
 from pathlib import Path
-from xml.dom.minidom import Document, Element
+from typing import TextIO
 
 from clisnips.database import Snippet
-from clisnips.exporters.base import Exporter
+from clisnips.exporters.base import Exporter, open_output
 
 logger = logging.getLogger(__name__)
 
 
 class XmlExporter(Exporter):
+    """
+    Writes the snippets one block of rows at a time,
+    in the format `xml.dom.minidom.Document.toprettyxml(indent='  ')` would.
+    """
+
     def export(self, path: Path):
         start_time = time.time()
         num_rows = len(self._db)
         logger.info(f'Converting {num_rows:n} snippets to XML')
 
-        doc = Document()
-        root = doc.createElement('snippets')
-        for row in self._db:
-            snip = _create_snippet(doc, row)
-            root.appendChild(snip)
-        doc.appendChild(root)
-        xml = doc.toprettyxml(indent='  ')
-
         logger.debug(f'Writing snippets to {path} ...')
-        with open(path, 'w') as fp:
-            fp.write(xml)
+        with open_output(path) as fp:
+            self._write(fp)
 
         elapsed_time = time.time() - start_time
         logger.info(f'Exported {num_rows:n} snippets in {elapsed_time:.1f} seconds.', extra={'color': 'success'})
 
-
-def _create_snippet(doc: Document, row: Snippet) -> Element:
-    snip = doc.createElement('snippet')
-    snip.setAttribute('created-at', str(row['created_at']))
-    snip.setAttribute('last-used-at', str(row['last_used_at']))
-    snip.setAttribute('usage-count', str(row['usage_count']))
-    snip.setAttribute('ranking', str(row['ranking']))
-    _add_field(doc, snip, 'title', row['title'])
-    _add_field(doc, snip, 'command', row['cmd'])
-    _add_field(doc, snip, 'tag', row['tag'])
-    _add_field(doc, snip, 'doc', row['doc'], cdata=True)
-    return snip
-
-
-def _add_field(doc: Document, parent: Element, name: str, text: str, cdata: bool = False):
-    el = doc.createElement(name)
-    if cdata:
-        txt = doc.createCDATASection(text)
-    else:
-        txt = doc.createTextNode(text)
-    el.appendChild(txt)
-    parent.appendChild(el)
+    def _write(self, fp: TextIO):
+        fp.write('<?xml version="1.0" ?>\n')
+        empty = True
+        for block in self._db.iter_blocks():
+            if empty:
+                fp.write('<snippets>\n')
+                empty = False
+            fp.write(''.join(_format_snippet(row) for row in block))
+        fp.write('<snippets/>\n' if empty else '</snippets>\n')
+
+
+def _format_snippet(row: Snippet) -> str:
+    return (
+        f'  <snippet created-at="{row["created_at"]}" last-used-at="{row["last_used_at"]}"'
+        f' usage-count="{row["usage_count"]}" ranking="{row["ranking"]}">\n'
+        f'    <title>{_escape(row["title"])}</title>\n'
+        f'    <command>{_escape(row["cmd"])}</command>\n'
+        f'    <tag>{_escape(row["tag"] or "")}</tag>\n'
+        f'    <doc><![CDATA[{_escape_cdata(row["doc"])}]]></doc>\n'
+        '  </snippet>\n'
+    )
+
+
+def _escape(text: str) -> str:
+    # escapes like minidom does, including the double quotes
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('"', '&quot;').replace('>', '&gt;')
+
+
+def _escape_cdata(text: str) -> str:
+    # CDATA sections can't contain their end marker, so it is split across two sections
+    return text.replace(']]>', ']]]]><![CDATA[>')
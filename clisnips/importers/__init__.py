@@ -1,10 +1,11 @@
-from ._json import JsonImporter
+from ._json import JsonImporter, JsonLinesImporter
 from .clicompanion import CliCompanionImporter
 from .toml import TomlImporter
 from .xml import XmlImporter
 
 __all__ = (
     'JsonImporter',
+    'JsonLinesImporter',
     'CliCompanionImporter',
     'XmlImporter',
     'TomlImporter',
@@ -1,25 +1,141 @@
-import logging
-import time
-from pathlib import Path
+import json
+import re
+from collections.abc import Iterable, Iterator
+from typing import IO, Any, TextIO
 
-from .base import Importer, SnippetListAdapter
+from clisnips.database import ImportableSnippet
 
-logger = logging.getLogger(__name__)
+from .base import Importer, SnippetAdapter
+
+# The number of characters read at once from JSON files.
+CHUNK_SIZE = 64 * 1024
+# Values decoded, or failing to decode, this close to the end of the buffer
+# may continue in the next chunk, i.e. `1.5` cut after `1` or `true` after `tru`.
+_TRUNCATION_MARGIN = 16
+
+_WHITESPACE_RX = re.compile(r'[ \t\n\r]*')
 
 
 class JsonImporter(Importer):
-    def import_path(self, path: Path):
-        start_time = time.time()
-        logger.info(f'Importing snippets from {path}')
-
-        with open(path) as fp:
-            data = SnippetListAdapter.validate_json(fp.read())
-            if not self._dry_run:
-                self._db.insert_many(data)
-            logger.info('Rebuilding & optimizing search index')
-            if not self._dry_run:
-                self._db.rebuild_index()
-                self._db.optimize_index()
-
-        elapsed_time = time.time() - start_time
-        logger.info(f'Imported in {elapsed_time:.1f} seconds.', extra={'color': 'success'})
+    """
+    Imports a JSON array of snippets, as written by `clisnips.exporters.JsonExporter`.
+
+    The array is parsed incrementally, so that the file is never loaded in memory as a whole.
+    """
+
+    def _parse(self, file: IO[Any]) -> Iterable[Any]:
+        return iter_json_array(file)
+
+
+class JsonLinesImporter(Importer):
+    """
+    Imports one JSON snippet per line, as written by `clisnips.exporters.JsonLinesExporter`.
+    """
+
+    def _parse(self, file: IO[Any]) -> Iterable[Any]:
+        return (line for line in file if not line.isspace())
+
+    def _validate(self, snippet: Any) -> ImportableSnippet:
+        # pydantic parses and validates the lines in one go
+        return SnippetAdapter.validate_json(snippet)
+
+
+def iter_json_array(file: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Yields the items of the JSON array read from `file`, by chunks of `chunk_size` characters.
+
+    Raises `json.JSONDecodeError` with positions relative to the whole file.
+    """
+    reader = _ChunkReader(file, chunk_size)
+    decoder = json.JSONDecoder()
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.expect(']')
+    else:
+        while True:
+            yield reader.decode(decoder)
+            if reader.peek() == ']':
+                reader.expect(']')
+                break
+            reader.expect(',')
+    if reader.peek():
+        raise reader.error('Extra data')
+
+
+class _ChunkReader:
+    def __init__(self, file: TextIO, chunk_size: int):
+        self._file = file
+        self._chunk_size = chunk_size
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        # what was discarded from the buffer, to report errors at their position in the file
+        self._offset = 0
+        self._lines = 0
+        self._line_start = 0
+
+    def peek(self) -> str:
+        """
+        Skips whitespace and returns the next character without consuming it, or an empty string at the end.
+        """
+        while True:
+            self._pos = _WHITESPACE_RX.match(self._buffer, self._pos).end()  # type: ignore
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise self.error(f'Expecting {char!r}')
+        self._pos += 1
+
+    def decode(self, decoder: json.JSONDecoder) -> Any:
+        while True:
+            self.peek()
+            try:
+                value, end = decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as err:
+                if self._is_truncated(err) and self._fill():
+                    continue
+                raise self.error(err.msg, err.pos) from None
+            if end >= len(self._buffer) - _TRUNCATION_MARGIN and self._fill():
+                # i.e. `1.5` cut after `1`
+                continue
+            self._pos = end
+            return value
+
+    def error(self, msg: str, pos: int | None = None) -> json.JSONDecodeError:
+        pos = self._pos if pos is None else pos
+        buffer = self._buffer
+        err = json.JSONDecodeError(msg, buffer, pos)
+        err.pos = self._offset + pos
+        err.lineno = self._lines + buffer.count('\n', 0, pos) + 1
+        if (newline := buffer.rfind('\n', 0, pos)) >= 0:
+            err.colno = pos - newline
+        else:
+            err.colno = err.pos - self._line_start + 1
+        err.args = (f'{msg}: line {err.lineno} column {err.colno} (char {err.pos})',)
+        return err
+
+    def _is_truncated(self, err: json.JSONDecodeError) -> bool:
+        return err.msg.startswith('Unterminated string') or err.pos >= len(self._buffer) - _TRUNCATION_MARGIN
+
+    def _fill(self) -> bool:
+        """
+        Reads the next chunk, discarding the consumed part of the buffer.
+        Returns False at the end of the file.
+        """
+        if self._eof:
+            return False
+        if not (chunk := self._file.read(self._chunk_size)):
+            self._eof = True
+            return False
+        buffer, pos = self._buffer, self._pos
+        if pos:
+            self._lines += buffer.count('\n', 0, pos)
+            if (newline := buffer.rfind('\n', 0, pos)) >= 0:
+                self._line_start = self._offset + newline + 1
+            self._offset += pos
+        self._buffer, self._pos = buffer[pos:] + chunk, 0
+        return True
@@ -1,25 +1,127 @@
+import logging
+import time
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
 from pathlib import Path
+from typing import IO, Any
 from typing_extensions import TypedDict
 
 from pydantic import TypeAdapter
 
 from clisnips.database import ImportableSnippet
+from clisnips.database.ranking import restore_frecency
 from clisnips.database.snippets_db import SnippetsDatabase
+from clisnips.utils.iterable import batched, read_ahead
+
+logger = logging.getLogger(__name__)
+
+
+# Minimum number of seconds between two progress messages.
+PROGRESS_INTERVAL = 1.0
+# Number of validated batches waiting to be inserted.
+PENDING_BATCHES = 2
 
 
 class Importer(ABC):
-    def __init__(self, db: SnippetsDatabase, dry_run=False):
+    """
+    Imports snippets in three stages: parsing, validation and insertion.
+
+    Subclasses parse the files into snippets, i.e. dictionaries, which are validated by `_validate`
+    and grouped in batches on a background thread, while the previous batches are inserted.
+    """
+
+    # the mode files are opened with
+    file_mode = 'r'
+
+    def __init__(
+        self,
+        db: SnippetsDatabase,
+        dry_run=False,
+        rebuild_threshold: int = 10_000,
+        batch_size: int = 1000,
+    ):
         self._db = db
         self._dry_run = dry_run
+        self._rebuild_threshold = rebuild_threshold
+        self._batch_size = batch_size
 
-    @abstractmethod
     def import_path(self, path: Path) -> None:
+        start_time = time.time()
+        logger.info(f'Importing snippets from {path}')
+
+        with open(path, self.file_mode) as fp:
+            count = self._insert(self._parse(fp))
+            self._update_index(count)
+
+        elapsed_time = time.time() - start_time
+        logger.info(f'Imported in {elapsed_time:.1f} seconds.', extra={'color': 'success'})
+
+    @abstractmethod
+    def _parse(self, file: IO[Any]) -> Iterable[Any]:
+        """
+        Yields the snippets read from `file`, to be validated by `_validate`.
+        """
         return NotImplemented
 
+    def _validate(self, snippet: Any) -> ImportableSnippet:
+        return SnippetAdapter.validate_python(snippet)
+
+    def _validated_batches(self, snippets: Iterable[Any]) -> Iterator[list[ImportableSnippet]]:
+        validate = self._validate
+        for batch in batched(snippets, self._batch_size):
+            validated = [validate(s) for s in batch]
+            for snippet in validated:
+                # older exports have rankings that can't be compared with frecency scores
+                snippet['ranking'] = restore_frecency(
+                    snippet['ranking'],
+                    snippet['last_used_at'],
+                    snippet['usage_count'],
+                )
+            yield validated
+
+    def _insert(self, snippets: Iterable[Any]) -> int:
+        """
+        Validates and inserts the snippets in batches of `batch_size`, returning the number of imported snippets.
+
+        Each batch is committed in its own transaction, so that memory usage doesn't depend on the size of the import.
+        If an invalid snippet interrupts the import, the previous batches stay in the database.
+
+        Parsing and validation run on a background thread, which the database lets run while inserting.
+        They don't need a process pool: sending the snippets to other processes costs more than validating them.
+        """
+        count = 0
+        last_report = time.monotonic()
+        try:
+            for batch in read_ahead(self._validated_batches(snippets), PENDING_BATCHES):
+                if not self._dry_run:
+                    self._db.insert_many(batch)
+                count += len(batch)
+                if (now := time.monotonic()) - last_report >= PROGRESS_INTERVAL:
+                    last_report = now
+                    logger.info(f'Imported {count} snippets...')
+        except Exception:
+            if count:
+                logger.warning(f'Import interrupted after {count} snippets')
+            raise
+        return count
+
+    def _update_index(self, count: int):
+        """
+        Imported snippets are indexed as they are inserted, and the index merges its segments along the way.
+        Rebuilding and optimizing the whole index is only worth it after importing many snippets.
+        """
+        if count < self._rebuild_threshold:
+            logger.info(f'Imported {count} snippets, the search index is up to date')
+            return
+        logger.info('Rebuilding & optimizing search index')
+        if not self._dry_run:
+            self._db.rebuild_index()
+            self._db.optimize_index()
+
 
 class SnippetDocument(TypedDict):
-    snippets: list[ImportableSnippet]
+    # validated by the importers, one batch at a time
+    snippets: list[Any]
 
 
 SnippetAdapter = TypeAdapter(ImportableSnippet)
@@ -16,19 +16,13 @@ The parsing code was adapted from:
 https://bazaar.launchpad.net/~clicompanion-devs/clicompanion/trunk/view/head:/plugins/LocalCommandList.py
 """
 
-import logging
 import re
-import time
 from collections.abc import Iterable
-from pathlib import Path
-from typing import TextIO
+from typing import IO, Any
 
-from clisnips.database import ImportableSnippet
 from clisnips.utils.list import pad_list
 
-from .base import Importer, SnippetAdapter
-
-logger = logging.getLogger(__name__)
+from .base import Importer
 
 # Looks for a question-mark that is not escaped
 # (not preceded by an odd number of backslashes)
@@ -36,31 +30,12 @@ _ARGS_RE = re.compile(r'(?<!\\)((?:\\\\)*\?)')
 
 
 class CliCompanionImporter(Importer):
-    def import_path(self, path: Path) -> None:
-        start_time = time.time()
-        logger.info(f'Importing snippets from {path}')
-
-        with open(path) as fp:
-            if self._dry_run:
-                for _ in _get_snippets(fp):
-                    ...
-            else:
-                self._db.insert_many(_get_snippets(fp))
-            logger.info('Rebuilding & optimizing search index')
-            if not self._dry_run:
-                self._db.rebuild_index()
-                self._db.optimize_index()
-
-        elapsed_time = time.time() - start_time
-        logger.info(f'Imported in {elapsed_time:.1f} seconds.', extra={'color': 'success'})
-
-
-def _get_snippets(file: TextIO) -> Iterable[ImportableSnippet]:
-    for cmd, ui, desc in _parse(file):
-        yield _translate(cmd, ui, desc)
+    def _parse(self, file: IO[Any]) -> Iterable[Any]:
+        for cmd, ui, desc in _parse_commands(file):
+            yield _translate(cmd, ui, desc)
 
 
-def _parse(file: TextIO) -> list[tuple[str, str, str]]:
+def _parse_commands(file: IO[Any]) -> list[tuple[str, str, str]]:
     commands, seen = [], set()
     # try to detect if the line is a old fashion config line
     # (separated by ':')
@@ -91,18 +66,16 @@ def _parse(file: TextIO) -> list[tuple[str, str, str]]:
     return commands
 
 
-def _translate(cmd: str, ui: str, desc: str) -> ImportableSnippet:
+def _translate(cmd: str, ui: str, desc: str) -> dict[str, str]:
     """
     Since ui is free form text, we have to make an educated guess...
     """
-    result = SnippetAdapter.validate_python(
-        {
-            'title': desc,
-            'cmd': cmd,
-            'doc': ui,
-            'tag': cmd.split(None, 1)[0],
-        }
-    )
+    result = {
+        'title': desc,
+        'cmd': cmd,
+        'doc': ui,
+        'tag': cmd.split(None, 1)[0],
+    }
     nargs = len(_ARGS_RE.findall(cmd))
     if not nargs:
         # no user arguments
@@ -1,11 +1,20 @@
+from __future__ import annotations
+
 import logging
 import sys
-from typing import IO
+from collections.abc import Callable
+from typing import IO, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from clisnips.cli.utils import UrwidMarkupHelper
 
-from clisnips.cli.utils import UrwidMarkupHelper
 
+def configure(helper: Callable[[], UrwidMarkupHelper], level: str, stream: IO = sys.stderr):
+    """
+    Configures logging for CLI commands.
 
-def configure(helper: UrwidMarkupHelper, level: str, stream: IO = sys.stderr):
+    The markup helper is only built when a record is actually formatted, since it requires urwid.
+    """
     handler = logging.StreamHandler(stream)
     if stream.isatty():
         handler.formatter = UrwidRecordFormatter(helper)
@@ -23,7 +32,7 @@ class UrwidRecordFormatter(logging.Formatter):
         'CRITICAL': 'error',
     }
 
-    def __init__(self, helper: UrwidMarkupHelper) -> None:
+    def __init__(self, helper: Callable[[], UrwidMarkupHelper]) -> None:
         self._helper = helper
         super().__init__()
 
@@ -35,4 +44,4 @@ class UrwidRecordFormatter(logging.Formatter):
             (getattr(record, 'color', spec), record.message),
             ('default', ''),
         ]
-        return self._helper.convert_markup(markup, tty=True)
+        return self._helper().convert_markup(markup, tty=True)
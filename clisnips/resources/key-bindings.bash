@@ -2,7 +2,7 @@
 
 function __clisnips__() {
   local snip
-  snip="$(clisnips 2> "$(tty)")"
+  snip="$(clisnips-client 2> "$(tty)")"
   READLINE_LINE="${READLINE_LINE:0:$READLINE_POINT}${snip}${READLINE_LINE:$READLINE_POINT}"
   READLINE_POINT=$(( READLINE_POINT + ${#snip} ))
 }
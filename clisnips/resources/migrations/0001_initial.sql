@@ -35,7 +35,7 @@ CREATE INDEX IF NOT EXISTS snip_ranking_idx ON snippets(ranking DESC);
 -- and to keep track of command usage and ranking.
 --
 
--- drops triggers for old versions (we'll need a migration system at some point)
+-- drops triggers for databases created before the migration system
 DROP TRIGGER IF EXISTS snippets_after_insert;
 DROP TRIGGER IF EXISTS snippets_after_update;
 
@@ -64,6 +64,3 @@ AFTER UPDATE ON snippets
 BEGIN
     INSERT INTO snippets_index(rowid, title, tag) VALUES(NEW.rowid, NEW.title, NEW.tag);
 END;
-
--- Analyze the whole stuff
-ANALYZE;
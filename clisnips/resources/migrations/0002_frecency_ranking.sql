@@ -0,0 +1,5 @@
+-- Rankings are now time-invariant frecency scores (see clisnips.database.ranking).
+-- We only know how many times, and when for the last time, each snippet was used,
+-- so we estimate the score as if every use happened at the last one.
+
+UPDATE snippets SET ranking = estimate_frecency(last_used_at, usage_count);
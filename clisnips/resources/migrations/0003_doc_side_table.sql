@@ -0,0 +1,41 @@
+-- Moves the documentation out of the snippets table,
+-- so that listing and searching snippets don't have to scan through it.
+
+CREATE TABLE IF NOT EXISTS snippets_doc(
+    id INTEGER PRIMARY KEY,
+    doc TEXT NOT NULL
+);
+
+INSERT INTO snippets_doc(id, doc)
+SELECT rowid, doc FROM snippets WHERE doc IS NOT NULL AND doc != '';
+
+ALTER TABLE snippets DROP COLUMN doc;
+
+CREATE TRIGGER IF NOT EXISTS snippets_after_delete_doc
+AFTER DELETE ON snippets
+BEGIN
+    DELETE FROM snippets_doc WHERE id = OLD.rowid;
+END;
+
+-- Snippets along with their documentation
+
+CREATE VIEW IF NOT EXISTS snippets_with_doc AS
+SELECT s.rowid AS id,
+    s.title, s.cmd, s.tag, coalesce(d.doc, '') AS doc,
+    s.created_at, s.last_used_at, s.usage_count, s.ranking
+FROM snippets s LEFT JOIN snippets_doc d ON d.id = s.rowid;
+
+CREATE TRIGGER IF NOT EXISTS snippets_with_doc_insert
+INSTEAD OF INSERT ON snippets_with_doc
+BEGIN
+    INSERT INTO snippets(title, cmd, tag, created_at, last_used_at, usage_count, ranking)
+    VALUES(
+        NEW.title, NEW.cmd, NEW.tag,
+        coalesce(NEW.created_at, strftime('%s', 'now')),
+        coalesce(NEW.last_used_at, strftime('%s', 'now')),
+        coalesce(NEW.usage_count, 0),
+        coalesce(NEW.ranking, 0.0)
+    );
+    INSERT INTO snippets_doc(id, doc)
+    SELECT last_insert_rowid(), NEW.doc WHERE NEW.doc IS NOT NULL AND NEW.doc != '';
+END;
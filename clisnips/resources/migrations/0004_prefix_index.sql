@@ -0,0 +1,16 @@
+-- Adds prefix indexes to the search index, so that prefix queries (i.e. `dock*`)
+-- of up to 4 characters are answered by a single index lookup instead of a scan of the whole term range.
+-- FTS5 options can't be altered, so the index is recreated and rebuilt from the snippets table.
+-- The triggers keeping it in sync reference it by name, and are left untouched.
+
+DROP TABLE snippets_index;
+
+CREATE VIRTUAL TABLE snippets_index USING fts5(
+    tokenize = "unicode61 remove_diacritics 2 tokenchars '-_'",
+    prefix = '2 3 4',
+    content = "snippets",
+    title,
+    tag
+);
+
+INSERT INTO snippets_index(snippets_index) VALUES('rebuild');
@@ -0,0 +1,72 @@
+-- Adds the commands and their documentation to the search index.
+-- The documentation lives in the snippets_doc table, so the index now reads its contents
+-- from the snippets_with_doc view, and is kept in sync with both tables.
+
+DROP TRIGGER IF EXISTS snippets_after_insert;
+DROP TRIGGER IF EXISTS snippets_before_delete;
+DROP TRIGGER IF EXISTS snippets_before_update;
+DROP TRIGGER IF EXISTS snippets_after_update;
+
+DROP TABLE snippets_index;
+
+CREATE VIRTUAL TABLE snippets_index USING fts5(
+    tokenize = "unicode61 remove_diacritics 2 tokenchars '-_'",
+    prefix = '2 3 4',
+    content = "snippets_with_doc",
+    content_rowid = "id",
+    title,
+    tag,
+    cmd,
+    doc
+);
+
+CREATE TRIGGER snippets_after_insert
+AFTER INSERT ON snippets
+BEGIN
+    INSERT INTO snippets_index(rowid, title, tag, cmd, doc)
+    VALUES(NEW.rowid, NEW.title, NEW.tag, NEW.cmd, (SELECT doc FROM snippets_doc WHERE id = NEW.rowid));
+END;
+
+CREATE TRIGGER snippets_before_delete
+BEFORE DELETE ON snippets
+BEGIN
+    DELETE FROM snippets_index WHERE rowid = OLD.rowid;
+END;
+
+CREATE TRIGGER snippets_before_update
+BEFORE UPDATE ON snippets
+BEGIN
+    DELETE FROM snippets_index WHERE rowid = OLD.rowid;
+END;
+
+CREATE TRIGGER snippets_after_update
+AFTER UPDATE ON snippets
+BEGIN
+    INSERT INTO snippets_index(rowid, title, tag, cmd, doc)
+    VALUES(NEW.rowid, NEW.title, NEW.tag, NEW.cmd, (SELECT doc FROM snippets_doc WHERE id = NEW.rowid));
+END;
+
+-- Documentation changes.
+-- Outdated index entries are removed with 'delete' commands given the previously indexed values.
+-- When a document is inserted, the snippet was already indexed without one (i.e. with a NULL doc),
+-- and when it is updated, with the old document.
+
+CREATE TRIGGER snippets_doc_after_insert
+AFTER INSERT ON snippets_doc
+BEGIN
+    INSERT INTO snippets_index(snippets_index, rowid, title, tag, cmd, doc)
+    SELECT 'delete', rowid, title, tag, cmd, NULL FROM snippets WHERE rowid = NEW.id;
+    INSERT INTO snippets_index(rowid, title, tag, cmd, doc)
+    SELECT rowid, title, tag, cmd, NEW.doc FROM snippets WHERE rowid = NEW.id;
+END;
+
+CREATE TRIGGER snippets_doc_after_update
+AFTER UPDATE ON snippets_doc
+BEGIN
+    INSERT INTO snippets_index(snippets_index, rowid, title, tag, cmd, doc)
+    SELECT 'delete', rowid, title, tag, cmd, OLD.doc FROM snippets WHERE rowid = OLD.id;
+    INSERT INTO snippets_index(rowid, title, tag, cmd, doc)
+    SELECT rowid, title, tag, cmd, NEW.doc FROM snippets WHERE rowid = NEW.id;
+END;
+
+INSERT INTO snippets_index(snippets_index) VALUES('rebuild');
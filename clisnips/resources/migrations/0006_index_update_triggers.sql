@@ -0,0 +1,37 @@
+-- Only reindexes snippets when their indexed columns change.
+-- Using a snippet updates its usage statistics and ranking, which must not rewrite the search index.
+-- Outdated index entries are removed with 'delete' commands given the previously indexed values,
+-- instead of having FTS5 read them back from the content view.
+
+DROP TRIGGER IF EXISTS snippets_before_delete;
+DROP TRIGGER IF EXISTS snippets_before_update;
+DROP TRIGGER IF EXISTS snippets_after_update;
+DROP TRIGGER IF EXISTS snippets_doc_after_update;
+
+-- BEFORE, since the documentation is deleted after the snippet
+CREATE TRIGGER snippets_before_delete
+BEFORE DELETE ON snippets
+BEGIN
+    INSERT INTO snippets_index(snippets_index, rowid, title, tag, cmd, doc)
+    VALUES('delete', OLD.rowid, OLD.title, OLD.tag, OLD.cmd, (SELECT doc FROM snippets_doc WHERE id = OLD.rowid));
+END;
+
+CREATE TRIGGER snippets_after_update
+AFTER UPDATE OF title, tag, cmd ON snippets
+WHEN OLD.title IS NOT NEW.title OR OLD.tag IS NOT NEW.tag OR OLD.cmd IS NOT NEW.cmd
+BEGIN
+    INSERT INTO snippets_index(snippets_index, rowid, title, tag, cmd, doc)
+    VALUES('delete', OLD.rowid, OLD.title, OLD.tag, OLD.cmd, (SELECT doc FROM snippets_doc WHERE id = OLD.rowid));
+    INSERT INTO snippets_index(rowid, title, tag, cmd, doc)
+    VALUES(NEW.rowid, NEW.title, NEW.tag, NEW.cmd, (SELECT doc FROM snippets_doc WHERE id = NEW.rowid));
+END;
+
+CREATE TRIGGER snippets_doc_after_update
+AFTER UPDATE OF doc ON snippets_doc
+WHEN OLD.doc IS NOT NEW.doc
+BEGIN
+    INSERT INTO snippets_index(snippets_index, rowid, title, tag, cmd, doc)
+    SELECT 'delete', rowid, title, tag, cmd, OLD.doc FROM snippets WHERE rowid = OLD.id;
+    INSERT INTO snippets_index(rowid, title, tag, cmd, doc)
+    SELECT rowid, title, tag, cmd, NEW.doc FROM snippets WHERE rowid = NEW.id;
+END;
@@ -0,0 +1,73 @@
+-- Normalizes the tags of the snippets, so that they can be filtered and counted without a full scan.
+-- The tag column holds comma or space separated tags, i.e. "tar,gz".
+-- Tags are stored lowercased, along with the number of snippets they're attached to,
+-- which are maintained by triggers so that listing the tags with their counts only reads the tags table.
+
+CREATE TABLE IF NOT EXISTS tags(
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    snippet_count INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS snippet_tags(
+    tag_id INTEGER NOT NULL,
+    snippet_id INTEGER NOT NULL,
+    PRIMARY KEY(tag_id, snippet_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS snippet_tags_snippet_id ON snippet_tags(snippet_id);
+
+-- Splits the tag column, by turning it into a JSON array.
+-- json_quote() escapes the double quotes and backslashes, but leaves the commas and spaces alone.
+CREATE VIEW IF NOT EXISTS snippet_tag_names AS
+SELECT s.rowid AS snippet_id, lower(trim(j.value)) AS name
+FROM snippets s, json_each('[' || replace(replace(json_quote(s.tag), ',', '","'), ' ', '","') || ']') j
+WHERE s.tag IS NOT NULL AND trim(j.value) != '';
+
+CREATE TRIGGER IF NOT EXISTS snippet_tags_after_insert
+AFTER INSERT ON snippet_tags
+BEGIN
+    UPDATE tags SET snippet_count = snippet_count + 1 WHERE id = NEW.tag_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS snippet_tags_after_delete
+AFTER DELETE ON snippet_tags
+BEGIN
+    UPDATE tags SET snippet_count = snippet_count - 1 WHERE id = OLD.tag_id;
+    DELETE FROM tags WHERE id = OLD.tag_id AND snippet_count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS snippets_tags_after_insert
+AFTER INSERT ON snippets
+WHEN NEW.tag IS NOT NULL
+BEGIN
+    INSERT OR IGNORE INTO tags(name)
+    SELECT name FROM snippet_tag_names WHERE snippet_id = NEW.rowid;
+    INSERT OR IGNORE INTO snippet_tags(tag_id, snippet_id)
+    SELECT t.id, n.snippet_id FROM snippet_tag_names n JOIN tags t ON t.name = n.name
+    WHERE n.snippet_id = NEW.rowid;
+END;
+
+CREATE TRIGGER IF NOT EXISTS snippets_tags_after_update
+AFTER UPDATE OF tag ON snippets
+WHEN OLD.tag IS NOT NEW.tag
+BEGIN
+    DELETE FROM snippet_tags WHERE snippet_id = OLD.rowid;
+    INSERT OR IGNORE INTO tags(name)
+    SELECT name FROM snippet_tag_names WHERE snippet_id = NEW.rowid;
+    INSERT OR IGNORE INTO snippet_tags(tag_id, snippet_id)
+    SELECT t.id, n.snippet_id FROM snippet_tag_names n JOIN tags t ON t.name = n.name
+    WHERE n.snippet_id = NEW.rowid;
+END;
+
+CREATE TRIGGER IF NOT EXISTS snippets_tags_after_delete
+AFTER DELETE ON snippets
+BEGIN
+    DELETE FROM snippet_tags WHERE snippet_id = OLD.rowid;
+END;
+
+INSERT OR IGNORE INTO tags(name)
+SELECT name FROM snippet_tag_names;
+
+INSERT OR IGNORE INTO snippet_tags(tag_id, snippet_id)
+SELECT t.id, n.snippet_id FROM snippet_tag_names n JOIN tags t ON t.name = n.name;
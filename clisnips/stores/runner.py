@@ -0,0 +1,113 @@
+"""
+Runners execute the search pager jobs of the snippets store.
+
+The `ThreadRunner` keeps slow queries from blocking the UI, by running them on a worker thread
+with its own database connection and pager.
+"""
+
+import logging
+import sqlite3
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Protocol, TypeVar
+
+from clisnips.database.search_pager import SearchPager
+from clisnips.database.snippets_db import SnippetsDatabase
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+Job = Callable[[SearchPager], T]
+
+
+class Runner(Protocol):
+    def submit(self, job: Job[T], on_done: Callable[[T], Any]):
+        """
+        Runs `job` with the pager, then passes its result to `on_done` on the main thread.
+        """
+        ...
+
+    def interrupt(self):
+        """
+        Aborts the query currently running, if any. The interrupted job doesn't deliver its result.
+        """
+        ...
+
+    def close(self):
+        ...
+
+
+class SyncRunner:
+    """
+    Runs jobs immediately, on the calling thread.
+    """
+
+    def __init__(self, pager: SearchPager):
+        self._pager = pager
+
+    def submit(self, job: Job[T], on_done: Callable[[T], Any]):
+        on_done(job(self._pager))
+
+    def interrupt(self):
+        ...
+
+    def close(self):
+        self._pager.close()
+
+
+class ThreadRunner:
+    """
+    Runs jobs one at a time, in submission order, on a worker thread.
+
+    SQLite connections can't be shared between threads, so the worker opens its own database connection,
+    and builds its own pager. Results are handed back to the main thread through `deliver`,
+    which must be thread-safe (i.e. `clisnips.tui.loop.idle_add`).
+    """
+
+    def __init__(
+        self,
+        open_database: Callable[[], SnippetsDatabase],
+        create_pager: Callable[[SnippetsDatabase], SearchPager],
+        deliver: Callable[..., Any],
+    ):
+        self._open_database = open_database
+        self._create_pager = create_pager
+        self._deliver = deliver
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='clisnips-search')
+        self._db: SnippetsDatabase | None = None
+        self._pager: SearchPager | None = None
+
+    def submit(self, job: Job[T], on_done: Callable[[T], Any]):
+        self._executor.submit(self._run, job, on_done)
+
+    def interrupt(self):
+        # this is the only connection method that is safe to call from another thread
+        if (db := self._db) is not None:
+            db.connection.interrupt()
+
+    def close(self):
+        self._executor.submit(self._close)
+        self._executor.shutdown(wait=True)
+
+    def _run(self, job: Job[T], on_done: Callable[[T], Any]):
+        try:
+            if self._pager is None:
+                self._db = self._open_database()
+                self._pager = self._create_pager(self._db)
+            result = job(self._pager)
+        except sqlite3.OperationalError as err:
+            if str(err) != 'interrupted':
+                logger.exception(err)
+            return
+        except Exception as err:
+            logger.exception(err)
+            return
+        self._deliver(on_done, result)
+
+    def _close(self):
+        if self._pager is not None:
+            self._pager.close()
+        if self._db is not None:
+            self._db.close()
+            self._db = self._pager = None
@@ -1,16 +1,20 @@
-import contextlib
 import enum
 import logging
-from collections.abc import Callable
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
 from typing import Any, TypedDict, TypeVar
 
 from observ import reactive, watch
 
-from clisnips.database import NewSnippet, Snippet, SortColumn, SortOrder
+from clisnips.database import NewSnippet, Snippet, SnippetHighlights, SnippetListing, SortColumn, SortOrder, TagCount
+from clisnips.database.projection import LISTING
 from clisnips.database.search_pager import SearchPager, SearchSyntaxError
+from clisnips.database.search_query import QueryParser
 from clisnips.database.snippets_db import SnippetsDatabase
 from clisnips.utils.clock import Clock
 
+from .runner import Runner
+
 Watched = TypeVar('Watched')
 
 
@@ -29,31 +33,81 @@ class State(TypedDict):
     search_query: str
     query_state: QueryState
     snippet_ids: list[int]
-    snippets_by_id: dict[int, Snippet]
-    total_rows: int
+    snippets_by_id: dict[int, SnippetListing]
+    # the matched parts of the search results
+    highlights: dict[int, SnippetHighlights]
+    # None while the search results are being counted
+    total_rows: int | None
     current_page: int
-    page_count: int
+    page_count: int | None
     page_size: int
     sort_by: SortColumn
     sort_order: SortOrder
     list_layout: ListLayout
 
 
+@dataclass(frozen=True, slots=True)
+class PagerSnapshot:
+    """
+    The result of a pager job, copied out of the pager that produced it.
+    """
+
+    query_state: QueryState
+    # None when the job didn't fetch a page
+    rows: list[SnippetListing] | None = None
+    # None while the results are being counted
+    total_rows: int | None = None
+    page_count: int | None = None
+    current_page: int = 1
+    highlights: dict[int, SnippetHighlights] | None = None
+
+    @property
+    def count_pending(self) -> bool:
+        return self.query_state is QueryState.VALID and self.total_rows is None
+
+
 class SnippetsStore:
+    """
+    Database reads are performed by pager jobs submitted to a `Runner`,
+    which may run them on another thread and hand the results back later.
+
+    Each job that fetches a page bumps a generation counter,
+    so that the results of superseded jobs are discarded.
+
+    Searching as you type is debounced by the `debounce` decorator, and every keystroke
+    interrupts the query in flight, so the database only runs the query the user stopped typing.
+
+    Search queries are compiled by the `query_parser`, so that any input is a valid query.
+    Without one (i.e. for fuzzy search), they are passed to the pager as typed.
+    """
+
     def __init__(
         self,
         initial_state: State,
         db: SnippetsDatabase,
-        pager: SearchPager,
+        runner: Runner,
         clock: Clock,
+        debounce: Callable[[Callable[[str], None]], Callable[[str], None]] | None = None,
+        query_parser: QueryParser | None = QueryParser(),
     ):
         self._state = reactive(initial_state)
         self._db = db
-        self._pager = pager
-        self._pager.set_sort_column(initial_state['sort_by'], initial_state['sort_order'])
-        self._pager.page_size = initial_state['page_size']
+        self._runner = runner
         self._clock = clock
-        self._fetch_list('')
+        self._generation = 0
+        self._query_parser = query_parser
+        # the last search query known to match no rows, along with the version of the database it was run against
+        self._empty_query: tuple[str, Hashable] | None = None
+        self._search = debounce(self._search_now) if debounce else self._search_now
+        sort_by, sort_order = initial_state['sort_by'], initial_state['sort_order']
+        page_size = initial_state['page_size']
+
+        def setup(pager: SearchPager):
+            pager.set_sort_column(sort_by, sort_order)
+            pager.page_size = page_size
+            return pager.list()
+
+        self._fetch(setup)
 
     @staticmethod
     def default_state() -> State:
@@ -63,6 +117,7 @@ class SnippetsStore:
             'query_state': QueryState.VALID,
             'snippet_ids': [],
             'snippets_by_id': {},
+            'highlights': {},
             'total_rows': 0,
             'current_page': 1,
             'page_count': 1,
@@ -110,86 +165,181 @@ class SnippetsStore:
 
     def create_snippet(self, snippet: NewSnippet):
         rowid = self._db.insert(snippet)
-        with self._handle_syntax_error():
-            self._pager.count()
-        # TODO: make it so we don't need to refetch the whole thing
-        snippet = self._db.get(rowid)
-        self._state['snippets_by_id'][rowid] = snippet
+        self._state['snippets_by_id'][rowid] = self._db.get(rowid, LISTING)
         self._state['snippet_ids'].insert(0, rowid)
+        self._recount()
 
     def update_snippet(self, snippet: Snippet):
         self._db.update(snippet)
-        self._state['snippets_by_id'][snippet['id']] = snippet
+        self._state['snippets_by_id'][snippet['id']] = self._db.get(snippet['id'], LISTING)
+        self._state['highlights'].pop(snippet['id'], None)
 
     def delete_snippet(self, rowid: int):
         self._db.delete(rowid)
         self._state['snippet_ids'].remove(rowid)
         del self._state['snippets_by_id'][rowid]
-        with self._handle_syntax_error():
-            self._pager.count()
+        self._recount()
+
+    def merge_index(self, pages: int, on_done: Callable[[bool], Any]):
+        """
+        Runs an incremental merge of the search index segments in the background.
+
+        `on_done` receives whether some segments were merged, i.e. whether another merge may be useful.
+        """
+        self._runner.submit(lambda pager: pager.database.merge_index(pages), on_done)
+
+    def fetch_tags(self) -> list[TagCount]:
+        return self._db.tags()
+
+    def add_tag_filter(self, tag: str):
+        """
+        Restricts the search results to the snippets having exactly the given tag.
+        """
+        search_query = self._state['search_query']
+        tag_filter = f'tag:"{tag}"'
+        if tag_filter not in search_query.split():
+            self.change_search_query(f'{search_query} {tag_filter}'.lstrip())
 
     def change_search_query(self, search_query: str):
         self._state['search_query'] = search_query
-        self._fetch_list(search_query)
+        # the results of the previous query are stale, don't wait for them
+        self._generation += 1
+        self._runner.interrupt()
+        self._search(search_query)
+
+    def _search_now(self, search_query: str):
+        if self._is_narrowing_empty_query(search_query):
+            # no need to ask the database, the results can only be empty
+            self._generation += 1
+            self._apply(PagerSnapshot(QueryState.VALID, [], 0, 1))
+            return
+        self._fetch(self._list_or_search(search_query), search_query)
+
+    def _is_narrowing_empty_query(self, search_query: str) -> bool:
+        if self._empty_query is None or self._query_parser is None:
+            return False
+        empty_query, version = self._empty_query
+        if version != self._db.data_version():
+            # snippets were written since, by us or by another process, and may match the query
+            self._empty_query = None
+            return False
+        return self._query_parser.is_narrowing(empty_query, search_query)
 
     def request_first_page(self):
         # TODO: skip loading if we don't need to paginate
-        with self._handle_syntax_error():
-            rows = self._pager.first()
-            self._load_result_set(rows)
+        self._fetch(lambda pager: pager.first())
 
     def request_next_page(self):
-        with self._handle_syntax_error():
-            rows = self._pager.next()
-            self._load_result_set(rows)
+        self._fetch(lambda pager: pager.next())
 
     def request_previous_page(self):
-        with self._handle_syntax_error():
-            rows = self._pager.previous()
-            self._load_result_set(rows)
+        self._fetch(lambda pager: pager.previous())
 
     def request_last_page(self):
-        with self._handle_syntax_error():
-            rows = self._pager.last()
-            self._load_result_set(rows)
+        self._fetch(lambda pager: pager.last())
 
     def change_sort_column(self, column: SortColumn):
         self._state['sort_by'] = column
-        self._pager.set_sort_column(column, self._state['sort_order'])
-        self._fetch_list(self._state['search_query'])
+        order, fetch = self._state['sort_order'], self._list_or_search(self._state['search_query'])
+
+        def job(pager: SearchPager):
+            pager.set_sort_column(column, order)
+            return fetch(pager)
+
+        self._fetch(job)
 
     def change_sort_order(self, order: SortOrder):
         self._state['sort_order'] = order
-        self._pager.set_sort_column(self._state['sort_by'], order)
-        self._fetch_list(self._state['search_query'])
+        column, fetch = self._state['sort_by'], self._list_or_search(self._state['search_query'])
+
+        def job(pager: SearchPager):
+            pager.set_sort_column(column, order)
+            return fetch(pager)
+
+        self._fetch(job)
 
     def change_page_size(self, size: int):
         self._state['page_size'] = size
-        self._pager.set_page_size(size)
-        self._fetch_list(self._state['search_query'])
-
-    def _fetch_list(self, search_query: str):
-        with self._handle_syntax_error():
-            rows = self._pager.list() if not search_query else self._pager.search(search_query)
-            self._load_result_set(rows)
-
-    def _load_result_set(self, rows: list[Snippet]):
-        by_id = {r['id']: r for r in rows}
-        ids = list(by_id.keys())
-        self._state['snippets_by_id'] = by_id
-        self._state['snippet_ids'] = ids
-        self._update_pager_infos()
-
-    def _update_pager_infos(self):
-        self._state['total_rows'] = self._pager.total_rows
-        self._state['page_count'] = self._pager.page_count
-        self._state['current_page'] = self._pager.current_page
-
-    @contextlib.contextmanager
-    def _handle_syntax_error(self):
-        try:
-            yield
-        except SearchSyntaxError:
-            self._state['query_state'] = QueryState.INVALID
-        else:
-            self._state['query_state'] = QueryState.VALID
+        fetch = self._list_or_search(self._state['search_query'])
+
+        def job(pager: SearchPager):
+            pager.set_page_size(size)
+            return fetch(pager)
+
+        self._fetch(job)
+
+    def _fetch(self, fetch: Callable[[SearchPager], list[SnippetListing]], search_query: str | None = None):
+        self._generation += 1
+        self._submit(fetch, self._generation, search_query)
+
+    def _recount(self):
+        self._submit(None, self._generation)
+
+    def _submit(
+        self,
+        fetch: Callable[[SearchPager], list[SnippetListing]] | None,
+        generation: int,
+        search_query: str | None = None,
+    ):
+        # taken before the job runs, so that writes made in the meantime invalidate its results
+        version = self._db.data_version() if search_query else None
+
+        def job(pager: SearchPager) -> PagerSnapshot | None:
+            if generation != self._generation:
+                # superseded before it started
+                return None
+            highlights = None
+            try:
+                if fetch is None:
+                    pager.count()
+                    rows = None
+                else:
+                    rows = fetch(pager)
+                    highlights = pager.get_highlights(rows)
+            except SearchSyntaxError:
+                return PagerSnapshot(QueryState.INVALID)
+            if pager.count_pending:
+                return PagerSnapshot(QueryState.VALID, rows, current_page=pager.current_page, highlights=highlights)
+            return PagerSnapshot(
+                QueryState.VALID,
+                rows,
+                pager.total_rows,
+                pager.page_count,
+                pager.current_page,
+                highlights,
+            )
+
+        def on_done(snapshot: PagerSnapshot | None):
+            if snapshot is None or generation != self._generation:
+                return
+            self._apply(snapshot)
+            if search_query and snapshot.rows == [] and snapshot.current_page == 1:
+                self._empty_query = search_query, version
+            if snapshot.count_pending:
+                # the first page is displayed, now count the results
+                self._recount()
+
+        self._runner.submit(job, on_done)
+
+    def _apply(self, snapshot: PagerSnapshot):
+        self._state['query_state'] = snapshot.query_state
+        if snapshot.query_state is QueryState.INVALID:
+            return
+        if snapshot.rows is not None:
+            by_id = {r['id']: r for r in snapshot.rows}
+            self._state['snippets_by_id'] = by_id
+            self._state['highlights'] = snapshot.highlights or {}
+            self._state['snippet_ids'] = list(by_id.keys())
+        self._state['total_rows'] = snapshot.total_rows
+        self._state['page_count'] = snapshot.page_count
+        self._state['current_page'] = snapshot.current_page
+
+    def _list_or_search(self, search_query: str) -> Callable[[SearchPager], list[SnippetListing]]:
+        if self._query_parser is None:
+            if not search_query:
+                return lambda pager: pager.list()
+            return lambda pager: pager.search(search_query)
+        compiled = self._query_parser.compile(search_query)
+        if not compiled:
+            return lambda pager: pager.list()
+        return lambda pager: pager.search(*compiled, query=search_query)
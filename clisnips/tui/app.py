@@ -1,24 +1,40 @@
-import atexit
 from collections.abc import Hashable
 
+import urwid
+
 from clisnips.config.state import save_persistent_state
 from clisnips.dic import DependencyInjectionContainer
 
+from .loop import IdleTask
 from .tui import TUI
 from .views.snippets_list import SnippetListView
 
 
 class Application:
-    def __init__(self, dic: DependencyInjectionContainer):
+    def __init__(self, dic: DependencyInjectionContainer, screen: urwid.raw_display.Screen | None = None):
         self.container = dic
         self.current_view = None
-        self.ui = TUI(dic.config.palette)
+        self.ui = TUI(dic.config.palette, screen)
         self.ui.register_view('snippets-list', self._build_snippets_list)
-        atexit.register(self._on_exit)
+
+    @property
+    def output(self) -> str | None:
+        """
+        The command to insert in the shell command line, if any.
+        """
+        return self.ui.exit_message
 
     def run(self) -> int:
         self.activate_view('snippets-list')
-        self.ui.main()
+        index_maintenance = self._create_index_maintenance()
+        try:
+            if index_maintenance:
+                index_maintenance.start()
+            self.ui.main()
+        finally:
+            if index_maintenance:
+                index_maintenance.stop()
+            self._on_exit()
         return 0
 
     def activate_view(self, name: Hashable, **kwargs):
@@ -30,9 +46,17 @@ class Application:
         self.ui.connect(view, SnippetListView.Signals.APPLY_SNIPPET_REQUESTED, self._on_apply_snippet_requested)
         return view
 
+    def _create_index_maintenance(self) -> IdleTask | None:
+        settings = self.container.config.index
+        if not (pages := settings.idle_merge_pages):
+            return None
+        store = self.container.snippets_store
+        task = IdleTask(lambda on_done: store.merge_index(pages, on_done), settings.idle_merge_delay)
+        self.ui.add_input_listener(task.on_input)
+        return task
+
     def _on_apply_snippet_requested(self, view: SnippetListView, command: str):
         self.ui.exit_with_message(command)
 
     def _on_exit(self):
         save_persistent_state(self.container.snippets_store.state)
-        self.container.database.close()
@@ -19,6 +19,7 @@ SHORTCUTS = (
     ('+, i, INS', 'Create new snippet'),
     ('-, d, DEL', 'Delete selected snippet'),
     ('s', 'Show details for selected snippet'),
+    ('t', 'Filter by tag'),
 )
 
 
@@ -0,0 +1,48 @@
+"""
+Renders the parts of the search results matched by the search terms, see `SnippetHighlights`.
+"""
+
+from clisnips.tui.urwid_types import TextMarkup
+
+# the attribute of the matched parts, to be mapped by the list's AttrMap
+MATCH_ATTR = 'match'
+
+
+def highlight_markup(attr: str, parts: list[str]) -> TextMarkup:
+    """
+    Returns the markup of a text split into alternating unmatched and matched parts.
+    """
+    markup = [(MATCH_ATTR, part) if i % 2 else part for i, part in enumerate(parts) if part]
+    return (attr, markup or '')
+
+
+def realign_highlights(text: str, parts: list[str]) -> list[str]:
+    """
+    Splits `text` like `parts`, `text` being the concatenation of `parts` with different whitespace,
+    i.e. after being wrapped by `textwrap`.
+
+    Returns `[text]` when the texts differ by more than whitespace.
+    """
+    source = ''.join(parts)
+    matched = [i % 2 == 1 for i, part in enumerate(parts) for _ in part]
+    result = ['']
+    pos = 0
+    for char in text:
+        if pos < len(source) and (source[pos] == char or (source[pos].isspace() and char.isspace())):
+            is_match = matched[pos]
+            pos += 1
+        elif char.isspace():
+            # inserted whitespace
+            is_match = False
+        else:
+            # removed whitespace
+            while pos < len(source) and source[pos].isspace():
+                pos += 1
+            if pos == len(source) or source[pos] != char:
+                return [text]
+            is_match = matched[pos]
+            pos += 1
+        if is_match != (len(result) % 2 == 0):
+            result.append('')
+        result[-1] += char
+    return result
@@ -8,7 +8,9 @@ class PagerInfos(urwid.Text):
         super().__init__('Page 1/1 (0)', align='right')
 
         def compute_message(state: State):
-            return f'Page {state["current_page"]}/{state["page_count"]} ({state["total_rows"]})'
+            page_count = '?' if state['page_count'] is None else state['page_count']
+            total_rows = '?' if state['total_rows'] is None else state['total_rows']
+            return f'Page {state["current_page"]}/{page_count} ({total_rows})'
 
         self._watcher = store.watch(
             compute_message,
@@ -1,14 +1,17 @@
 import urwid
 
-from clisnips.database import Snippet
+from clisnips.database import SnippetHighlights, SnippetListing
 from clisnips.stores.snippets import SnippetsStore
 from clisnips.tui.widgets.list_box import CyclingFocusListBox
 
+from .highlights import MATCH_ATTR, highlight_markup
+
 ATTR_MAP = {
     None: 'snippets-list',
     'title': 'snippets-list:title',
     'tag': 'snippets-list:tag',
     'cmd': 'snippets-list:cmd',
+    MATCH_ATTR: 'snippets-list:match',
 }
 
 FOCUS_ATTR_MAP = {
@@ -16,6 +19,7 @@ FOCUS_ATTR_MAP = {
     'title': 'snippets-list:title:focused',
     'tag': 'snippets-list:tag:focused',
     'cmd': 'snippets-list:cmd:focused',
+    MATCH_ATTR: 'snippets-list:match:focused',
 }
 
 
@@ -26,14 +30,14 @@ class SnippetsList(urwid.WidgetWrap):
         super().__init__(CyclingFocusListBox(self._walker))
 
         def watch_snippets(state):
-            return [state['snippets_by_id'][k] for k in state['snippet_ids']]
+            return [(state['snippets_by_id'][k], state['highlights'].get(k)) for k in state['snippet_ids']]
 
-        def on_snippets_changed(snippets: list[Snippet]):
+        def on_snippets_changed(snippets: list[tuple[SnippetListing, SnippetHighlights | None]]):
             self._walker.clear()
-            for snippet in snippets:
+            for snippet, highlights in snippets:
                 self._walker.append(
                     urwid.AttrMap(
-                        ListItem(snippet),
+                        ListItem(snippet, highlights),
                         attr_map=ATTR_MAP,
                         focus_map=FOCUS_ATTR_MAP,
                     )
@@ -50,18 +54,23 @@ class SnippetsList(urwid.WidgetWrap):
 
 
 class ListItem(urwid.Pile):
-    def __init__(self, snippet: Snippet):
+    def __init__(self, snippet: SnippetListing, highlights: SnippetHighlights | None = None):
+        if highlights is None:
+            highlights = {'title': [snippet['title']], 'tag': [snippet['tag']], 'cmd': [snippet['cmd']]}
+        tag = list(highlights['tag'])
+        tag[0] = f'[{tag[0]}'
+        tag[-1] = f'{tag[-1]}]'
         header = urwid.Columns(
             [
-                ('weight', 1, urwid.Text(('title', snippet['title']))),
-                ('pack', urwid.Text(('tag', f'[{snippet["tag"]}]'))),
+                ('weight', 1, urwid.Text(highlight_markup('title', highlights['title']))),
+                ('pack', urwid.Text(highlight_markup('tag', tag))),
             ],
             dividechars=1,
         )
         super().__init__(
             [
                 ('pack', header),
-                ('pack', urwid.Text(('cmd', snippet['cmd']))),
+                ('pack', urwid.Text(highlight_markup('cmd', highlights['cmd']))),
             ]
         )
 
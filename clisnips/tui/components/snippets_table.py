@@ -3,16 +3,19 @@ import logging
 import urwid
 from urwid.widget.constants import WrapMode
 
-from clisnips.database import Snippet
+from clisnips.database import SnippetHighlights, SnippetListing
 from clisnips.stores.snippets import SnippetsStore, State
 from clisnips.tui.layouts.table import LayoutColumn, LayoutRow, TableLayout
 from clisnips.tui.widgets.list_box import CyclingFocusListBox
 
+from .highlights import MATCH_ATTR, highlight_markup, realign_highlights
+
 ATTR_MAP = {
     None: 'snippets-list',
     'title': 'snippets-list:title',
     'tag': 'snippets-list:tag',
     'cmd': 'snippets-list:cmd',
+    MATCH_ATTR: 'snippets-list:match',
 }
 
 FOCUS_ATTR_MAP = {
@@ -20,6 +23,7 @@ FOCUS_ATTR_MAP = {
     'title': 'snippets-list:title:focused',
     'tag': 'snippets-list:tag:focused',
     'cmd': 'snippets-list:cmd:focused',
+    MATCH_ATTR: 'snippets-list:match:focused',
 }
 
 
@@ -29,23 +33,23 @@ class SnippetsTable(urwid.WidgetWrap):
         self._walker = urwid.SimpleFocusListWalker([])
         super().__init__(CyclingFocusListBox(self._walker))
 
-        layout: TableLayout[Snippet] = TableLayout()
+        layout: TableLayout[SnippetListing] = TableLayout()
         layout.append_column(LayoutColumn('tag'))
         layout.append_column(LayoutColumn('title', wrap=True))
         layout.append_column(LayoutColumn('cmd', wrap=True))
 
         def watch_snippets(state: State):
             width, _ = state['viewport']
-            return width, [state['snippets_by_id'][k] for k in state['snippet_ids']]
+            return width, [state['snippets_by_id'][k] for k in state['snippet_ids']], state['highlights']
 
-        def on_snippets_changed(args: tuple[int, list[Snippet]]):
-            width, snippets = args
+        def on_snippets_changed(args: tuple[int, list[SnippetListing], dict[int, SnippetHighlights]]):
+            width, snippets, highlights = args
             logging.getLogger(__name__).debug(f'width={width}')
             layout.invalidate()
             layout.layout(snippets, width)
             self._walker.clear()
-            for index, row in enumerate(layout):
-                row = urwid.AttrMap(ListItem(row), ATTR_MAP, FOCUS_ATTR_MAP)
+            for snippet, row in zip(snippets, layout):
+                row = urwid.AttrMap(ListItem(row, highlights.get(snippet['id'])), ATTR_MAP, FOCUS_ATTR_MAP)
                 self._walker.append(row)
             self._invalidate()
 
@@ -60,10 +64,15 @@ class SnippetsTable(urwid.WidgetWrap):
 
 
 class ListItem(urwid.Columns):
-    def __init__(self, row: LayoutRow[Snippet]):
+    def __init__(self, row: LayoutRow[SnippetListing], highlights: SnippetHighlights | None = None):
         cols = []
         for column, value in row:
-            cell = urwid.Text((column.key, value), wrap=WrapMode.SPACE if column.word_wrap else WrapMode.ANY)
+            if highlights is not None and column.key in highlights:
+                # the layout wrapped the value
+                markup = highlight_markup(column.key, realign_highlights(value, highlights[column.key]))
+            else:
+                markup = (column.key, value)
+            cell = urwid.Text(markup, wrap=WrapMode.SPACE if column.word_wrap else WrapMode.ANY)
             cols.append((column.computed_width, cell))
 
         super().__init__(cols, dividechars=1)
@@ -9,6 +9,7 @@ choices = {
     SortColumn.USAGE_COUNT: 'Sort by usage count',
     SortColumn.LAST_USED_AT: 'Sort by last usage date',
     SortColumn.CREATED_AT: 'Sort by creation date',
+    SortColumn.RELEVANCE: 'Sort by relevance',
 }
 
 
@@ -0,0 +1,54 @@
+from collections.abc import Callable
+
+import urwid
+
+from clisnips.database import TagCount
+from clisnips.tui.widgets.dialog import Dialog
+from clisnips.tui.widgets.list_box import CyclingFocusListBox
+
+
+class TagsDialog(Dialog):
+    """
+    Lists the tags along with their number of snippets, most used first.
+    """
+
+    def __init__(self, parent, tags: list[TagCount]):
+        self._callbacks: list[Callable[[str], None]] = []
+        if tags:
+            count_width = len(str(tags[0]['count']))
+            rows = [_TagRow(tag['name'], tag['count'], count_width, self._on_selected) for tag in tags]
+            body = CyclingFocusListBox(urwid.SimpleFocusListWalker(rows))
+        else:
+            body = urwid.Filler(urwid.Text('No snippet has tags.', align='center'))
+        super().__init__(parent, body)
+
+    def on_accept(self, callback: Callable[[str], None]):
+        self._callbacks.append(callback)
+
+    def _on_selected(self, name: str):
+        self.close()
+        for callback in self._callbacks:
+            callback(name)
+
+
+class _TagRow(urwid.WidgetWrap):
+    def __init__(self, name: str, count: int, count_width: int, on_selected: Callable[[str], None]):
+        self._name = name
+        self._on_selected = on_selected
+        columns = urwid.Columns(
+            [
+                (count_width, urwid.Text(('info', str(count)), align='right')),
+                urwid.Text(('snip:tag', name)),
+            ],
+            dividechars=1,
+        )
+        super().__init__(urwid.AttrMap(columns, None, focus_map='tags-list:focused'))
+
+    def selectable(self) -> bool:
+        return True
+
+    def keypress(self, size, key):
+        if key == 'enter':
+            self._on_selected(self._name)
+            return None
+        return key
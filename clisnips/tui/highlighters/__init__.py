@@ -1,4 +1,21 @@
-from .command import highlight_command
-from .documentation import highlight_documentation
+"""
+Syntax highlighters for snippet commands and documentation.
+
+The actual highlighters are imported on first use, since pygments is quite slow to import.
+"""
+
+from clisnips.tui.urwid_types import TextMarkup
 
 __all__ = ['highlight_command', 'highlight_documentation']
+
+
+def highlight_command(text: str) -> TextMarkup:
+    from .command import highlight_command
+
+    return highlight_command(text)
+
+
+def highlight_documentation(text: str) -> TextMarkup:
+    from .documentation import highlight_documentation
+
+    return highlight_documentation(text)
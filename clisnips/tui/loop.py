@@ -25,7 +25,13 @@ def clear_timeout(handle: TimerHandle):
 
 
 def idle_add(callback: Callable, *args) -> Handle:
-    return __loop.call_soon_threadsafe(callback, *args)
+    """
+    Schedules `callback` to run on the event loop thread, and the screen to be redrawn afterwards.
+
+    This is the only function of this module that can be called from other threads.
+    """
+    # going through an urwid alarm triggers the idle callbacks, hence the redraw
+    return __loop.call_soon_threadsafe(set_timeout, 0, callback, *args)
 
 
 def debounce(fn: Callable[..., Any], delay: int = 300):
@@ -49,3 +55,48 @@ def debounce(fn: Callable[..., Any], delay: int = 300):
 
 def debounced(delay: int = 300):
     return functools.partial(debounce, delay=delay)
+
+
+class IdleTask:
+    """
+    Runs a task in small steps while the user is idle, i.e. `delay` milliseconds after the last input.
+
+    `step` receives a callback to call with whether there is more work to do, once the step is done.
+    Steps run back to back until there is nothing left to do, or the user is active again.
+    """
+
+    def __init__(self, step: Callable[[Callable[[bool], Any]], Any], delay: int):
+        self._step = step
+        self._delay = delay
+        self._active = False
+        self._handle: TimerHandle | None = None
+
+    def start(self):
+        self._active = True
+        self._schedule(self._delay)
+
+    def stop(self):
+        self._active = False
+        self._cancel()
+
+    def on_input(self):
+        if self._active:
+            self._cancel()
+            self._schedule(self._delay)
+
+    def _schedule(self, delay: int):
+        self._handle = set_timeout(delay, self._run)
+
+    def _cancel(self):
+        if self._handle:
+            clear_timeout(self._handle)
+            self._handle = None
+
+    def _run(self):
+        self._handle = None
+        self._step(self._on_step_done)
+
+    def _on_step_done(self, more: bool):
+        # a pending timer means the user was active during the step
+        if more and self._active and not self._handle:
+            self._schedule(0)
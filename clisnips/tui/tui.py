@@ -1,7 +1,7 @@
-import atexit
 import signal
 import sys
 from collections.abc import Callable, Hashable, Iterable
+from typing import Any
 
 import observ
 import urwid
@@ -13,12 +13,15 @@ from .view import View, ViewBuilder
 
 
 class TUI:
-    def __init__(self, palette: Palette):
+    def __init__(self, palette: Palette, screen: urwid.raw_display.Screen | None = None):
         self.root_widget = urwid.WidgetPlaceholder(urwid.SolidFill(''))
         self.builder = ViewBuilder(self.root_widget)
-        # Since our main purpose is to insert stuff in the tty command line, we send the screen to STDERR
-        # so we can capture stdout easily without swapping file descriptors
-        screen = urwid.raw_display.Screen(output=sys.stderr)
+        self.exit_message: str | None = None
+        self._input_listeners: list[Callable[[], Any]] = []
+        if screen is None:
+            # Since our main purpose is to insert stuff in the tty command line, we send the screen to STDERR
+            # so we can capture stdout easily without swapping file descriptors
+            screen = urwid.raw_display.Screen(output=sys.stderr)
         for name, entry in palette.items():
             screen.register_palette_entry(
                 name, entry['fg'], entry['bg'], entry.get('mono'), entry.get('fg_hi'), entry.get('bg_hi')
@@ -31,6 +34,7 @@ class TUI:
             pop_ups=True,
             screen=screen,
             event_loop=get_event_loop(),
+            input_filter=self._on_input,
             unhandled_input=self._on_unhandled_input,
         )
 
@@ -45,25 +49,40 @@ class TUI:
         if self.main_loop.screen.started:
             self.main_loop.draw_screen()
 
+    def add_input_listener(self, callback: Callable[[], Any]):
+        """
+        Registers a callback to run whenever the user types something.
+        """
+        self._input_listeners.append(callback)
+
     @staticmethod
     def connect(obj: object, name: Hashable, callback: Callable, weak_args: Iterable = (), user_args: Iterable = ()):
         urwid.connect_signal(obj, name, callback, weak_args=weak_args, user_args=user_args)
 
     def main(self):
-        signal.signal(signal.SIGINT, self._on_terminate_signal)
-        signal.signal(signal.SIGQUIT, self._on_terminate_signal)
-        signal.signal(signal.SIGTERM, self._on_terminate_signal)
-
-        self.main_loop.run()
+        previous_handlers = {
+            signum: signal.signal(signum, self._on_terminate_signal)
+            for signum in (signal.SIGINT, signal.SIGQUIT, signal.SIGTERM)
+        }
+        try:
+            self.main_loop.run()
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
 
     def stop(self):
         raise urwid.ExitMainLoop()
 
     def exit_with_message(self, message: str):
-        atexit.register(lambda: print(message, sep=''))
+        self.exit_message = message
         self.main_loop.screen.clear()
         self.stop()
 
+    def _on_input(self, keys: list[str], raw: list[int]) -> list[str]:
+        for callback in self._input_listeners:
+            callback()
+        return keys
+
     def _on_unhandled_input(self, key) -> bool:
         if key in ('esc', 'q'):
             self.stop()
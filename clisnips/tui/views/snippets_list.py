@@ -20,6 +20,7 @@ from clisnips.tui.components.show_snippet_dialog import ShowSnippetDialog
 from clisnips.tui.components.snippets_list import SnippetsList
 from clisnips.tui.components.snippets_table import SnippetsTable
 from clisnips.tui.components.syntax_error_dialog import SyntaxErrorDialog
+from clisnips.tui.components.tags_dialog import TagsDialog
 from clisnips.tui.view import View
 
 logger = logging.getLogger(__name__)
@@ -147,6 +148,11 @@ class SnippetListView(View):
         dialog.on_accept(lambda *_: self._store.delete_snippet(id))
         self.open_dialog(dialog, 'Caution !')
 
+    def _open_tags_dialog(self):
+        dialog = TagsDialog(self, self._store.fetch_tags())
+        dialog.on_accept(self._store.add_tag_filter)
+        self.open_dialog(dialog, title='Tags', width=40)
+
     def _open_help_dialog(self):
         dialog = HelpDialog(self)
         self.open_dialog(dialog, 'Help')
@@ -186,6 +192,8 @@ class SnippetListView(View):
                 self._select_snippet()
             case 's':
                 self._open_show_dialog()
+            case 't':
+                self._open_tags_dialog()
             case '+' | 'i' | 'insert':
                 self._open_create_dialog()
             case '-' | 'd' | 'delete':
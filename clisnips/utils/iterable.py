@@ -1,4 +1,7 @@
-from collections.abc import Iterable
+import queue
+import threading
+from collections.abc import Iterable, Iterator
+from itertools import islice
 from typing import TypeVar
 
 T = TypeVar('T')
@@ -11,3 +14,53 @@ def intersperse(delimiter: D, iterable: Iterable[T]) -> Iterable[T | D]:
     for x in it:
         yield delimiter
         yield x
+
+
+def batched(iterable: Iterable[T], size: int) -> Iterator[list[T]]:
+    """
+    Yields lists of at most `size` items, like `itertools.batched` from Python 3.12.
+    """
+    it = iter(iterable)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def read_ahead(iterable: Iterable[T], max_pending: int) -> Iterator[T]:
+    """
+    Consumes `iterable` on a background thread, at most `max_pending` items ahead of the caller.
+
+    An exception raised by `iterable` is re-raised to the caller after the items preceding it.
+    The background thread stops when the caller stops iterating.
+    """
+    pending: queue.Queue[tuple[T | None, BaseException | None, bool]] = queue.Queue(max_pending)
+    stopped = threading.Event()
+
+    def produce():
+        try:
+            for item in iterable:
+                pending.put((item, None, False))
+                if stopped.is_set():
+                    return
+        except BaseException as err:
+            pending.put((None, err, True))
+        else:
+            pending.put((None, None, True))
+
+    thread = threading.Thread(target=produce, name='read-ahead', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, err, done = pending.get()
+            if err is not None:
+                raise err
+            if done:
+                return
+            yield item  # type: ignore
+    finally:
+        stopped.set()
+        # make room for the item the thread may be blocked on
+        while thread.is_alive():
+            try:
+                pending.get(timeout=0.05)
+            except queue.Empty:
+                pass
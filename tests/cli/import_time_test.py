@@ -0,0 +1,59 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+HEAVY_MODULES = frozenset(('pydantic', 'urwid', 'pygments', 'observ', 'sqlite3', 'tomlkit'))
+# Generous enough for slow CI machines, yet an order of magnitude below importing the TUI stack.
+BUDGET_US = 150_000
+
+_LINE_RX = re.compile(r'^import time:\s+(?P<self>\d+)\s+\|\s+\d+\s+\|(?P<indent>\s+)(?P<module>\S+)$')
+
+
+def _import_times(tmp_path: Path, *argv: str) -> dict[str, int]:
+    env = {
+        **os.environ,
+        'XDG_CONFIG_HOME': str(tmp_path / 'config'),
+        'XDG_DATA_HOME': str(tmp_path / 'data'),
+        'XDG_STATE_HOME': str(tmp_path / 'state'),
+        'XDG_RUNTIME_DIR': str(tmp_path / 'run'),
+        'CLISNIPS_DB': ':memory:',
+    }
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'clisnips', *argv],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if m := _LINE_RX.match(line):
+            times[m['module']] = int(m['self'])
+    return times
+
+
+def _top_level(modules) -> set[str]:
+    return {m.partition('.')[0] for m in modules}
+
+
+@pytest.mark.parametrize(
+    ('argv', 'allowed'),
+    (
+        (('version',), frozenset()),
+        (('logs', '--help'), frozenset()),
+        (('config',), frozenset(('pydantic',))),
+        (('dump', '--help'), frozenset()),
+    ),
+)
+def test_commands_import_only_what_they_use(tmp_path: Path, argv: tuple[str, ...], allowed: frozenset[str]):
+    times = _import_times(tmp_path, *argv)
+    assert _top_level(times) & HEAVY_MODULES <= allowed
+
+
+def test_version_import_time_budget(tmp_path: Path):
+    times = _import_times(tmp_path, 'version')
+    assert sum(times.values()) < BUDGET_US
@@ -0,0 +1,106 @@
+import os
+import signal
+import socket
+import sys
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from clisnips.config import get_server_socket_path
+from clisnips.daemon import client
+from clisnips.daemon.protocol import Message, recv_message, send_message
+
+
+class FallbackCalled(Exception):
+    pass
+
+
+class FakeServer:
+    def __init__(self):
+        self.requests: list[tuple[Message | None, int]] = []
+        self.replies: list[Message] = []
+
+
+@pytest.fixture(autouse=True)
+def isolated_client(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+    monkeypatch.setenv('TERM', 'xterm')
+    monkeypatch.setattr(client, '_fallback', _raise_fallback)
+    # the client's signal handlers would outlive the test
+    monkeypatch.setattr(signal, 'signal', lambda signum, handler: None)
+
+
+def _raise_fallback():
+    raise FallbackCalled()
+
+
+def run_client(tmp_path: Path) -> tuple[int | str | None, str]:
+    """
+    Runs the client with real files as its terminal, since it hands their descriptors over to the server.
+    Returns its exit status and standard output.
+    """
+    stdout_path = tmp_path / 'stdout'
+    with (
+        pytest.MonkeyPatch.context() as monkeypatch,
+        open(os.devnull) as tty_in,
+        open(os.devnull, 'w') as tty_out,
+        open(stdout_path, 'w') as stdout,
+    ):
+        monkeypatch.setattr(sys, 'stdin', tty_in)
+        monkeypatch.setattr(sys, 'stderr', tty_out)
+        monkeypatch.setattr(sys, 'stdout', stdout)
+        with pytest.raises(SystemExit) as exit:
+            client.main()
+    return exit.value.code, stdout_path.read_text()
+
+
+@pytest.fixture()
+def fake_server() -> Iterator[FakeServer]:
+    """
+    Records the attach request of a single client, and answers it with the server's replies.
+    """
+    path = get_server_socket_path()
+    path.parent.mkdir(parents=True)
+    server = FakeServer()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+        listener.bind(str(path))
+        listener.listen()
+
+        def serve():
+            conn, _ = listener.accept()
+            with conn:
+                message, fds = recv_message(conn)
+                for fd in fds:
+                    os.close(fd)
+                server.requests.append((message, len(fds)))
+                for reply in server.replies:
+                    send_message(conn, reply)
+
+        thread = threading.Thread(target=serve, daemon=True)
+        thread.start()
+        yield server
+        thread.join(1)
+
+
+def test_prints_the_selected_snippet(fake_server: FakeServer, tmp_path: Path):
+    fake_server.replies.append({'type': 'exit', 'status': 0, 'output': 'ls -l'})
+    assert run_client(tmp_path) == (0, 'ls -l\n')
+    # the terminal's input and output were handed over
+    assert fake_server.requests == [({'type': 'attach', 'term': 'xterm'}, 2)]
+
+
+def test_falls_back_when_the_server_is_busy(fake_server: FakeServer, tmp_path: Path):
+    fake_server.replies.append({'type': 'busy'})
+    with pytest.raises(FallbackCalled):
+        run_client(tmp_path)
+
+
+def test_falls_back_when_no_server_is_running(tmp_path: Path):
+    with pytest.raises(FallbackCalled):
+        run_client(tmp_path)
+
+
+def test_exits_with_an_error_when_the_server_goes_away(fake_server: FakeServer, tmp_path: Path):
+    assert run_client(tmp_path) == (1, '')
@@ -0,0 +1,29 @@
+import os
+import socket
+
+from clisnips.daemon.protocol import recv_message, send_message
+
+
+def test_message_roundtrip():
+    left, right = socket.socketpair()
+    with left, right:
+        send_message(left, {'type': 'exit', 'status': 0, 'output': 'ls -l'})
+        send_message(left, {'type': 'resize'})
+        assert recv_message(right) == ({'type': 'exit', 'status': 0, 'output': 'ls -l'}, [])
+        assert recv_message(right) == ({'type': 'resize'}, [])
+        left.close()
+        assert recv_message(right) == (None, [])
+
+
+def test_passes_file_descriptors():
+    left, right = socket.socketpair()
+    r, w = os.pipe()
+    with left, right:
+        send_message(left, {'type': 'attach', 'term': 'xterm'}, (r, w))
+        message, fds = recv_message(right)
+        assert message == {'type': 'attach', 'term': 'xterm'}
+        assert len(fds) == 2
+        os.write(fds[1], b'ok')
+        assert os.read(r, 2) == b'ok'
+        for fd in (r, w, *fds):
+            os.close(fd)
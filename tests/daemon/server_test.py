@@ -0,0 +1,93 @@
+import json
+import os
+import socket
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from clisnips.config.paths import ensure_app_dirs, get_config_path
+from clisnips.daemon.protocol import send_message
+from clisnips.daemon.server import Server
+from clisnips.dic import DependencyInjectionContainer
+from clisnips.tui.loop import set_timeout
+
+
+@pytest.fixture()
+def server(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Server]:
+    for name in ('XDG_CONFIG_HOME', 'XDG_DATA_HOME', 'XDG_STATE_HOME', 'XDG_RUNTIME_DIR'):
+        monkeypatch.setenv(name, str(tmp_path / name.lower()))
+    ensure_app_dirs()
+    # a debounced search would outlive the session, on the shared event loop
+    get_config_path('settings.json').write_text(json.dumps({'search': {'debounce_delay': 0}}))
+    monkeypatch.setenv('TERM', 'server-term')
+    dic = DependencyInjectionContainer(':memory:')
+    dic.database.insert({'title': 'list files', 'cmd': 'ls -l', 'tag': 'ls', 'doc': ''})
+    server = Server(dic, tmp_path / 'server.sock')
+    server._listener = server._listen()
+    yield server
+    server._listener.close()
+    dic.close()
+
+
+class Terminal:
+    """
+    A pseudo-terminal standing for the client's one, whose output is drained so that the session never blocks.
+    """
+
+    def __init__(self):
+        self.master, slave = os.openpty()
+        # the session takes ownership of the file descriptors it receives
+        self.fds = [os.dup(slave), os.dup(slave)]
+        os.close(slave)
+        self._reader = threading.Thread(target=self._drain, daemon=True)
+        self._reader.start()
+
+    def type(self, keys: bytes, delay: int = 100):
+        set_timeout(delay, os.write, self.master, keys)
+
+    def close(self):
+        os.close(self.master)
+
+    def _drain(self):
+        try:
+            while os.read(self.master, 4096):
+                pass
+        except OSError:
+            pass
+
+
+@pytest.fixture()
+def terminal() -> Iterator[Terminal]:
+    terminal = Terminal()
+    yield terminal
+    terminal.close()
+
+
+def test_session_outputs_the_selected_snippet(server: Server, terminal: Terminal):
+    conn, client = socket.socketpair()
+    with conn, client:
+        # focus the list, then select its first snippet
+        terminal.type(b'\t\r')
+        status, output = server._run_session(conn, {'type': 'attach', 'term': 'xterm'}, terminal.fds)
+    assert (status, output) == (0, 'ls -l')
+    assert os.environ['TERM'] == 'server-term'
+
+
+def test_session_ends_when_the_client_disconnects(server: Server, terminal: Terminal):
+    conn, client = socket.socketpair()
+    with conn:
+        client.close()
+        status, output = server._run_session(conn, {'type': 'attach', 'term': 'xterm'}, terminal.fds)
+    assert (status, output) == (0, None)
+
+
+def test_client_disconnecting_during_a_session_is_handled(server: Server, terminal: Terminal):
+    conn, client = socket.socketpair()
+    with conn:
+        send_message(client, {'type': 'attach', 'term': 'xterm'}, terminal.fds)
+        for fd in terminal.fds:
+            os.close(fd)
+        client.close()
+        server._handle_client(conn)
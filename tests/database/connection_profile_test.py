@@ -0,0 +1,39 @@
+from pathlib import Path
+
+import pytest
+
+from clisnips.database import ConnectionProfile
+from clisnips.database.snippets_db import SnippetsDatabase
+
+
+def _pragma(db: SnippetsDatabase, name: str):
+    return db.connection.execute(f'PRAGMA {name}').fetchone()[0]
+
+
+def test_profile_is_applied(tmp_path: Path):
+    profile: ConnectionProfile = {
+        'journal_mode': 'wal',
+        'synchronous': 'normal',
+        'cache_size': -4000,
+        'mmap_size': 1024 * 1024,
+        'temp_store': 'memory',
+    }
+    db = SnippetsDatabase.open(tmp_path / 'snippets.sqlite', profile)
+    assert _pragma(db, 'journal_mode') == 'wal'
+    assert _pragma(db, 'synchronous') == 1
+    assert _pragma(db, 'cache_size') == -4000
+    assert _pragma(db, 'mmap_size') == 1024 * 1024
+    assert _pragma(db, 'temp_store') == 2
+    db.close()
+
+
+def test_empty_profile_keeps_sqlite_defaults(tmp_path: Path):
+    db = SnippetsDatabase.open(tmp_path / 'snippets.sqlite', {})
+    assert _pragma(db, 'journal_mode') == 'delete'
+    db.close()
+
+
+def test_invalid_profile_value(tmp_path: Path):
+    with pytest.raises(ValueError):
+        profile = {'journal_mode': 'wal; DROP TABLE snippets'}
+        SnippetsDatabase.open(tmp_path / 'snippets.sqlite', profile)  # type: ignore
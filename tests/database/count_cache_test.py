@@ -0,0 +1,112 @@
+from pathlib import Path
+
+import pytest
+
+from clisnips.database import SortColumn, SortOrder
+from clisnips.database.count_cache import CountCache
+from clisnips.database.search_pager import SearchPager
+from clisnips.database.snippets_db import SnippetsDatabase
+
+
+def _populate(db: SnippetsDatabase, count: int):
+    db.insert_many(
+        {
+            'title': f'snip {i}',
+            'cmd': 'foo' if i % 2 else 'bar',
+            'tag': 'foo' if i % 2 else 'bar',
+            'doc': '',
+            'created_at': 1000 + i,
+            'last_used_at': 1000 + i,
+            'usage_count': 0,
+            'ranking': 0.0,
+        }
+        for i in range(count)
+    )
+
+
+def test_cache_is_invalidated_by_version():
+    version = 0
+    cache = CountCache(lambda: version)
+    cache.set('query', {'a': 1}, 42)
+    assert cache.get('query', {'a': 1}) == 42
+    assert cache.get('query', {'a': 2}) is None
+    version += 1
+    assert cache.get('query', {'a': 1}) is None
+
+
+def test_cache_is_bounded():
+    cache = CountCache(lambda: 0, max_size=2)
+    cache.set('a', (), 1)
+    cache.set('b', (), 2)
+    cache.get('a', ())
+    cache.set('c', (), 3)
+    assert cache.get('b', ()) is None
+    assert cache.get('a', ()) == 1
+    assert cache.get('c', ()) == 3
+
+
+def test_data_version_changes_on_writes(tmp_path: Path):
+    path = tmp_path / 'snippets.sqlite'
+    db = SnippetsDatabase.open(path)
+    other = SnippetsDatabase.open(path, read_only=True)
+    version = db.data_version()
+    db.insert({'title': 'foo', 'cmd': 'foo', 'tag': '', 'doc': ''})
+    assert db.data_version() != version
+    version = db.data_version()
+    other.insert({'title': 'bar', 'cmd': 'bar', 'tag': '', 'doc': ''})
+    assert db.data_version() != version
+
+
+def test_counts_are_cached_until_a_write():
+    db = SnippetsDatabase.open()
+    _populate(db, 10)
+    pager = SearchPager(db, (SortColumn.CREATED_AT, SortOrder.DESC), page_size=3)
+    statements = []
+    db.connection.set_trace_callback(statements.append)
+    pager.search('foo')
+    pager.search('foo')
+    assert sum('COUNT(*)' in s for s in statements) == 1
+    assert pager.total_rows == 5
+    db.insert({'title': 'foo', 'cmd': 'foo', 'tag': 'foo', 'doc': ''})
+    pager.search('foo')
+    assert pager.total_rows == 6
+
+
+@pytest.mark.parametrize(('query', 'expected'), (('foo', 5), ('nope', 0)))
+def test_lazy_count_of_short_first_page(query: str, expected: int):
+    db = SnippetsDatabase.open()
+    _populate(db, 10)
+    pager = SearchPager(db, (SortColumn.CREATED_AT, SortOrder.DESC), page_size=25, lazy_count=True)
+    statements = []
+    db.connection.set_trace_callback(statements.append)
+    rows = pager.search(query)
+    assert len(rows) == expected
+    assert not pager.count_pending
+    assert pager.total_rows == expected
+    assert not any('COUNT(*)' in s for s in statements)
+
+
+def test_lazy_count_is_deferred():
+    db = SnippetsDatabase.open()
+    _populate(db, 10)
+    pager = SearchPager(db, (SortColumn.CREATED_AT, SortOrder.DESC), page_size=2, lazy_count=True)
+    rows = pager.search('foo')
+    assert [r['title'] for r in rows] == ['snip 9', 'snip 7']
+    assert pager.count_pending
+    pager.count()
+    assert not pager.count_pending
+    assert (pager.total_rows, pager.page_count) == (5, 3)
+    # cached
+    pager.search('foo')
+    assert not pager.count_pending
+
+
+def test_lazy_count_is_computed_before_paginating():
+    db = SnippetsDatabase.open()
+    _populate(db, 10)
+    pager = SearchPager(db, (SortColumn.CREATED_AT, SortOrder.DESC), page_size=2, lazy_count=True)
+    pager.list()
+    assert pager.count_pending
+    rows = pager.last()
+    assert not pager.count_pending
+    assert [r['title'] for r in rows] == ['snip 1', 'snip 0']
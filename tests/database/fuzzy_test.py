@@ -0,0 +1,128 @@
+import random
+
+import pytest
+
+from clisnips.database import fuzzy
+from clisnips.database.fuzzy import FuzzyIndex, FuzzyPager
+from clisnips.database.search_pager import SearchPager
+from clisnips.database.snippets_db import SnippetsDatabase
+
+ROWS = [
+    (1, 'Start the stack', 'docker', 'docker compose up -d'),
+    (2, 'Decompose a number', 'math', 'factor 42'),
+    (3, 'Show the log', 'git', 'git log --oneline'),
+    (4, 'Dump a database', 'db', 'pg_dump mydb'),
+    (5, 'Compose mail', 'mail', 'mutt'),
+]
+
+
+def test_matches_subsequences():
+    index = FuzzyIndex(ROWS)
+    assert index.search('dcup') == [1]
+    assert index.search('gitlog') == [3]
+    assert index.search('zzz') == []
+
+
+def test_scores_compact_and_word_start_matches_first():
+    index = FuzzyIndex(ROWS)
+    # consecutive matches at word starts, earliest first, then inside a word
+    assert index.search('compose') == [5, 1, 2]
+    assert index.search('dump') == [4]
+
+
+def test_terms_must_all_match():
+    index = FuzzyIndex(ROWS)
+    assert index.search('compose mail') == [5]
+    assert index.search('log git') == [3]
+
+
+@pytest.mark.parametrize('queries', (('d', 'do', 'doc', 'dock'), ('c', 'co', 'comp', 'comp up')))
+def test_incremental_search_matches_fresh_search(queries):
+    index = FuzzyIndex(ROWS)
+    for query in queries:
+        assert index.search(query) == FuzzyIndex(ROWS).search(query)
+
+
+def test_capped_incremental_search_matches_fresh_search():
+    rng = random.Random(42)
+    rows = [(i, ''.join(rng.choices('abcde ', k=12)), 'tag', 'cmd') for i in range(500)]
+    index = FuzzyIndex(rows, max_matches=10)
+    for query in ('a', 'ab', 'abc', 'abc d', 'abc de', 'abc dea'):
+        assert index.search(query) == FuzzyIndex(rows, max_matches=10).search(query)
+
+
+def test_scores_at_most_max_matches():
+    index = FuzzyIndex(ROWS, max_matches=2)
+    # the first matches in popularity order, then sorted by score
+    assert index.search('d') == [2, 1]
+    # the previous results were incomplete, so the search resumes after them
+    assert index.search('dum') == [4, 2]
+
+
+def _search_in_parallel(rows, queries, max_matches=10, workers=2) -> list[list[int]]:
+    index = FuzzyIndex(rows, max_matches=max_matches, workers=workers)
+    try:
+        return [index.search(query) for query in queries]
+    finally:
+        index.close()
+
+
+def test_parallel_search_scores_every_match_of_selective_queries(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(fuzzy, 'PARALLEL_THRESHOLD', 2)
+    rng = random.Random(42)
+    rows = [(i, ''.join(rng.choices('abcdefghij ', k=12)), '', 'z') for i in range(500)]
+    # fewer than 10 matches in each part, those of narrowing queries being searched in this process
+    queries = ('abcd', 'abcd e', 'abcd ef', 'jihg', 'jihg a', 'aceg i')
+    exhaustive = FuzzyIndex(rows, max_matches=len(rows))
+    assert _search_in_parallel(rows, queries, workers=3) == [exhaustive.search(q)[:10] for q in queries]
+
+
+def test_parallel_search_scores_the_first_matches_of_each_part(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(fuzzy, 'PARALLEL_THRESHOLD', 2)
+    rows = [(i, f'axxxb {i}', 'tag', 'cmd') for i in range(100)]
+    rows[50] = (50, 'ab', 'tag', 'cmd')
+    assert 50 not in FuzzyIndex(rows, max_matches=10).search('ab')
+    (results,) = _search_in_parallel(rows, ('ab',))
+    assert results[0] == 50
+    assert len(results) == 10
+
+
+def _create_database() -> SnippetsDatabase:
+    db = SnippetsDatabase.open(':memory:')
+    for i in range(12):
+        db.insert({'title': f'docker thing {i}', 'cmd': 'docker ps', 'tag': 'docker', 'doc': ''})
+    db.insert({'title': 'git log', 'cmd': 'git log', 'tag': 'git', 'doc': ''})
+    return db
+
+
+def test_pager():
+    db = _create_database()
+    pager = FuzzyPager(db, page_size=5)
+    page = pager.search('dkr')
+    assert len(page) == 5
+    assert pager.total_rows == 12
+    assert pager.page_count == 3
+    seen = [r['id'] for r in page]
+    seen += [r['id'] for r in pager.next()]
+    seen += [r['id'] for r in pager.next()]
+    assert pager.current_page == 3
+    assert len(set(seen)) == 12
+    assert [r['id'] for r in pager.previous()] == seen[5:10]
+    assert [r['id'] for r in pager.last()] == seen[10:]
+
+
+def test_pager_reloads_index_after_writes():
+    db = _create_database()
+    pager = FuzzyPager(db)
+    assert pager.search('glg') != []
+    rowid = db.insert({'title': 'other log', 'cmd': 'glog', 'tag': '', 'doc': ''})
+    assert rowid in [r['id'] for r in pager.search('glg')]
+
+
+def test_search_pager_backend():
+    db = _create_database()
+    pager = SearchPager(db, page_size=5, fuzzy_pager=FuzzyPager(db))
+    assert [r['title'] for r in pager.search('gitlg')] == ['git log']
+    assert pager.total_rows == 1
+    assert len(pager.list()) == 5
+    assert pager.total_rows == 13
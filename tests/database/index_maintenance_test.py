@@ -0,0 +1,81 @@
+import pytest
+
+from clisnips.database.fts_structure import _read_varint, decode_structure
+from clisnips.database.snippets_db import SnippetsDatabase
+
+
+def _insert(db: SnippetsDatabase, count: int):
+    for i in range(count):
+        db.insert({'title': f'snippet {i}', 'cmd': f'echo {i}', 'tag': 'test', 'doc': ''})
+
+
+def _index_config(db: SnippetsDatabase) -> dict:
+    return {k: v for k, v in db.connection.execute('SELECT k, v FROM snippets_index_config')}
+
+
+@pytest.mark.parametrize(
+    ('data', 'expected'),
+    (
+        (b'\x00', 0),
+        (b'\x7f', 127),
+        (b'\x81\x00', 128),
+        (b'\x83\xff\x7f', 65535),
+        (b'\xff' * 9, 2**64 - 1),
+    ),
+)
+def test_read_varint(data: bytes, expected: int):
+    assert _read_varint(data, 0) == (expected, len(data))
+
+
+def test_decode_structure_v2():
+    record = bytes(
+        [0, 0, 0, 1]  # cookie
+        + [0xFF, 0, 0, 1]  # version 2
+        + [1, 1, 7, 3]  # levels, segments, write counter, origin counter
+        + [0, 1]  # level 0: not merging, 1 segment
+        + [2, 1, 5]  # segment 2, pages 1 to 5
+        + [1, 2, 0, 0, 42]  # origins, tombstones, entries
+    )
+    structure = decode_structure(record)
+    assert structure.write_counter == 7
+    assert structure.segment_count == 1
+    assert structure.page_count == 5
+    assert structure.levels[0].segments[0].id == 2
+
+
+def test_configure_index():
+    db = SnippetsDatabase.open(':memory:')
+    db.configure_index({'automerge': 4, 'crisismerge': 16, 'usermerge': 4})
+    # the defaults are not written
+    assert 'automerge' not in _index_config(db)
+    db.configure_index({'automerge': 0, 'usermerge': 2})
+    assert _index_config(db) | {'version': None} == {'automerge': 0, 'usermerge': 2, 'version': None}
+
+
+def test_merge_index():
+    db = SnippetsDatabase.open(':memory:')
+    db.configure_index({'automerge': 0, 'usermerge': 2})
+    _insert(db, 5)
+    # each transaction writes a new segment
+    assert db.index_structure().segment_count == 5
+    while db.merge_index(16):
+        ...
+    structure = db.index_structure()
+    assert structure.segment_count == 1
+    assert structure.levels[-1].segments[0].page_count == structure.page_count
+    assert [r['id'] for r in db.search('snippet')] == [1, 2, 3, 4, 5]
+
+
+def test_crisismerge():
+    db = SnippetsDatabase.open(':memory:')
+    db.configure_index({'automerge': 0, 'crisismerge': 2})
+    _insert(db, 8)
+    assert db.index_structure().segment_count == 1
+
+
+def test_insert_many_returns_the_number_of_snippets():
+    db = SnippetsDatabase.open(':memory:')
+    snippet = {'title': 'a', 'cmd': 'a', 'tag': '', 'doc': '', 'created_at': 0, 'last_used_at': 0}
+    rows = ({**snippet, 'usage_count': 0, 'ranking': 0.0} for _ in range(3))
+    assert db.insert_many(rows) == 3  # type: ignore
+    assert len(db) == 3
@@ -0,0 +1,175 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from clisnips.database import migrations
+from clisnips.database.migrations import Migration, MigrationError, get_latest_version, get_schema_version, migrate
+from clisnips.database.ranking import estimate_frecency
+from clisnips.database.snippets_db import SnippetsDatabase
+
+
+def test_migrations_are_sorted_and_unique():
+    versions = [m.version for m in migrations.get_migrations()]
+    assert versions == sorted(set(versions))
+    assert versions[0] == 1
+
+
+def test_migrates_new_database():
+    cx = sqlite3.connect(':memory:')
+    assert get_schema_version(cx) == 0
+    assert migrate(cx) == get_latest_version()
+    assert get_schema_version(cx) == get_latest_version()
+    tables = {r[0] for r in cx.execute("SELECT name FROM sqlite_schema WHERE type = 'table'")}
+    assert {'snippets', 'snippets_index'} <= tables
+
+
+def test_does_nothing_on_up_to_date_database():
+    cx = sqlite3.connect(':memory:')
+    migrate(cx)
+    statements = []
+    cx.set_trace_callback(statements.append)
+    migrate(cx)
+    assert statements == ['PRAGMA user_version']
+
+
+def test_migrates_in_steps(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    (tmp_path / '0001_create.sql').write_text('CREATE TABLE foo(a INTEGER);')
+    (tmp_path / '0002_insert.sql').write_text(
+        """
+        -- inserts some stuff
+        INSERT INTO foo(a) VALUES(1);
+        INSERT INTO foo(a) VALUES(2);
+        """
+    )
+    steps = [
+        Migration(1, 'create', tmp_path / '0001_create.sql'),
+        Migration(2, 'insert', tmp_path / '0002_insert.sql'),
+    ]
+    cx = sqlite3.connect(':memory:')
+
+    monkeypatch.setattr(migrations, 'get_migrations', lambda: tuple(steps[:1]))
+    assert migrate(cx) == 1
+    assert cx.execute('SELECT COUNT(*) FROM foo').fetchone()[0] == 0
+
+    monkeypatch.setattr(migrations, 'get_migrations', lambda: tuple(steps))
+    assert migrate(cx) == 2
+    assert cx.execute('SELECT COUNT(*) FROM foo').fetchone()[0] == 2
+
+
+def test_rolls_back_failed_migrations(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    (tmp_path / '0001_ok.sql').write_text('CREATE TABLE foo(a INTEGER);')
+    (tmp_path / '0002_ko.sql').write_text('INSERT INTO foo(a) VALUES(1);\nINSERT INTO nope(a) VALUES(2);')
+    steps = (
+        Migration(1, 'ok', tmp_path / '0001_ok.sql'),
+        Migration(2, 'ko', tmp_path / '0002_ko.sql'),
+    )
+    monkeypatch.setattr(migrations, 'get_migrations', lambda: steps)
+    cx = sqlite3.connect(':memory:')
+    with pytest.raises(MigrationError):
+        migrate(cx)
+    assert get_schema_version(cx) == 0
+    assert not cx.execute("SELECT name FROM sqlite_schema WHERE name = 'foo'").fetchall()
+
+
+def test_frecency_migration_reranks_existing_snippets():
+    cx = sqlite3.connect(':memory:')
+    cx.executescript(migrations.get_migrations()[0].path.read_text())
+    cx.execute('PRAGMA user_version = 1')
+    cx.execute("INSERT INTO snippets(title, cmd, last_used_at, usage_count, ranking) VALUES('a', 'a', 1000, 2, 42.0)")
+    cx.execute("INSERT INTO snippets(title, cmd, last_used_at, usage_count, ranking) VALUES('b', 'b', 1000, 0, 0.0)")
+    cx.commit()
+    migrate(cx)
+    rankings = [r[0] for r in cx.execute('SELECT ranking FROM snippets ORDER BY rowid')]
+    assert rankings == [estimate_frecency(1000, 2), 0.0]
+
+
+def test_doc_migration_moves_docs_to_side_table():
+    cx = sqlite3.connect(':memory:')
+    cx.executescript(migrations.get_migrations()[0].path.read_text())
+    cx.execute('PRAGMA user_version = 1')
+    cx.execute("INSERT INTO snippets(title, cmd, doc) VALUES('a', 'a', 'a doc')")
+    cx.execute("INSERT INTO snippets(title, cmd, doc) VALUES('b', 'b', '')")
+    cx.commit()
+    migrate(cx)
+    assert cx.execute('SELECT id, doc FROM snippets_with_doc ORDER BY id').fetchall() == [(1, 'a doc'), (2, '')]
+    assert cx.execute('SELECT id FROM snippets_doc').fetchall() == [(1,)]
+
+
+def test_prefix_index_migration_rebuilds_index():
+    cx = sqlite3.connect(':memory:')
+    cx.executescript(migrations.get_migrations()[0].path.read_text())
+    cx.execute('PRAGMA user_version = 1')
+    cx.execute("INSERT INTO snippets(title, cmd, tag) VALUES('docker compose', 'a', 'containers')")
+    cx.commit()
+    migrate(cx)
+    (schema,) = cx.execute("SELECT sql FROM sqlite_schema WHERE name = 'snippets_index'").fetchone()
+    assert "prefix = '2 3 4'" in schema
+    query = 'SELECT rowid FROM snippets_index WHERE snippets_index MATCH ?'
+    assert cx.execute(query, ('"dock"*',)).fetchall() == [(1,)]
+    assert cx.execute(query, ('"cont"*',)).fetchall() == [(1,)]
+
+
+def _index_data(db: SnippetsDatabase) -> list[tuple]:
+    return [tuple(r) for r in db.connection.execute('SELECT id, block FROM snippets_index_data ORDER BY id')]
+
+
+def test_using_a_snippet_does_not_reindex_it():
+    db = SnippetsDatabase.open(':memory:')
+    rowid = db.insert({'title': 'docker ps', 'cmd': 'docker ps', 'tag': 'docker', 'doc': 'lists containers'})
+    data = _index_data(db)
+    db.use_snippet(rowid, 1000.0)
+    db.update({'id': rowid, 'title': 'docker ps', 'cmd': 'docker ps', 'tag': 'docker', 'doc': 'lists containers'})
+    assert _index_data(db) == data
+
+
+def test_index_stays_consistent_with_snippets():
+    db = SnippetsDatabase.open(':memory:')
+    first = db.insert({'title': 'docker ps', 'cmd': 'docker ps', 'tag': 'docker', 'doc': ''})
+    second = db.insert({'title': 'list files', 'cmd': 'ls', 'tag': 'fs', 'doc': 'with details'})
+    db.update({'id': first, 'title': 'running containers', 'cmd': 'docker ps', 'tag': 'docker', 'doc': 'running'})
+    db.update({'id': second, 'title': 'list files', 'cmd': 'ls -l', 'tag': 'fs', 'doc': 'in long format'})
+    db.delete(second)
+    db.connection.execute("INSERT INTO snippets_index(snippets_index, rank) VALUES('integrity-check', 1)")
+    assert [r['id'] for r in db.search('running')] == [first]
+    assert [r['id'] for r in db.search('details OR long OR ps')] == [first]
+
+
+def test_tags_migration_splits_existing_tags():
+    cx = sqlite3.connect(':memory:')
+    cx.executescript(migrations.get_migrations()[0].path.read_text())
+    cx.execute('PRAGMA user_version = 1')
+    cx.execute("INSERT INTO snippets(title, cmd, tag) VALUES('a', 'a', 'tar,GZ')")
+    cx.execute("INSERT INTO snippets(title, cmd, tag) VALUES('b', 'b', ' tar  \"x\", ')")
+    cx.execute("INSERT INTO snippets(title, cmd, tag) VALUES('c', 'c', NULL)")
+    cx.commit()
+    migrate(cx)
+    assert cx.execute('SELECT name, snippet_count FROM tags ORDER BY name').fetchall() == [
+        ('"x"', 1),
+        ('gz', 1),
+        ('tar', 2),
+    ]
+
+
+def _tags(db: SnippetsDatabase) -> list[tuple]:
+    query = """
+        SELECT st.snippet_id, t.name FROM snippet_tags st JOIN tags t ON t.id = st.tag_id
+        ORDER BY st.snippet_id, t.name
+    """
+    return [tuple(r) for r in db.connection.execute(query)]
+
+
+def test_tags_stay_consistent_with_snippets():
+    db = SnippetsDatabase.open(':memory:')
+    first = db.insert({'title': 'docker ps', 'cmd': 'docker ps', 'tag': 'docker,ps', 'doc': 'lists containers'})
+    second = db.insert({'title': 'list files', 'cmd': 'ls', 'tag': 'fs ls,fs', 'doc': ''})
+    assert _tags(db) == [(first, 'docker'), (first, 'ps'), (second, 'fs'), (second, 'ls')]
+    # tagging doesn't interfere with the documentation
+    assert db.get(first)['doc'] == 'lists containers'
+
+    db.update({'id': first, 'title': 'docker ps', 'cmd': 'docker ps', 'tag': 'Docker,fs', 'doc': ''})
+    assert _tags(db) == [(first, 'docker'), (first, 'fs'), (second, 'fs'), (second, 'ls')]
+    db.delete(second)
+    assert _tags(db) == [(first, 'docker'), (first, 'fs')]
+    # unused tags are removed
+    assert [tuple(r) for r in db.tags()] == [('docker', 1), ('fs', 1)]
@@ -0,0 +1,74 @@
+import pytest
+
+from clisnips.database.projection import FULL, LISTING, STATS
+from clisnips.database.snippets_db import SnippetsDatabase
+
+
+@pytest.fixture
+def db():
+    db = SnippetsDatabase.open()
+    yield db
+    db.close()
+
+
+def test_projections_fetch_their_columns(db: SnippetsDatabase):
+    rowid = db.insert({'title': 'foo', 'cmd': 'foo', 'tag': 'bar', 'doc': 'The foo doc'})
+    assert dict(db.get(rowid, FULL)).keys() == {
+        'id',
+        'title',
+        'cmd',
+        'tag',
+        'doc',
+        'created_at',
+        'last_used_at',
+        'usage_count',
+        'ranking',
+    }
+    assert db.get(rowid)['doc'] == 'The foo doc'
+    assert 'doc' not in dict(db.get(rowid, LISTING))
+    assert dict(db.get(rowid, STATS)).keys() == {'id', 'created_at', 'last_used_at', 'usage_count', 'ranking'}
+    assert db.find(rowid + 1, LISTING) is None
+
+
+def test_doc_is_stored_in_side_table(db: SnippetsDatabase):
+    with_doc = db.insert({'title': 'foo', 'cmd': 'foo', 'tag': '', 'doc': 'foo doc'})
+    without_doc = db.insert({'title': 'bar', 'cmd': 'bar', 'tag': '', 'doc': ''})
+    assert db.get(without_doc)['doc'] == ''
+    columns = [r['name'] for r in db.connection.execute('PRAGMA table_info(snippets)')]
+    assert 'doc' not in columns
+    docs = db.connection.execute('SELECT id, doc FROM snippets_doc').fetchall()
+    assert [tuple(r) for r in docs] == [(with_doc, 'foo doc')]
+
+
+def test_update_and_delete_doc(db: SnippetsDatabase):
+    rowid = db.insert({'title': 'foo', 'cmd': 'foo', 'tag': '', 'doc': ''})
+    snippet = dict(db.get(rowid))
+    db.update({**snippet, 'doc': 'new doc'})  # type: ignore
+    assert db.get(rowid)['doc'] == 'new doc'
+    db.update({**snippet, 'doc': 'newer doc'})  # type: ignore
+    assert db.get(rowid)['doc'] == 'newer doc'
+    db.delete(rowid)
+    assert db.connection.execute('SELECT count(*) FROM snippets_doc').fetchone()[0] == 0
+
+
+def test_insert_many(db: SnippetsDatabase):
+    db.insert_many(
+        {
+            'title': f'snip {i}',
+            'cmd': 'foo',
+            'tag': '',
+            'doc': f'doc {i}' if i % 2 else '',
+            'created_at': 1000,
+            'last_used_at': 2000,
+            'usage_count': i,
+            'ranking': 0.0,
+        }
+        for i in range(4)
+    )
+    assert len(db) == 4
+    assert [(s['title'], s['doc']) for s in db] == [
+        ('snip 0', ''),
+        ('snip 1', 'doc 1'),
+        ('snip 2', ''),
+        ('snip 3', 'doc 3'),
+    ]
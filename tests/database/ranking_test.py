@@ -0,0 +1,116 @@
+import math
+
+import pytest
+
+from clisnips.database import ranking
+from clisnips.database.projection import STATS
+from clisnips.database.ranking import HALF_LIFE, compute_frecency, estimate_frecency, restore_frecency
+from clisnips.database.snippets_db import SnippetNotFound, SnippetsDatabase
+
+NOW = 1_700_000_000.0
+
+
+def _decayed_sum(ranking: float, now: float) -> float:
+    return math.exp(ranking - now * math.log(2) / HALF_LIFE)
+
+
+def test_first_use():
+    assert _decayed_sum(compute_frecency(0.0, NOW), NOW) == pytest.approx(1.0)
+
+
+def test_uses_decay_with_half_life():
+    ranking = compute_frecency(0.0, NOW)
+    ranking = compute_frecency(ranking, NOW + HALF_LIFE)
+    assert _decayed_sum(ranking, NOW + HALF_LIFE) == pytest.approx(1.5)
+
+
+def test_ranking_is_time_invariant():
+    often_long_ago = 0.0
+    for i in range(10):
+        often_long_ago = compute_frecency(often_long_ago, NOW + i)
+    once_recently = compute_frecency(0.0, NOW + 3 * HALF_LIFE)
+    # 10 uses halved three times is still more than a single use
+    assert often_long_ago > once_recently
+    once_much_later = compute_frecency(0.0, NOW + 4 * HALF_LIFE)
+    assert often_long_ago < once_much_later
+
+
+def test_does_not_overflow():
+    ranking = compute_frecency(compute_frecency(0.0, NOW), NOW - 1000 * HALF_LIFE)
+    assert math.isfinite(ranking)
+
+
+def test_estimate_frecency():
+    assert estimate_frecency(NOW, 0) == 0.0
+    ranking = 0.0
+    for _ in range(3):
+        ranking = compute_frecency(ranking, NOW)
+    assert estimate_frecency(NOW, 3) == pytest.approx(ranking)
+
+
+def test_use_snippet():
+    db = SnippetsDatabase.open()
+    rowid = db.insert({'title': 'foo', 'cmd': 'foo', 'tag': '', 'doc': ''})
+    db.use_snippet(rowid, NOW)
+    db.use_snippet(rowid, NOW + HALF_LIFE)
+    snippet = db.get(rowid)
+    assert snippet['usage_count'] == 2
+    assert snippet['last_used_at'] == int(NOW + HALF_LIFE)
+    assert snippet['ranking'] == pytest.approx(compute_frecency(compute_frecency(0.0, NOW), NOW + HALF_LIFE))
+    with pytest.raises(SnippetNotFound):
+        db.use_snippet(rowid + 1, NOW)
+
+
+@pytest.mark.parametrize('use_numpy', (True, False))
+def test_rerank(monkeypatch: pytest.MonkeyPatch, use_numpy: bool):
+    if use_numpy:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(ranking, '_numpy', lambda: None)
+    db = SnippetsDatabase.open()
+    db.block_size = 3
+    stats = [(int(NOW) - i * 3600, i % 4) for i in range(10)]
+    # the snippets used twice have exact frecency scores, from uses a half-life apart
+    exact = {i: compute_frecency(compute_frecency(0.0, t - HALF_LIFE), t) for i, (t, n) in enumerate(stats) if n == 2}
+    db.insert_many(
+        {
+            'title': f'snip {i}',
+            'cmd': 'foo',
+            'tag': '',
+            'doc': '',
+            'created_at': int(NOW) - 86400,
+            'last_used_at': last_used,
+            'usage_count': count,
+            'ranking': exact.get(i, 4.2),
+        }
+        for i, (last_used, count) in enumerate(stats)
+    )
+    assert db.rerank() == (10, 10 - len(exact))
+    rankings = {row['id']: row['ranking'] for row in db.iter(STATS)}
+    expected = [exact.get(i, estimate_frecency(t, n)) for i, (t, n) in enumerate(stats)]
+    assert [rankings[i + 1] for i in range(10)] == pytest.approx(expected)
+    # consistent rankings are kept
+    assert db.rerank() == (10, 0)
+
+
+def test_restore_frecency_keeps_consistent_rankings():
+    ranking = compute_frecency(compute_frecency(0.0, NOW - HALF_LIFE), NOW + 0.75)
+    assert restore_frecency(ranking, int(NOW), 2) == ranking
+    assert restore_frecency(estimate_frecency(NOW, 3), NOW, 3) == estimate_frecency(NOW, 3)
+    assert restore_frecency(0.0, 0, 0) == 0.0
+
+
+@pytest.mark.parametrize(
+    ('ranking', 'usage_count'),
+    (
+        # the gravity scores of the previous ranking
+        (4.2, 3),
+        (0.0, 3),
+        # more than `usage_count` uses at `last_used`
+        (estimate_frecency(NOW, 10), 3),
+        # never used
+        (4.2, 0),
+    ),
+)
+def test_restore_frecency_estimates_inconsistent_rankings(ranking: float, usage_count: int):
+    assert restore_frecency(ranking, NOW, usage_count) == estimate_frecency(NOW, usage_count)
@@ -0,0 +1,54 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from clisnips.database.snippets_db import SnippetsDatabase
+
+
+def _new_snippet(title: str):
+    return {'title': title, 'cmd': 'echo', 'tag': 'test', 'doc': ''}
+
+
+def test_browsing_connection_is_read_only(tmp_path: Path):
+    db = SnippetsDatabase.open(tmp_path / 'snippets.sqlite', {'journal_mode': 'wal'}, read_only=True)
+    assert db.read_only
+    with pytest.raises(sqlite3.OperationalError, match='readonly'):
+        db.connection.execute("INSERT INTO snippets(title, cmd) VALUES('foo', 'bar')")
+    db.close()
+
+
+def test_migrates_and_sets_journal_mode_before_browsing(tmp_path: Path):
+    db = SnippetsDatabase.open(tmp_path / 'snippets.sqlite', {'journal_mode': 'wal'}, read_only=True)
+    assert db.connection.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    assert len(db) == 0
+    db.close()
+
+
+def test_writes_are_visible_to_browsing_connection(tmp_path: Path):
+    db = SnippetsDatabase.open(tmp_path / 'snippets.sqlite', {'journal_mode': 'wal'}, read_only=True)
+    rowid = db.insert(_new_snippet('foo'))  # type: ignore
+    assert db.get(rowid)['title'] == 'foo'
+    db.use_snippet(rowid, db.get(rowid)['created_at'] + 60)
+    assert db.get(rowid)['usage_count'] == 1
+    db.delete(rowid)
+    assert db.find(rowid) is None
+    db.close()
+
+
+def test_concurrent_browsers_see_each_others_writes(tmp_path: Path):
+    path = tmp_path / 'snippets.sqlite'
+    first = SnippetsDatabase.open(path, {'journal_mode': 'wal'}, read_only=True)
+    second = SnippetsDatabase.open(path, {'journal_mode': 'wal'}, read_only=True)
+    rowid = first.insert(_new_snippet('foo'))  # type: ignore
+    assert second.get(rowid)['title'] == 'foo'
+    first.close()
+    second.close()
+
+
+def test_in_memory_database_is_never_read_only():
+    db = SnippetsDatabase.open(':memory:', read_only=True)
+    assert not db.read_only
+    rowid = db.insert(_new_snippet('foo'))  # type: ignore
+    assert db.get(rowid)['title'] == 'foo'
+    db.close()
@@ -15,10 +15,10 @@ def test_default_columns():
     assert order_by == 'rowid DESC'
 
     where = cursor.as_where_clause(ScrollDirection.FWD)
-    assert where == 'rowid > {cursor.last[rowid]!r}'
+    assert where == 'rowid > :cursor_0'
 
     where = cursor.as_where_clause(ScrollDirection.BWD)
-    assert where == 'rowid < {cursor.first[rowid]!r}'
+    assert where == 'rowid < :cursor_0'
 
 
 def test_single_sort_column():
@@ -42,10 +42,10 @@ def test_single_sort_column():
     assert order_by == 'foo ASC, id DESC'
 
     where = cursor.as_where_clause(ScrollDirection.FWD)
-    assert where == '(foo <= {cursor.last[foo]!r}) AND (foo < {cursor.last[foo]!r} OR id > {cursor.last[id]!r})'
+    assert where == '(foo <= :cursor_0) AND (foo < :cursor_0 OR id > :cursor_1)'
 
     where = cursor.as_where_clause(ScrollDirection.BWD)
-    assert where == '(foo >= {cursor.first[foo]!r}) AND (foo > {cursor.first[foo]!r} OR id < {cursor.first[id]!r})'
+    assert where == '(foo >= :cursor_0) AND (foo > :cursor_0 OR id < :cursor_1)'
 
 
 def test_multiple_sort_columns():
@@ -72,14 +72,12 @@ def test_multiple_sort_columns():
 
     where = cursor.as_where_clause(ScrollDirection.FWD)
     assert where == (
-        '(foo <= {cursor.last[foo]!r} AND bar >= {cursor.last[bar]!r})'
-        ' AND (foo < {cursor.last[foo]!r} OR bar > {cursor.last[bar]!r} OR id > {cursor.last[id]!r})'
+        '(foo <= :cursor_0 AND bar >= :cursor_1)' ' AND (foo < :cursor_0 OR bar > :cursor_1 OR id > :cursor_2)'
     )
 
     where = cursor.as_where_clause(ScrollDirection.BWD)
     assert where == (
-        '(foo >= {cursor.first[foo]!r} AND bar <= {cursor.first[bar]!r})'
-        ' AND (foo > {cursor.first[foo]!r} OR bar < {cursor.first[bar]!r} OR id < {cursor.first[id]!r})'
+        '(foo >= :cursor_0 AND bar <= :cursor_1)' ' AND (foo > :cursor_0 OR bar < :cursor_1 OR id < :cursor_2)'
     )
 
 
@@ -108,3 +106,23 @@ def test_update():
 
     cursor.update(rs[0:1])
     assert cursor.first == cursor.last == {'id': 0, 'foo': 666, 'bar': 'first'}
+
+
+def test_parameters():
+    cursor = Cursor.with_columns(
+        (
+            ('foo', SortOrder.DESC),
+            ('id', SortOrder.ASC, True),
+        )
+    )
+    assert cursor.as_parameters(ScrollDirection.FWD) == {'cursor_0': None, 'cursor_1': None}
+
+    cursor.update(
+        [
+            {'id': 0, 'foo': 666},
+            {'id': 2, 'foo': 111},
+        ]
+    )
+    assert cursor.as_parameters(ScrollDirection.FWD) == {'cursor_0': 111, 'cursor_1': 2}
+    assert cursor.as_parameters(ScrollDirection.BWD) == {'cursor_0': 666, 'cursor_1': 0}
+    assert cursor.as_parameters(ScrollDirection.BWD, 'c') == {'c_0': 666, 'c_1': 0}
@@ -0,0 +1,97 @@
+from clisnips.database import SortColumn, SortOrder, TagFilter
+from clisnips.database.search_pager import SearchPager
+from clisnips.database.snippets_db import SnippetsDatabase
+
+
+def _create_database() -> SnippetsDatabase:
+    db = SnippetsDatabase.open(':memory:')
+    db.insert({'title': 'Build an image', 'cmd': 'docker build --no-cache .', 'tag': 'docker', 'doc': ''})
+    db.insert({'title': 'List files', 'cmd': 'ls -la', 'tag': 'fs', 'doc': 'Unlike docker, lists files.'})
+    db.insert({'title': 'docker docker', 'cmd': 'docker ps', 'tag': 'misc', 'doc': ''})
+    for i in range(20):
+        db.insert({'title': f'Snippet {i}', 'cmd': f'echo docker {i}', 'tag': 'misc', 'doc': ''})
+    return db
+
+
+def test_search_matches_cmd_and_doc():
+    db = _create_database()
+    pager = SearchPager(db)
+    assert [r['title'] for r in pager.search('"--no-cache"')] == ['Build an image']
+    assert [r['title'] for r in pager.search('unlike')] == ['List files']
+
+
+def test_sort_by_relevance():
+    db = _create_database()
+    pager = SearchPager(db, (SortColumn.RELEVANCE, SortOrder.DESC), page_size=5)
+    rows = pager.search('docker')
+    relevances = [r['relevance'] for r in rows]
+    assert relevances == sorted(relevances, reverse=True)
+    assert rows[0]['title'] == 'docker docker'
+    # keyset pagination over the computed column
+    seen = [r['id'] for r in rows]
+    while len(seen) < pager.total_rows:
+        page = pager.next()
+        assert page
+        assert all(r['relevance'] <= relevances[-1] for r in page)
+        relevances = [r['relevance'] for r in page]
+        seen.extend(r['id'] for r in page)
+    assert len(seen) == len(set(seen)) == 23
+    assert [r['id'] for r in pager.previous()] == seen[15:20]
+    assert pager.search('docker')[0]['title'] == 'docker docker'
+
+
+def test_relevance_falls_back_to_ranking_when_listing():
+    db = _create_database()
+    pager = SearchPager(db, (SortColumn.RELEVANCE, SortOrder.DESC), page_size=5)
+    assert len(pager.list()) == 5
+
+
+def test_highlights():
+    db = _create_database()
+    pager = SearchPager(db, page_size=5)
+    rows = pager.search('"--no-cache" OR unlike')
+    assert pager.get_highlights(rows) == {
+        1: {'title': ['Build an image'], 'tag': ['docker'], 'cmd': ['docker build ', '--no-cache', ' .']},
+        # matched by its documentation
+        2: {'title': ['List files'], 'tag': ['fs'], 'cmd': ['ls -la']},
+    }
+    pager.list()
+    assert pager.get_highlights(rows) == {}
+
+
+def test_highlights_only_the_given_rows():
+    db = _create_database()
+    pager = SearchPager(db, page_size=5)
+    rows = pager.search('docker')
+    assert set(pager.get_highlights(rows[1:3])) == {r['id'] for r in rows[1:3]}
+
+
+def test_exclude():
+    db = _create_database()
+    pager = SearchPager(db, (SortColumn.RELEVANCE, SortOrder.DESC), page_size=5)
+    rows = pager.search('docker', 'cmd:echo')
+    assert {r['title'] for r in rows} == {'Build an image', 'List files', 'docker docker'}
+    # without a search term, the snippets not matching the excluded term are listed
+    rows = pager.search('', 'docker')
+    assert pager.total_rows == 0
+    rows = pager.search('', 'title:snippet')
+    assert {r['title'] for r in rows} == {'Build an image', 'List files', 'docker docker'}
+    assert pager.total_rows == 3
+    assert pager.get_highlights(rows) == {}
+
+
+def test_tag_filters():
+    db = _create_database()
+    db.update({'id': 3, 'title': 'docker docker', 'cmd': 'docker ps', 'tag': 'misc,Docker-CLI', 'doc': ''})
+    pager = SearchPager(db, (SortColumn.RELEVANCE, SortOrder.DESC), page_size=5)
+    rows = pager.search('', tags=[TagFilter('docker')])
+    assert [r['title'] for r in rows] == ['Build an image']
+    rows = pager.search('', tags=[TagFilter('docker', prefix=True)])
+    assert {r['title'] for r in rows} == {'Build an image', 'docker docker'}
+    assert pager.total_rows == 2
+    rows = pager.search('"ps"', tags=[TagFilter('DOCKER', prefix=True)])
+    assert [r['title'] for r in rows] == ['docker docker']
+    rows = pager.search('', 'build', [TagFilter('docker', prefix=True), TagFilter('misc')])
+    assert [r['title'] for r in rows] == ['docker docker']
+    rows = pager.search('', tags=[TagFilter('misc')])
+    assert pager.total_rows == 21
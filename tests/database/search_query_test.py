@@ -0,0 +1,124 @@
+import pytest
+
+from clisnips.database import TagFilter
+from clisnips.database.search_query import CompiledQuery, Term, compile_query, is_narrowing, parse_query
+from clisnips.database.snippets_db import SnippetsDatabase
+
+
+@pytest.mark.parametrize(
+    ('query', 'expected'),
+    (
+        ('', ()),
+        ('docker compose', ((Term('docker'),), (Term('compose'),))),
+        ('dock*', ((Term('dock', prefix=True),),)),
+        ('"compose up"', ((Term('compose up', phrase=True),),)),
+        ('"compose up', ((Term('compose up', phrase=True),),)),
+        ('tag:docker', ((Term('docker', 'tag'),),)),
+        ('-tag:"k8s"*', ((Term('k8s', 'tag', phrase=True, prefix=True, negated=True),),)),
+        ('--no-cache', ((Term('--no-cache'),),)),
+        ('a:b', ((Term('a:b'),),)),
+        ('docker OR podman', ((Term('docker'), Term('podman')),)),
+        ('OR docker OR', ((Term('docker'),),)),
+        ('- tag: : "" OR', ()),
+    ),
+)
+def test_parse_query(query: str, expected: tuple):
+    assert parse_query(query) == expected
+
+
+@pytest.mark.parametrize(
+    ('query', 'expected'),
+    (
+        ('', CompiledQuery('')),
+        ('docker compose', CompiledQuery('"docker" AND "compose"')),
+        ('docker OR podman up', CompiledQuery('("docker" OR "podman") AND "up"')),
+        ('cmd:"rm -rf"', CompiledQuery('cmd : "rm -rf"')),
+        ('--no-cache', CompiledQuery('"--no-cache"')),
+        ('say "hi', CompiledQuery('"say" AND "hi"')),
+        ('NEAR(a b)', CompiledQuery('"NEAR(a" AND "b)"')),
+        ('-docker', CompiledQuery('', '"docker"')),
+        ('up -docker -tag:k8s', CompiledQuery('("up") NOT ("docker" OR tag : "k8s")')),
+        ('-docker OR podman', CompiledQuery('("podman") NOT ("docker")')),
+    ),
+)
+def test_compile_query(query: str, expected: CompiledQuery):
+    assert compile_query(query) == expected
+
+
+@pytest.mark.parametrize(
+    ('query', 'expected'),
+    (
+        ('dock comp', CompiledQuery('"dock"* AND "comp"*')),
+        ('"compose up" dock*', CompiledQuery('"compose up" AND "dock"*')),
+        ('-tag:k8s dock', CompiledQuery('("dock"*) NOT (tag : "k8s"*)')),
+    ),
+)
+def test_compile_prefix_query(query: str, expected: CompiledQuery):
+    assert compile_query(query, prefix=True) == expected
+
+
+@pytest.mark.parametrize(
+    ('query', 'prefix', 'expected'),
+    (
+        ('tag:docker', False, CompiledQuery('', tags=(TagFilter('docker'),))),
+        ('tag:dock', True, CompiledQuery('', tags=(TagFilter('dock', True),))),
+        ('tag:"docker"', True, CompiledQuery('', tags=(TagFilter('docker'),))),
+        ('ps tag:docker tag:k8s*', False, CompiledQuery('"ps"', tags=(TagFilter('docker'), TagFilter('k8s', True)))),
+        # not a single tag, or not a filter
+        ('tag:"compose up"', False, CompiledQuery('tag : "compose up"')),
+        ('tag:tar,gz', False, CompiledQuery('tag : "tar,gz"')),
+        ('tag:a OR tag:b', False, CompiledQuery('(tag : "a" OR tag : "b")')),
+        ('-tag:docker', False, CompiledQuery('', 'tag : "docker"')),
+    ),
+)
+def test_compile_tag_filters(query: str, prefix: bool, expected: CompiledQuery):
+    assert compile_query(query, prefix) == expected
+
+
+def test_compiled_queries_are_valid_fts5_queries():
+    db = SnippetsDatabase.open(':memory:')
+    db.insert({'title': 'docker', 'tag': 'k8s', 'cmd': 'docker build --no-cache', 'doc': ''})
+    for query in ('"', '(', 'NOT', 'AND OR', '^', '*', 'a:b:c', '-"', 'tag:"', 'doc*ker', 'NEAR(a b, 3)'):
+        for fts_query in filter(None, compile_query(query, prefix=True)):
+            # raises on syntax errors, unlike `SnippetsDatabase.search()`
+            db.connection.execute('SELECT rowid FROM snippets_index(?)', (fts_query,)).fetchall()
+    assert [r['id'] for r in db.search(compile_query('--no-cache').match)] == [1]
+    db.close()
+
+
+@pytest.mark.parametrize(
+    ('previous', 'query', 'expected'),
+    (
+        ('docker', 'docker compose', True),
+        ('docker', 'docker  compose up', True),
+        ('docker', 'docker -compose', True),
+        ('docker', 'docker tag:compose', True),
+        ('-docker', '-docker compose', True),
+        ('', 'docker', False),
+        ('docker', 'docker', False),
+        ('doc', 'docker', False),
+        ('docker', 'docker OR compose', False),
+        ('a OR b', 'a OR b c', False),
+        ('docker -comp', 'docker -compose', False),
+        ('docker', 'podman compose', False),
+    ),
+)
+def test_is_narrowing(previous: str, query: str, expected: bool):
+    assert is_narrowing(previous, query) is expected
+
+
+@pytest.mark.parametrize(
+    ('previous', 'query', 'expected'),
+    (
+        ('doc', 'docker', True),
+        ('doc', 'docker comp', True),
+        ('docker', 'docker --no-cache', True),
+        ('tag:doc', 'tag:docker', True),
+        ('doc', 'doc*', True),
+        ('doc', 'tag:docker', False),
+        ('"doc"', '"docker"', False),
+        ('-doc', '-docker', False),
+    ),
+)
+def test_is_narrowing_prefix_queries(previous: str, query: str, expected: bool):
+    assert is_narrowing(previous, query, prefix=True) is expected
@@ -0,0 +1,117 @@
+import pytest
+
+from clisnips.database import SortColumn, SortOrder
+from clisnips.database.search_pager import SearchPager
+from clisnips.database.search_query import QueryParser
+from clisnips.database.search_scope import INDEX_OPTIONS, SearchScope
+from clisnips.database.snippets_db import SnippetsDatabase
+
+PARSER = QueryParser(prefix=True)
+
+
+def _create_database() -> SnippetsDatabase:
+    db = SnippetsDatabase.open(':memory:')
+    for i in range(30):
+        tool = ('docker', 'git', 'ssh')[i % 3]
+        db.insert(
+            {
+                'title': f'{tool} snippet {i}',
+                'cmd': f'{tool} {("compose up", "commit", "copy-id")[i % 4 % 3]} {i}',
+                'tag': 'misc' if i % 2 else 'tools',
+                'doc': 'Unlike the others' if i % 5 == 0 else '',
+                'ranking': float(i % 7),
+            }
+        )
+    return db
+
+
+def _create_pager(db: SnippetsDatabase, **kwargs) -> SearchPager:
+    return SearchPager(db, page_size=5, scope=SearchScope(db, PARSER.is_narrowing), **kwargs)
+
+
+def _search(pager: SearchPager, query: str) -> tuple[list[int], int]:
+    rows = pager.search(*PARSER.compile(query), query=query)
+    return [r['id'] for r in rows], pager.total_rows
+
+
+def _is_scoped(pager: SearchPager) -> bool:
+    return SearchScope.TABLE in pager.get_query()
+
+
+@pytest.mark.parametrize('lazy_count', (False, True))
+@pytest.mark.parametrize(
+    'queries',
+    (
+        ('d', 'do', 'docker', 'docker c', 'docker co', 'docker com', 'docker compose'),
+        ('c', 'co', 'co u', 'co unlike', 'co unlike tag:misc'),
+        ('g', 'git', 'git -commit'),
+    ),
+)
+def test_narrowing_searches_match_fresh_searches(queries: tuple[str, ...], lazy_count: bool):
+    db = _create_database()
+    pager = _create_pager(db, lazy_count=lazy_count)
+    scoped = []
+    for query in queries:
+        results = _search(pager, query)
+        scoped.append(_is_scoped(pager))
+        pager.count()
+        assert (results[0], pager.total_rows) == _search(SearchPager(db, page_size=5), query)
+    # the first search can't be narrowed
+    assert scoped[0] is False
+    assert any(scoped)
+
+
+def test_searches_not_narrowing_the_previous_one_are_not_scoped():
+    pager = _create_pager(_create_database())
+    _search(pager, 'docker')
+    _search(pager, 'git')
+    assert not _is_scoped(pager)
+    _search(pager, 'git commit')
+    assert _is_scoped(pager)
+
+
+def test_writes_invalidate_the_scope():
+    db = _create_database()
+    pager = _create_pager(db)
+    _search(pager, 'docker')
+    db.insert({'title': 'docker compose down', 'cmd': 'docker compose down', 'tag': 'misc', 'doc': ''})
+    assert _search(pager, 'docker compose') == _search(SearchPager(db, page_size=5), 'docker compose')
+    assert not _is_scoped(pager)
+
+
+def test_writes_after_filling_invalidate_the_scope():
+    db = _create_database()
+    pager = _create_pager(db)
+    _search(pager, 'docker')
+    _search(pager, 'docker c')
+    assert _is_scoped(pager)
+    db.insert({'title': 'docker compose down', 'cmd': 'docker compose down', 'tag': 'misc', 'doc': ''})
+    assert _search(pager, 'docker co') == _search(SearchPager(db, page_size=5), 'docker co')
+    assert not _is_scoped(pager)
+
+
+def test_too_many_results_are_not_captured():
+    db = _create_database()
+    pager = SearchPager(db, page_size=5, scope=SearchScope(db, PARSER.is_narrowing, max_rows=9))
+    # 10 docker snippets
+    _search(pager, 'docker')
+    _search(pager, 'docker c')
+    assert not _is_scoped(pager)
+    # the 6 snippets whose doc starts with 'Unlike'
+    _search(pager, 'unlike')
+    _search(pager, 'unlike c')
+    assert _is_scoped(pager)
+
+
+def test_relevance_sort_is_not_scoped():
+    pager = _create_pager(_create_database(), sort_column=(SortColumn.RELEVANCE, SortOrder.DESC))
+    _search(pager, 'docker')
+    _search(pager, 'docker c')
+    assert not _is_scoped(pager)
+
+
+def test_index_options_match_the_search_index():
+    db = _create_database()
+    (schema,) = db.connection.execute("SELECT sql FROM sqlite_master WHERE name = 'snippets_index'").fetchone()
+    for option in INDEX_OPTIONS.split(', '):
+        assert option in schema
@@ -0,0 +1,48 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from clisnips.database.snippets_db import SnippetsDatabase
+from clisnips.exporters import JsonExporter, JsonLinesExporter
+
+
+def _create_database(count: int) -> SnippetsDatabase:
+    db = SnippetsDatabase.open(':memory:')
+    db.block_size = 3
+    db.insert_many(
+        {
+            'title': f'snippet "{i}"',
+            'cmd': f'echo {i}\necho ünïcode',
+            'tag': 'test',
+            'doc': 'a\n\tdoc' if i % 2 else '',
+            'created_at': i,
+            'last_used_at': i,
+            'usage_count': i,
+            'ranking': i / 3,
+        }
+        for i in range(count)
+    )  # type: ignore
+    return db
+
+
+@pytest.mark.parametrize('count', (0, 1, 3, 7))
+def test_json_export_matches_json_dump(tmp_path: Path, count: int):
+    db = _create_database(count)
+    path = tmp_path / 'snippets.json'
+    JsonExporter(db).export(path)
+    assert path.read_text() == json.dumps([dict(row) for row in db], indent=2)
+
+
+def test_json_lines_export(tmp_path: Path):
+    db = _create_database(7)
+    path = tmp_path / 'snippets.jsonl'
+    JsonLinesExporter(db).export(path)
+    lines = path.read_text().splitlines()
+    assert [json.loads(line) for line in lines] == [dict(row) for row in db]
+
+
+def test_export_to_stdout(capsys: pytest.CaptureFixture[str]):
+    db = _create_database(2)
+    JsonLinesExporter(db).export(Path('-'))
+    assert len(capsys.readouterr().out.splitlines()) == 2
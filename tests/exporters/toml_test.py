@@ -0,0 +1,76 @@
+import tomllib
+from pathlib import Path
+
+import pytest
+import tomlkit
+
+from clisnips.database.snippets_db import SnippetsDatabase
+from clisnips.exporters import TomlExporter
+from clisnips.importers import TomlImporter
+
+STRINGS = (
+    'a "quoted" \\ string',
+    'echo 1\necho """x""" \\n',
+    'line1\n\tline2 \x01 \x7f ünïcode',
+    'ends with quotes\n""',
+    '\nstarts with a newline',
+    'windows\r\nnewlines\r\n',
+    'trailing backslash\n\\',
+    '',
+)
+
+
+def _create_database(count: int) -> SnippetsDatabase:
+    db = SnippetsDatabase.open(':memory:')
+    db.block_size = 3
+    db.insert_many(
+        {
+            'title': STRINGS[i % len(STRINGS)].replace('\n', ' ') or 'untitled',
+            'cmd': STRINGS[i % len(STRINGS)] or 'true',
+            'tag': STRINGS[-i % len(STRINGS)],
+            'doc': STRINGS[(i + 1) % len(STRINGS)],
+            'created_at': i,
+            'last_used_at': i * 2,
+            'usage_count': i,
+            'ranking': i / 3,
+        }
+        for i in range(count)
+    )  # type: ignore
+    return db
+
+
+def _tomlkit_export(db: SnippetsDatabase) -> str:
+    # the previous implementation of the exporter
+    document = tomlkit.document()
+    items = tomlkit.aot()
+    for row in db:
+        tbl = tomlkit.table()
+        tbl.update(row)
+        if '\n' in row['cmd']:
+            tbl['cmd'] = tomlkit.string(row['cmd'], multiline=True)
+        if '\n' in row['doc']:
+            tbl['doc'] = tomlkit.string(row['doc'], multiline=True)
+        items.append(tbl)
+    document.add('snippets', items)
+    return document.as_string()
+
+
+@pytest.mark.parametrize('count', (1, 3))
+def test_toml_export_matches_tomlkit(tmp_path: Path, count: int):
+    # tomlkit mangles leading newlines and carriage returns in multiline strings, so those are left out
+    db = _create_database(count)
+    path = tmp_path / 'snippets.toml'
+    TomlExporter(db).export(path)
+    assert path.read_text() == _tomlkit_export(db)
+
+
+@pytest.mark.parametrize('count', (0, 1, 9))
+def test_toml_export_roundtrip(tmp_path: Path, count: int):
+    db = _create_database(count)
+    path = tmp_path / 'snippets.toml'
+    TomlExporter(db).export(path)
+    with open(path, 'rb') as fp:
+        assert tomllib.load(fp)['snippets'] == [dict(row) for row in db]
+    imported = SnippetsDatabase.open(':memory:')
+    TomlImporter(imported).import_path(path)
+    assert len(imported) == count
@@ -0,0 +1,68 @@
+from pathlib import Path
+from xml.dom.minidom import Document
+
+import pytest
+
+from clisnips.database.snippets_db import SnippetsDatabase
+from clisnips.exporters import XmlExporter
+from clisnips.importers import XmlImporter
+
+
+def _create_database(count: int) -> SnippetsDatabase:
+    db = SnippetsDatabase.open(':memory:')
+    db.block_size = 3
+    db.insert_many(
+        {
+            'title': f'<snippet> "{i}" & more',
+            'cmd': f'echo {i} > /dev/null\n  echo ünïcode',
+            'tag': 'a,b' if i % 2 else '',
+            'doc': '{foo} (string) <a> & b\n\tdoc' if i % 2 else '',
+            'created_at': i,
+            'last_used_at': i * 2,
+            'usage_count': i,
+            'ranking': i / 3,
+        }
+        for i in range(count)
+    )  # type: ignore
+    return db
+
+
+def _minidom_export(db: SnippetsDatabase) -> str:
+    # the previous implementation of the exporter
+    doc = Document()
+    root = doc.createElement('snippets')
+    for row in db:
+        snip = doc.createElement('snippet')
+        snip.setAttribute('created-at', str(row['created_at']))
+        snip.setAttribute('last-used-at', str(row['last_used_at']))
+        snip.setAttribute('usage-count', str(row['usage_count']))
+        snip.setAttribute('ranking', str(row['ranking']))
+        for name, text in (('title', row['title']), ('command', row['cmd']), ('tag', row['tag'])):
+            el = doc.createElement(name)
+            el.appendChild(doc.createTextNode(text))
+            snip.appendChild(el)
+        el = doc.createElement('doc')
+        el.appendChild(doc.createCDATASection(row['doc']))
+        snip.appendChild(el)
+        root.appendChild(snip)
+    doc.appendChild(root)
+    return doc.toprettyxml(indent='  ')
+
+
+@pytest.mark.parametrize('count', (0, 1, 3, 7))
+def test_xml_export_matches_minidom(tmp_path: Path, count: int):
+    db = _create_database(count)
+    path = tmp_path / 'snippets.xml'
+    XmlExporter(db).export(path)
+    assert path.read_text() == _minidom_export(db)
+
+
+def test_xml_export_roundtrip(tmp_path: Path):
+    db = _create_database(4)
+    db.update({'id': 2, 'title': 'a', 'cmd': 'b', 'tag': 'c', 'doc': 'a CDATA end marker: ]]>'})
+    path = tmp_path / 'snippets.xml'
+    XmlExporter(db).export(path)
+    imported = SnippetsDatabase.open(':memory:')
+    XmlImporter(imported).import_path(path)
+    assert [r['doc'] for r in imported] == [r['doc'] for r in db]
+    assert [r['title'] for r in imported] == [r['title'] for r in db]
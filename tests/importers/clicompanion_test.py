@@ -0,0 +1,21 @@
+from pathlib import Path
+
+from clisnips.database.snippets_db import SnippetsDatabase
+from clisnips.importers import CliCompanionImporter
+
+
+def test_import(tmp_path: Path):
+    path = tmp_path / 'clicompanion'
+    path.write_text('mv ? ?\tsrc, dest\tMoves "src" to "dest"\nls -l\t\tLists files\nls -l\t\tLists files\n')
+    db = SnippetsDatabase.open(':memory:')
+    CliCompanionImporter(db, batch_size=1).import_path(path)
+    rows = sorted(({k: row[k] for k in ('title', 'cmd', 'tag', 'doc')} for row in db), key=lambda r: r['cmd'])
+    assert rows == [
+        {'title': 'Lists files', 'cmd': 'ls -l', 'tag': 'ls', 'doc': ''},
+        {
+            'title': 'Moves "src" to "dest"',
+            'cmd': 'mv {0} {1}',
+            'tag': 'mv',
+            'doc': '{0} (string) src\n{1} (string) dest',
+        },
+    ]
@@ -0,0 +1,112 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+from clisnips.database.ranking import estimate_frecency
+from clisnips.database.snippets_db import SnippetsDatabase
+from clisnips.exporters import JsonExporter, JsonLinesExporter
+from clisnips.importers import JsonImporter, JsonLinesImporter
+from clisnips.importers._json import iter_json_array
+
+NOW = 1_700_000_000
+
+
+def _snippet(i: int) -> dict:
+    return {
+        'title': f'snippet "{i}"',
+        'cmd': f'echo {i}\necho ünïcode \\u00e9',
+        'tag': 'test',
+        'doc': 'a\n\tdoc' if i % 2 else '',
+        'created_at': i,
+        'last_used_at': NOW + i,
+        'usage_count': i,
+        'ranking': estimate_frecency(NOW + i, i),
+    }
+
+
+def _create_database(count: int) -> SnippetsDatabase:
+    db = SnippetsDatabase.open(':memory:')
+    db.insert_many(_snippet(i) for i in range(count))  # type: ignore
+    return db
+
+
+@pytest.mark.parametrize(
+    'doc',
+    (
+        '[]',
+        ' [ ] \n',
+        '[1]',
+        '[123456789, -1.5e10, true, false, null]',
+        '[{"a": "\\u00e9\\n\\"ü"}, [1, [2]], "]"]',
+        json.dumps([_snippet(i) for i in range(5)], indent=2),
+    ),
+)
+@pytest.mark.parametrize('chunk_size', (1, 2, 3, 7, 1024))
+def test_iter_json_array(doc: str, chunk_size: int):
+    assert list(iter_json_array(io.StringIO(doc), chunk_size)) == json.loads(doc)
+
+
+@pytest.mark.parametrize(
+    'doc',
+    (
+        '',
+        '[1 2]',
+        '[1,]',
+        '[1, tru]',
+        '[\n  1,\n  "foo\n]',
+        '[\n  {"a": 1},\n  {"b" 2}\n]',
+        '[1] 2',
+        '[1',
+    ),
+)
+@pytest.mark.parametrize('chunk_size', (1, 4, 1024))
+def test_iter_json_array_errors(doc: str, chunk_size: int):
+    with pytest.raises(json.JSONDecodeError) as expected:
+        json.loads(doc)
+    with pytest.raises(json.JSONDecodeError) as err:
+        list(iter_json_array(io.StringIO(doc), chunk_size))
+    assert (err.value.lineno, err.value.colno) == (expected.value.lineno, expected.value.colno)
+    assert err.value.pos == expected.value.pos
+
+
+def test_iter_json_array_requires_an_array():
+    with pytest.raises(json.JSONDecodeError, match="Expecting '\\['"):
+        list(iter_json_array(io.StringIO('{}')))
+
+
+@pytest.mark.parametrize(
+    ('importer_class', 'exporter_class', 'suffix'),
+    (
+        (JsonImporter, JsonExporter, '.json'),
+        (JsonLinesImporter, JsonLinesExporter, '.jsonl'),
+    ),
+)
+@pytest.mark.parametrize('count', (0, 1, 7))
+def test_import_roundtrip(tmp_path: Path, importer_class, exporter_class, suffix: str, count: int):
+    path = tmp_path / f'snippets{suffix}'
+    exporter_class(_create_database(count)).export(path)
+    db = SnippetsDatabase.open(':memory:')
+    importer_class(db, batch_size=3).import_path(path)
+    assert [dict(row) | {'id': 0} for row in db] == [dict(row) | {'id': 0} for row in _create_database(count)]
+
+
+def test_dry_run_imports_nothing(tmp_path: Path):
+    path = tmp_path / 'snippets.json'
+    JsonExporter(_create_database(3)).export(path)
+    db = SnippetsDatabase.open(':memory:')
+    JsonImporter(db, dry_run=True).import_path(path)
+    assert len(db) == 0
+
+
+def test_invalid_snippet_keeps_the_previous_batches(tmp_path: Path):
+    snippets = [_snippet(i) for i in range(5)]
+    del snippets[4]['title']
+    path = tmp_path / 'snippets.jsonl'
+    path.write_text(''.join(f'{json.dumps(s)}\n' for s in snippets))
+    db = SnippetsDatabase.open(':memory:')
+    with pytest.raises(ValidationError):
+        JsonLinesImporter(db, batch_size=2).import_path(path)
+    assert len(db) == 4
@@ -0,0 +1,36 @@
+import time
+from pathlib import Path
+
+from clisnips.database.ranking import estimate_frecency
+from clisnips.database.snippets_db import SnippetsDatabase
+from clisnips.importers import XmlImporter
+
+
+def test_old_rankings_are_estimated(tmp_path: Path):
+    last_used = int(time.time()) - 3600
+    path = tmp_path / 'snippets.xml'
+    # rankings used to be gravity scores, much smaller than frecency scores
+    path.write_text(
+        f"""<?xml version="1.0" ?>
+<snippets>
+  <snippet created-at="0" last-used-at="{last_used}" usage-count="12" ranking="3.75">
+    <title>old</title>
+    <command>echo old</command>
+    <tag>test</tag>
+    <doc><![CDATA[]]></doc>
+  </snippet>
+  <snippet created-at="0" last-used-at="0" usage-count="0" ranking="0.0">
+    <title>unused</title>
+    <command>echo unused</command>
+    <tag>test</tag>
+    <doc><![CDATA[]]></doc>
+  </snippet>
+</snippets>
+"""
+    )
+    db = SnippetsDatabase.open(':memory:')
+    XmlImporter(db).import_path(path)
+    rankings = {row['title']: row['ranking'] for row in db}
+    assert rankings == {'old': estimate_frecency(last_used, 12), 'unused': 0.0}
+    # so it sorts above the snippets used before it
+    assert rankings['old'] > estimate_frecency(last_used - 86400, 1)
@@ -0,0 +1,287 @@
+import queue
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from clisnips.database.search_pager import SearchPager
+from clisnips.database.search_query import QueryParser
+from clisnips.database.snippets_db import SnippetsDatabase
+from clisnips.stores.runner import SyncRunner, ThreadRunner
+from clisnips.stores.snippets import QueryState, SnippetsStore
+from clisnips.utils.clock import SystemClock
+
+
+def _new_snippet(title: str):
+    return {'title': title, 'cmd': 'echo', 'tag': 'test', 'doc': ''}
+
+
+def _imported_snippet(title: str):
+    return {**_new_snippet(title), 'created_at': 0, 'last_used_at': 0, 'usage_count': 0, 'ranking': 0.0}
+
+
+def _titles(store: SnippetsStore) -> list[str]:
+    state = store.state
+    return [state['snippets_by_id'][i]['title'] for i in state['snippet_ids']]
+
+
+@pytest.fixture()
+def database():
+    db = SnippetsDatabase.open(':memory:')
+    db.insert_many(_imported_snippet(f'{word} {i}') for word in ('foo', 'bar') for i in range(10))  # type: ignore
+    yield db
+    db.close()
+
+
+@pytest.mark.parametrize('lazy_count', (False, True))
+def test_sync_runner(database: SnippetsDatabase, lazy_count: bool):
+    runner = SyncRunner(SearchPager(database, page_size=5, lazy_count=lazy_count))
+    state = SnippetsStore.default_state()
+    state['page_size'] = 5
+    store = SnippetsStore(state, database, runner, SystemClock())
+    assert store.state['total_rows'] == 20
+    assert store.state['page_count'] == 4
+    assert len(store.state['snippet_ids']) == 5
+
+    store.change_search_query('foo')
+    assert store.state['total_rows'] == 10
+    assert all(t.startswith('foo') for t in _titles(store))
+    store.request_next_page()
+    assert store.state['current_page'] == 2
+
+    # unterminated phrases are terminated by the query parser
+    store.change_search_query('"foo')
+    assert store.state['query_state'] is QueryState.VALID
+    assert store.state['total_rows'] == 10
+    store.change_search_query('-foo')
+    assert store.state['total_rows'] == 10
+    assert all(t.startswith('bar') for t in _titles(store))
+    store.change_search_query('bar')
+    assert store.state['query_state'] is QueryState.VALID
+    store.create_snippet(_new_snippet('bar 10'))  # type: ignore
+    assert store.state['total_rows'] == 11
+
+
+class DeferredDelivery:
+    """
+    Collects the results of a ThreadRunner, to apply them on the test thread.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def __call__(self, callback, *args):
+        self._queue.put((callback, args))
+
+    def drain(self, timeout: float = 5.0):
+        # results may submit more jobs, i.e. counting the results after the first page is displayed
+        while True:
+            try:
+                callback, args = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                return
+            callback(*args)
+            if self._queue.empty():
+                timeout = 0.2
+
+
+def test_thread_runner_drops_superseded_results(tmp_path: Path):
+    path = tmp_path / 'snippets.sqlite'
+    db = SnippetsDatabase.open(path, {'journal_mode': 'wal'})
+    db.insert_many(_imported_snippet(f'{word} {i}') for word in ('foo', 'bar') for i in range(10))  # type: ignore
+    threads = set()
+
+    def create_pager(db):
+        threads.add(threading.get_ident())
+        return SearchPager(db, lazy_count=True)
+
+    deliver = DeferredDelivery()
+    runner = ThreadRunner(lambda: SnippetsDatabase.open(path, read_only=True), create_pager, deliver)
+    store = SnippetsStore(SnippetsStore.default_state(), db, runner, SystemClock())
+    applied = []
+    watcher = store.watch(lambda s: s['snippet_ids'], lambda ids: applied.append(_titles(store)), sync=True)
+
+    store.change_search_query('foo')
+    store.change_search_query('bar')
+    # nothing is applied before the results are delivered
+    assert store.state['snippet_ids'] == []
+    deliver.drain()
+    assert applied == [_titles(store)]
+    assert watcher.value == store.state['snippet_ids']
+    assert all(t.startswith('bar') for t in _titles(store))
+    assert store.state['total_rows'] == 10
+    assert threads and threading.get_ident() not in threads
+
+    runner.close()
+    db.close()
+
+
+class RecordingRunner(SyncRunner):
+    def __init__(self, pager: SearchPager):
+        super().__init__(pager)
+        self.jobs = 0
+        self.interrupts = 0
+
+    def submit(self, job, on_done):
+        self.jobs += 1
+        super().submit(job, on_done)
+
+    def interrupt(self):
+        self.interrupts += 1
+
+
+def test_search_is_debounced(database: SnippetsDatabase):
+    pending = []
+
+    def debounce(fn):
+        def wrapper(*args):
+            pending[:] = [lambda: fn(*args)]
+
+        return wrapper
+
+    runner = RecordingRunner(SearchPager(database))
+    store = SnippetsStore(SnippetsStore.default_state(), database, runner, SystemClock(), debounce=debounce)
+    jobs = runner.jobs
+    for query in ('f', 'fo', 'foo'):
+        store.change_search_query(query)
+        # the query is displayed immediately
+        assert store.state['search_query'] == query
+    assert runner.interrupts == 3
+    assert runner.jobs == jobs
+    pending.pop()()
+    assert runner.jobs == jobs + 1
+    assert store.state['total_rows'] == 10
+
+
+def test_narrowing_an_empty_search_skips_the_database(database: SnippetsDatabase):
+    runner = RecordingRunner(SearchPager(database))
+    store = SnippetsStore(SnippetsStore.default_state(), database, runner, SystemClock())
+    store.change_search_query('baz')
+    assert store.state['total_rows'] == 0
+    jobs = runner.jobs
+    store.change_search_query('baz qux')
+    assert runner.jobs == jobs
+    assert store.state['total_rows'] == 0
+    assert store.state['snippet_ids'] == []
+    # widening the query searches again
+    store.change_search_query('baz OR foo')
+    assert runner.jobs == jobs + 1
+    assert store.state['total_rows'] == 10
+    # new snippets may match the empty query
+    store.change_search_query('baz')
+    store.create_snippet(_new_snippet('baz qux'))  # type: ignore
+    jobs = runner.jobs
+    store.change_search_query('baz qux')
+    assert runner.jobs == jobs + 1
+    assert store.state['total_rows'] == 1
+
+
+def test_writes_from_other_processes_invalidate_the_empty_search(tmp_path: Path):
+    path = tmp_path / 'snippets.sqlite'
+    db = SnippetsDatabase.open(path)
+    runner = RecordingRunner(SearchPager(db))
+    store = SnippetsStore(SnippetsStore.default_state(), db, runner, SystemClock())
+    store.change_search_query('baz')
+    assert store.state['total_rows'] == 0
+    # i.e. `clisnips import` while the daemon holds the store
+    other = SnippetsDatabase.open(path)
+    other.insert(_new_snippet('baz qux'))  # type: ignore
+    other.close()
+    jobs = runner.jobs
+    store.change_search_query('baz qux')
+    assert runner.jobs == jobs + 1
+    assert store.state['total_rows'] == 1
+    db.close()
+
+
+def test_thread_runner_interrupts_running_query(tmp_path: Path):
+    path = tmp_path / 'snippets.sqlite'
+    SnippetsDatabase.open(path).close()
+    deliver = DeferredDelivery()
+    runner = ThreadRunner(lambda: SnippetsDatabase.open(path, read_only=True), SearchPager, deliver)
+    started = threading.Event()
+    results = []
+
+    def slow_job(pager):
+        started.set()
+        query = 'WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT count(*) FROM n'
+        return pager._con.execute(query).fetchone()
+
+    runner.submit(lambda pager: None, lambda _: None)
+    runner.submit(slow_job, results.append)
+    runner.submit(lambda pager: 'next', results.append)
+    assert started.wait(5)
+    time.sleep(0.05)
+    runner.interrupt()
+    deliver.drain()
+    # the interrupted job delivers nothing, the next one runs normally
+    assert results == ['next']
+    runner.close()
+
+
+def test_prefix_search(database: SnippetsDatabase):
+    runner = RecordingRunner(SearchPager(database))
+    parser = QueryParser(prefix=True)
+    store = SnippetsStore(SnippetsStore.default_state(), database, runner, SystemClock(), query_parser=parser)
+    store.change_search_query('fo')
+    assert store.state['total_rows'] == 10
+    assert store.state['search_query'] == 'fo'
+    store.change_search_query('fox')
+    assert store.state['total_rows'] == 0
+    jobs = runner.jobs
+    # extending a term narrows prefix queries
+    store.change_search_query('foxy')
+    assert runner.jobs == jobs
+
+
+def test_merge_index(database: SnippetsDatabase):
+    database.configure_index({'automerge': 0, 'usermerge': 2})
+    runner = SyncRunner(SearchPager(database))
+    store = SnippetsStore(SnippetsStore.default_state(), database, runner, SystemClock())
+    for i in range(3):
+        store.create_snippet(_new_snippet(f'baz {i}'))  # type: ignore
+    results: list[bool] = []
+    while not results or results[-1]:
+        store.merge_index(16, results.append)
+    assert results[0] is True
+    assert database.index_structure().segment_count == 1
+
+
+def test_search_results_are_highlighted(database: SnippetsDatabase):
+    runner = SyncRunner(SearchPager(database, page_size=5))
+    store = SnippetsStore(
+        SnippetsStore.default_state(), database, runner, SystemClock(), query_parser=QueryParser(prefix=True)
+    )
+    assert store.state['highlights'] == {}
+    store.change_search_query('fo')
+    highlights = store.state['highlights']
+    assert set(highlights) == set(store.state['snippet_ids'])
+    assert all(h['title'][1] == 'foo' for h in highlights.values())
+    store.change_search_query('')
+    assert store.state['highlights'] == {}
+
+
+def test_invalid_queries_without_a_query_parser(database: SnippetsDatabase):
+    runner = SyncRunner(SearchPager(database))
+    store = SnippetsStore(SnippetsStore.default_state(), database, runner, SystemClock(), query_parser=None)
+    store.change_search_query('"foo')
+    assert store.state['query_state'] is QueryState.INVALID
+    store.change_search_query('foo')
+    assert store.state['query_state'] is QueryState.VALID
+    assert store.state['total_rows'] == 10
+
+
+def test_tag_filters(database: SnippetsDatabase):
+    database.insert({'title': 'foo bar', 'cmd': 'echo', 'tag': 'other', 'doc': ''})
+    runner = SyncRunner(SearchPager(database))
+    store = SnippetsStore(SnippetsStore.default_state(), database, runner, SystemClock())
+    assert [tuple(t) for t in store.fetch_tags()] == [('test', 20), ('other', 1)]
+    store.add_tag_filter('other')
+    assert store.state['search_query'] == 'tag:"other"'
+    assert _titles(store) == ['foo bar']
+    store.change_search_query('foo')
+    store.add_tag_filter('test')
+    store.add_tag_filter('test')
+    assert store.state['search_query'] == 'foo tag:"test"'
+    assert store.state['total_rows'] == 10
@@ -0,0 +1,29 @@
+import textwrap
+
+import pytest
+
+from clisnips.tui.components.highlights import MATCH_ATTR, highlight_markup, realign_highlights
+
+
+def test_highlight_markup():
+    assert highlight_markup('title', ['Start ', 'docker', '']) == ('title', ['Start ', (MATCH_ATTR, 'docker')])
+    assert highlight_markup('title', ['']) == ('title', '')
+
+
+@pytest.mark.parametrize(
+    ('parts', 'width'),
+    (
+        (['run the ', 'docker', ' compose stack'], 10),
+        (['', 'docker', '   compose  ', 'up', ''], 8),
+        (['a very', ' long ', 'sentence'], 4),
+    ),
+)
+def test_realign_highlights(parts: list[str], width: int):
+    text = '\n'.join(textwrap.wrap(''.join(parts), width))
+    result = realign_highlights(text, parts)
+    assert ''.join(result) == text
+    assert [p.strip() for p in result[1::2]] == [p.strip() for p in parts[1::2]]
+
+
+def test_realign_highlights_gives_up_on_different_texts():
+    assert realign_highlights('foo bar', ['', 'foo', ' baz']) == ['foo bar']
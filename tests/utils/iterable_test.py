@@ -0,0 +1,47 @@
+import pytest
+
+from clisnips.utils.iterable import batched, read_ahead
+
+
+@pytest.mark.parametrize(
+    ('items', 'size', 'expected'),
+    (
+        ([], 2, []),
+        ([1], 2, [[1]]),
+        ([1, 2], 2, [[1, 2]]),
+        ([1, 2, 3, 4, 5], 2, [[1, 2], [3, 4], [5]]),
+    ),
+)
+def test_batched(items: list[int], size: int, expected: list[list[int]]):
+    assert list(batched(iter(items), size)) == expected
+
+
+def test_read_ahead():
+    assert list(read_ahead(range(10), 2)) == list(range(10))
+
+
+def test_read_ahead_reraises_after_the_previous_items():
+    def items():
+        yield 1
+        yield 2
+        raise ValueError('nope')
+
+    received = []
+    with pytest.raises(ValueError, match='nope'):
+        for item in read_ahead(items(), 1):
+            received.append(item)
+    assert received == [1, 2]
+
+
+def test_read_ahead_stops_with_the_caller():
+    produced = []
+
+    def items():
+        for i in range(1000):
+            produced.append(i)
+            yield i
+
+    for item in read_ahead(items(), 1):
+        if item == 2:
+            break
+    assert len(produced) < 10